@@ -0,0 +1,205 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+from controller import PresidentGameController
+from model import Cards, Player, PresidentGame
+
+
+def choose_ai_cards(snapshot: tuple, player: Player, number_of_sets: int) -> Cards:
+    """
+    Retourne les cartes choisies par l'IA player, dont c'est le tour dans la partie décrite par snapshot : des cartes
+    à échanger pendant la phase d'échange, des cartes à jouer (un objet Cards vide pour passer) sinon.
+    La partie est reconstruite à partir du snapshot, les autres joueurs étant de simples Player : la fonction peut donc
+    s'exécuter dans un autre thread ou un autre processus sans toucher à la partie d'origine.
+    """
+    players = [Player(f"Joueur {index + 1}") for index in range(len(snapshot[0]))]
+    players[snapshot[2]] = player
+    game = PresidentGame.from_snapshot(snapshot, number_of_sets, players)
+    if game.is_trade:
+        return player.choose_cards_to_trade(game)
+    return player.choose_cards_to_play(game)
+
+
+class AIWorkerPool:
+    """
+    La classe AIWorkerPool fait réfléchir les IA de plusieurs tables dans un pool de threads ou de processus, sans
+    bloquer la boucle d'événements.
+    Le nombre de décisions en cours est limité à max_pending : quand le pool est saturé, les tables suivantes attendent
+    (sans bloquer la boucle) qu'une décision se termine.
+    """
+
+    def __init__(self, executor: Executor = None, max_pending: int = None):
+        """
+        Le constructeur de la classe AIWorkerPool. Par défaut, le pool est un ThreadPoolExecutor, qui est alors arrêté
+        par shutdown. Avec un ProcessPoolExecutor, les IA doivent pouvoir être envoyées à un autre processus, i.e avoir
+        un générateur aléatoire random.Random (et non le module random) ; leur générateur n'avance alors pas dans le
+        processus principal.
+        """
+        self.__owns_executor = executor is None
+        self.__executor = ThreadPoolExecutor() if executor is None else executor
+        self.__max_pending = 2 * (os.cpu_count() or 1) if max_pending is None else max_pending
+        self.__semaphore = asyncio.Semaphore(self.__max_pending)
+        self.__pending = 0
+
+    @property
+    def max_pending(self) -> int:
+        """
+        Le getter du nombre maximal de décisions en cours.
+        """
+        return self.__max_pending
+
+    @property
+    def pending(self) -> int:
+        """
+        Le getter du nombre de décisions en cours.
+        """
+        return self.__pending
+
+    def is_saturated(self) -> bool:
+        """
+        Retourne True si le nombre maximal de décisions en cours est atteint.
+        """
+        return self.__pending >= self.__max_pending
+
+    async def choose_cards(self, game: PresidentGame) -> Cards:
+        """
+        Fait choisir ses cartes, dans le pool, à l'IA dont c'est le tour dans la partie donnée en paramètre, et
+        retourne son choix. La partie n'est pas modifiée.
+        """
+        snapshot = game.snapshot()
+        player = game.get_current_player().clone()
+        async with self.__semaphore:
+            self.__pending += 1
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    self.__executor, choose_ai_cards, snapshot, player, game.number_of_sets)
+            finally:
+                self.__pending -= 1
+
+    def shutdown(self) -> None:
+        """
+        Arrête le pool, s'il a été créé par AIWorkerPool.
+        """
+        if self.__owns_executor:
+            self.__executor.shutdown()
+
+
+class AsyncPresidentGameController:
+    """
+    La classe AsyncPresidentGameController est la variante asynchrone de PresidentGameController : les tours des IA sont
+    joués coup par coup, leurs décisions étant prises dans un AIWorkerPool (ou, sans pool, dans la boucle d'événements,
+    en lui rendant la main entre deux coups).
+    Les requêtes d'une table sont placées dans une file et traitées une à une, dans l'ordre d'arrivée. La file est
+    bornée par queue_size : quand elle est pleine, process attend qu'une place se libère.
+    """
+
+    def __init__(self, players: list[Player] = None, number_of_sets: int = 1, pool: AIWorkerPool = None,
+                 queue_size: int = 16):
+        """
+        Le constructeur de la classe AsyncPresidentGameController. Les premiers tours des IA ne sont joués qu'à la
+        première requête (voir ai_turn).
+        """
+        self.__controller = PresidentGameController(players, number_of_sets, auto_ai=False)
+        self.__pool = pool
+        self.__queue_size = queue_size
+        self.__queue = None
+        self.__worker = None
+
+    @property
+    def controller(self) -> PresidentGameController:
+        """
+        Le getter du contrôleur synchrone de la table.
+        """
+        return self.__controller
+
+    def get_game_dto(self) -> dict:
+        """
+        Retourne le DTO de la partie (voir PresidentGameController.get_game_dto).
+        """
+        return self.__controller.get_game_dto()
+
+    def is_game_ended(self) -> bool:
+        """
+        Retourne True si la partie est finie.
+        """
+        return self.__controller.is_game_ended()
+
+    async def process(self, request: dict = None) -> dict:
+        """
+        Traite la requête envoyée par l'utilisateur, comme PresidentGameController.process, puis fait jouer les IA
+        jusqu'au prochain tour d'un joueur humain, et retourne les événements de la partie (voir
+        PresidentGameController.take_delta). Les exceptions de process sont relancées ici, et les IA ne jouent pas si la
+        requête a été refusée.
+        """
+        return await self.__submit(request)
+
+    async def ai_turn(self) -> dict:
+        """
+        Fait jouer les IA tant que c'est à elles de jouer, après les requêtes déjà dans la file, et retourne les
+        événements de la partie.
+        """
+        return await self.__submit(None)
+
+    async def close(self) -> None:
+        """
+        Arrête le traitement de la file de la table. Les requêtes qui n'ont pas été traitées sont annulées.
+        """
+        if self.__worker is not None:
+            self.__worker.cancel()
+            try:
+                await self.__worker
+            except asyncio.CancelledError:
+                pass
+            self.__worker = None
+            while not self.__queue.empty():
+                self.__queue.get_nowait()[1].cancel()
+
+    async def __submit(self, request) -> dict:
+        """
+        Place une requête dans la file (None pour un simple tour des IA), attend qu'elle ait été traitée et retourne
+        les événements de la partie.
+        """
+        if self.__worker is None:
+            self.__queue = asyncio.Queue(self.__queue_size)
+            self.__worker = asyncio.create_task(self.__work())
+        future = asyncio.get_running_loop().create_future()
+        await self.__queue.put((request, future))
+        return await future
+
+    async def __work(self) -> None:
+        """
+        Traite les requêtes de la file, une à une.
+        """
+        while True:
+            request, future = await self.__queue.get()
+            try:
+                events = []
+                if request is not None:
+                    events = self.__controller.process(request)["events"]
+                await self.__run_ai()
+                delta = self.__controller.take_delta()
+                delta["events"] = events + delta["events"]
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(delta)
+            finally:
+                self.__queue.task_done()
+
+    async def __run_ai(self) -> None:
+        """
+        Fait jouer les IA coup par coup tant que c'est à elles de jouer.
+        """
+        controller = self.__controller
+        while controller.is_ai_turn():
+            if self.__pool is None:
+                controller.ai_step()
+                await asyncio.sleep(0)
+            else:
+                controller.apply_ai_move(await self.__pool.choose_cards(controller.game))
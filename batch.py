@@ -0,0 +1,231 @@
+import numpy as np
+
+import constant
+from constant import NUMBER_OF_CARDS, NUMBER_OF_SUITS, VALUES, VALUE_RANKS, SUIT_INDEXES, TWO_RANK
+
+NUMBER_OF_RANKS = len(VALUES)
+_QUEEN_OF_HEARTS_CODE = VALUE_RANKS['Q'] * NUMBER_OF_SUITS + SUIT_INDEXES['♡']
+# nombre de combinaisons de k cartes parmi n, pour n et k entre 0 et 4
+_COMBINATIONS = np.array([[1, 0, 0, 0, 0],
+                          [1, 1, 0, 0, 0],
+                          [1, 2, 1, 0, 0],
+                          [1, 3, 3, 1, 0],
+                          [1, 4, 6, 4, 1]])
+# nombre de bits à 1 des entiers de 0 à 15, i.e la taille du sous-ensemble de couleurs qu'ils représentent
+_SUBSET_SIZES = np.array([bin(subset).count('1') for subset in range(1 << NUMBER_OF_SUITS)])
+
+
+class BatchPresidentGame:
+    """
+    La classe BatchPresidentGame joue en même temps K manches du jeu du Président entre IA aléatoires, toutes avec le
+    même nombre de joueurs. L'état de toutes les manches est stocké dans des tableaux NumPy, et chaque appel à step
+    fait jouer un coup dans chacune des manches en cours.
+    Les règles sont celles de model.py, qui reste la référence : les cartes autorisées sont celles de
+    Player.get_cards_allowed_to_play, la fin du tour celle de PresidentGame.is_turn_ended et les coups sont tirés
+    comme ceux d'AIPlayer.random_cards_to_play. Seule la première manche est jouée (il n'y a pas de phase d'échange).
+    """
+
+    def __init__(self, number_of_games: int, number_of_players: int = 4, seed: int = None):
+        """
+        Le constructeur de la classe BatchPresidentGame. Distribue les cartes des number_of_games manches et détermine
+        pour chacune le joueur qui commence, i.e celui qui a la dame de cœur.
+        """
+        if number_of_players not in constant.ROLES:
+            raise ValueError("Le jeu se joue de 3 à 6 joueurs.")
+        self.__random = np.random.default_rng(seed)
+        self.__number_of_games = number_of_games
+        self.__number_of_players = number_of_players
+        self.__games = np.arange(number_of_games)
+
+        # mains des joueurs : hands[k, p, code] vaut True si le joueur p de la manche k a la carte code
+        self.__hands = np.zeros((number_of_games, number_of_players, NUMBER_OF_CARDS), dtype=bool)
+        deals = self.__random.permuted(np.tile(np.arange(NUMBER_OF_CARDS), (number_of_games, 1)), axis=1)
+        owners = np.arange(NUMBER_OF_CARDS) % number_of_players
+        self.__hands[self.__games[:, None], owners[None, :], deals] = True
+        # nombre de cartes de chaque rang et de cartes en main de chaque joueur, maintenus à chaque coup
+        self.__rank_counts = self.__hands.reshape(number_of_games, number_of_players, NUMBER_OF_RANKS,
+                                                  NUMBER_OF_SUITS).sum(axis=3)
+        self.__hand_sizes = self.__rank_counts.sum(axis=2)
+
+        # pli en cours : rang de la plus forte carte (-1 si vide), nombre de cartes demandées et dernier joueur
+        self.__trick_rank = np.full(number_of_games, -1)
+        self.__trick_number_of_cards = np.zeros(number_of_games, dtype=int)
+        self.__trick_last_player = np.full(number_of_games, -1)
+
+        self.__current_player = np.argmax(self.__hands[:, :, _QUEEN_OF_HEARTS_CODE], axis=1)
+        self.__turns_without_plays = np.zeros(number_of_games, dtype=int)
+        # place d'arrivée de chaque joueur (-1 s'il a encore des cartes) et nombre de joueurs sans cartes
+        self.__positions = np.full((number_of_games, number_of_players), -1)
+        self.__players_without_card = np.zeros(number_of_games, dtype=int)
+        self.__is_ended = np.zeros(number_of_games, dtype=bool)
+
+    @property
+    def hands(self):
+        """
+        Le getter des mains des joueurs, un tableau de booléens de forme (K, joueurs, 52).
+        """
+        return self.__hands
+
+    @property
+    def trick_rank(self):
+        """
+        Le getter du rang de la plus forte carte du pli en cours de chaque manche (-1 si le pli est vide).
+        """
+        return self.__trick_rank
+
+    @property
+    def trick_number_of_cards(self):
+        """
+        Le getter du nombre de cartes demandées pour le pli en cours de chaque manche.
+        """
+        return self.__trick_number_of_cards
+
+    @property
+    def current_player(self):
+        """
+        Le getter de l'indice du joueur dont c'est le tour, dans chaque manche.
+        """
+        return self.__current_player
+
+    @property
+    def turns_without_plays(self):
+        """
+        Le getter du nombre de tours consécutifs sans cartes jouées, dans chaque manche.
+        """
+        return self.__turns_without_plays
+
+    @property
+    def positions(self):
+        """
+        Le getter des places d'arrivée des joueurs de chaque manche (0 pour le président, -1 pour un joueur qui a
+        encore des cartes).
+        """
+        return self.__positions
+
+    @property
+    def is_ended(self):
+        """
+        Le getter du tableau de booléens qui indique quelles manches sont terminées.
+        """
+        return self.__is_ended
+
+    def rank_counts(self) -> np.ndarray:
+        """
+        Retourne le nombre de cartes de chaque rang dans la main du joueur courant de chaque manche, de forme (K, 13).
+        """
+        return self.__rank_counts[self.__games, self.__current_player]
+
+    def allowed_ranks(self, counts: np.ndarray = None) -> np.ndarray:
+        """
+        Retourne le masque (K, 13) des rangs que le joueur courant de chaque manche peut jouer, équivalent vectorisé
+        de Player.get_cards_allowed_to_play : si le pli est vide, tous les rangs de sa main, sinon les rangs
+        supérieurs à la plus forte carte du pli dont il a au moins autant de cartes que le pli en demande.
+        Les nombres de cartes par rang du joueur courant peuvent être fournis s'ils ont déjà été calculés.
+        """
+        counts = self.rank_counts() if counts is None else counts
+        ranks = np.arange(NUMBER_OF_RANKS)
+        return (counts >= np.maximum(self.__trick_number_of_cards, 1)[:, None]) & \
+            (ranks[None, :] > self.__trick_rank[:, None])
+
+    def is_turn_ended(self) -> np.ndarray:
+        """
+        Retourne le masque des manches dont le tour est terminé, équivalent vectorisé de PresidentGame.is_turn_ended.
+        """
+        return (self.__trick_rank >= 0) & \
+            ((self.__turns_without_plays >= self.__number_of_players - self.__players_without_card)
+             | (self.__trick_rank == TWO_RANK))
+
+    def step(self) -> None:
+        """
+        Fait jouer un coup au joueur courant de chaque manche en cours, puis termine le tour ou la manche s'il y a lieu
+        et passe la main au joueur suivant.
+        """
+        active = ~self.__is_ended
+        games = self.__games
+        current_player = self.__current_player
+        counts = self.rank_counts()
+        allowed = self.allowed_ranks(counts)
+        is_trick_empty = self.__trick_rank < 0
+
+        # choisit un rang au hasard parmi ceux qui sont autorisés
+        rank_scores = np.where(allowed, self.__random.random(allowed.shape), -1.0)
+        rank = np.argmax(rank_scores, axis=1)
+        rank_count = counts[games, rank]
+        has_allowed = allowed.any(axis=1)
+
+        # nombre de cartes jouées : sur un pli vide, un sous-ensemble non vide des cartes du rang tiré uniformément,
+        # sinon le nombre demandé, avec une chance sur (combinaisons + 1) de passer comme AIPlayer
+        subsets = self.__random.integers(1, 2 ** np.maximum(rank_count, 1))
+        subset_sizes = _SUBSET_SIZES[subsets]
+        number_of_combinations = _COMBINATIONS[rank_count, np.minimum(self.__trick_number_of_cards, 4)]
+        skip_draw = self.__random.integers(0, number_of_combinations + 1)
+        number_of_cards = np.where(is_trick_empty, subset_sizes, self.__trick_number_of_cards)
+        plays = active & has_allowed & (is_trick_empty | (skip_draw < number_of_combinations))
+
+        # choisit au hasard les couleurs des cartes jouées parmi celles du rang disponibles dans la main
+        suit_codes = rank[:, None] * NUMBER_OF_SUITS + np.arange(NUMBER_OF_SUITS)[None, :]
+        available = self.__hands[games[:, None], current_player[:, None], suit_codes]
+        suit_order = np.argsort(np.where(available, self.__random.random(available.shape), 2.0), axis=1)
+        chosen = np.zeros_like(available)
+        chosen[games[:, None], suit_order] = np.arange(NUMBER_OF_SUITS)[None, :] < number_of_cards[:, None]
+        chosen &= plays[:, None]
+
+        # joue les cartes
+        self.__hands[games[:, None], current_player[:, None], suit_codes] &= ~chosen
+        number_of_cards_played = np.where(plays, number_of_cards, 0)
+        self.__rank_counts[games, current_player, rank] -= number_of_cards_played
+        self.__hand_sizes[games, current_player] -= number_of_cards_played
+        self.__trick_number_of_cards = np.where(plays & is_trick_empty, number_of_cards,
+                                                self.__trick_number_of_cards)
+        self.__trick_rank = np.where(plays, rank, self.__trick_rank)
+        self.__trick_last_player = np.where(plays, current_player, self.__trick_last_player)
+        self.__turns_without_plays = np.where(plays, 0, self.__turns_without_plays + active)
+
+        # le joueur qui n'a plus de cartes obtient sa place d'arrivée
+        hand_sizes = self.__hand_sizes
+        finished = plays & (hand_sizes[games, current_player] == 0)
+        self.__positions[games[finished], current_player[finished]] = self.__players_without_card[finished]
+        self.__players_without_card = self.__players_without_card + finished
+
+        # la manche est finie quand un seul joueur a encore des cartes : il est le trou
+        set_ended = active & (self.__players_without_card == self.__number_of_players - 1)
+        last_players = np.argmax(hand_sizes > 0, axis=1)
+        self.__positions[games[set_ended], last_players[set_ended]] = self.__number_of_players - 1
+        self.__is_ended = self.__is_ended | set_ended
+
+        # fin du tour : le dernier joueur à avoir posé des cartes ouvre le tour suivant (ou le suivant s'il est sorti)
+        turn_ended = active & ~set_ended & self.is_turn_ended()
+        next_from_trick = self._next_player_with_cards(self.__trick_last_player, hand_sizes, 0)
+        next_in_turn = self._next_player_with_cards(current_player, hand_sizes, 1)
+        self.__current_player = np.where(turn_ended, next_from_trick,
+                                         np.where(active & ~set_ended, next_in_turn, current_player))
+        self.__trick_rank = np.where(turn_ended, -1, self.__trick_rank)
+        self.__trick_number_of_cards = np.where(turn_ended, 0, self.__trick_number_of_cards)
+        self.__trick_last_player = np.where(turn_ended, -1, self.__trick_last_player)
+        self.__turns_without_plays = np.where(turn_ended, 0, self.__turns_without_plays)
+
+    def _next_player_with_cards(self, players: np.ndarray, hand_sizes: np.ndarray, first_offset: int) -> np.ndarray:
+        """
+        Retourne, pour chaque manche, le premier joueur qui a encore des cartes à partir de l'indice
+        players + first_offset, en tournant dans le sens du jeu.
+        """
+        offsets = np.arange(first_offset, first_offset + self.__number_of_players)
+        candidates = (players[:, None] + offsets[None, :]) % self.__number_of_players
+        has_cards = hand_sizes[self.__games[:, None], candidates] > 0
+        return candidates[self.__games, np.argmax(has_cards, axis=1)]
+
+    def run(self) -> np.ndarray:
+        """
+        Joue toutes les manches jusqu'à leur fin et retourne les places d'arrivée des joueurs, de forme (K, joueurs).
+        """
+        while not self.__is_ended.all():
+            self.step()
+        return self.__positions
+
+    def roles(self) -> list[list[str]]:
+        """
+        Retourne, pour chaque manche terminée, le rôle de chaque joueur (constant.ROLES), None sinon.
+        """
+        roles = constant.ROLES[self.__number_of_players]
+        return [[roles[position] if position >= 0 else None for position in game_positions]
+                for game_positions in self.__positions.tolist()]
@@ -0,0 +1,254 @@
+import argparse
+import json
+import platform
+import random
+import string
+import sys
+import time
+import timeit
+
+from controller import PresidentGameController
+from model import AIPlayer, Card, Cards, Deck, PresidentGame, Trick
+from simulation import play_game
+
+try:
+    from dealing import BulkDealer
+except ImportError:
+    BulkDealer = None
+
+# Mesures de performance des chemins critiques du modèle. Chaque mesure est une fonction qui prépare ses données (avec
+# une graine fixe) et retourne l'opération à chronométrer ; le résultat est la durée d'une opération, en secondes.
+
+
+def _hand(seed: int, number_of_cards: int = 13) -> Cards:
+    """
+    Retourne une main triée de number_of_cards cartes tirées au hasard.
+    """
+    deck = Deck(random.Random(seed))
+    deck.shuffle()
+    cards = Cards(deck.cards[:number_of_cards])
+    cards.sort()
+    return cards
+
+
+def _trick(cards: list) -> Trick:
+    """
+    Retourne un pli sur lequel ont été posées les cartes données en paramètre.
+    """
+    trick = Trick()
+    trick.add_cards(Cards(cards), 0)
+    return trick
+
+
+def bench_card_comparisons():
+    """
+    Comparaisons (<, ==) entre cartes.
+    """
+    cards = list(Deck().cards)
+    pairs = list(zip(cards, cards[1:] + cards[:1]))
+
+    def operation():
+        for first, second in pairs:
+            first < second
+            first == second
+    return operation, len(pairs)
+
+
+def bench_cards_contains():
+    """
+    Test d'appartenance d'une carte à une main de 13 cartes (Cards.__contains__).
+    """
+    hand = _hand(0)
+    cards = list(Deck().cards)
+
+    def operation():
+        for card in cards:
+            card in hand
+    return operation, len(cards)
+
+
+def bench_cards_get_as_dict():
+    """
+    Regroupement par valeur des cartes d'une main (Cards.get_as_dict).
+    """
+    hand = _hand(1)
+
+    def operation():
+        hand.get_as_dict()
+    return operation, 1
+
+
+def bench_get_cards_allowed_to_play():
+    """
+    Cartes autorisées sur un pli vide, un pli simple et un pli double (Player.get_cards_allowed_to_play).
+    """
+    player = AIPlayer("IA", random.Random(2))
+    player.add_to_hand(_hand(2))
+    tricks = [Trick(), _trick([Card('7', '♡')]), _trick([Card('5', '♡'), Card('5', '♤')])]
+
+    def operation():
+        for trick in tricks:
+            player.get_cards_allowed_to_play(trick)
+    return operation, len(tricks)
+
+
+def bench_random_cards_to_play():
+    """
+    Choix des cartes d'une IA aléatoire sur les mêmes plis (AIPlayer.random_cards_to_play).
+    """
+    player = AIPlayer("IA", random.Random(3))
+    player.add_to_hand(_hand(3))
+    tricks = [Trick(), _trick([Card('7', '♡')]), _trick([Card('5', '♡'), Card('5', '♤')])]
+
+    def operation():
+        for trick in tricks:
+            player.random_cards_to_play(trick)
+    return operation, len(tricks)
+
+
+def bench_distribute():
+    """
+    Mélange et distribution des cartes entre 4 joueurs (PresidentGame.distribute).
+    """
+    game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)], rng=random.Random(4))
+
+    def operation():
+        for player in game.players:
+            player.clear_hand()
+        game.distribute()
+    return operation, 1
+
+
+def bench_distribute_bulk():
+    """
+    Distribution des cartes entre 4 joueurs par lots calculés avec NumPy (dealing.BulkDealer).
+    """
+    game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)],
+                         dealer=BulkDealer(4, seed=4))
+
+    def operation():
+        for player in game.players:
+            player.clear_hand()
+        game.distribute()
+    return operation, 1
+
+
+def bench_get_game_dto():
+    """
+    Construction du DTO d'une partie à 4 joueurs (PresidentGameController.get_game_dto).
+    """
+    controller = PresidentGameController([AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)],
+                                         auto_ai=False)
+    for _ in range(10):
+        controller.ai_step()
+
+    def operation():
+        controller.get_game_dto()
+    return operation, 1
+
+
+def _bench_full_game(number_of_players: int):
+    """
+    Retourne la mesure d'une partie complète d'une manche entre number_of_players IA aléatoires.
+    """
+    def bench():
+        game_random = random.Random(number_of_players)
+
+        def operation():
+            players = [AIPlayer(f"IA {index}", game_random) for index in range(number_of_players)]
+            play_game(PresidentGame(players, 1, game_random))
+        return operation, 1
+    return bench
+
+
+BENCHMARKS = {
+    "card_comparisons": bench_card_comparisons,
+    "cards_contains": bench_cards_contains,
+    "cards_get_as_dict": bench_cards_get_as_dict,
+    "get_cards_allowed_to_play": bench_get_cards_allowed_to_play,
+    "random_cards_to_play": bench_random_cards_to_play,
+    "distribute": bench_distribute,
+    **({"distribute_bulk": bench_distribute_bulk} if BulkDealer is not None else {}),
+    "get_game_dto": bench_get_game_dto,
+    **{f"full_game_{number_of_players}_players": _bench_full_game(number_of_players)
+       for number_of_players in range(3, 7)}
+}
+
+
+def run(names: list[string] = None, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """
+    Exécute les mesures dont les noms sont donnés en paramètre (par défaut, toutes) et retourne les résultats sous
+    forme d'un dictionnaire sérialisable en JSON. Chaque mesure est répétée repeat fois, sur au moins min_time secondes
+    ; la durée retenue est la plus petite, la moins perturbée par le reste du système.
+    """
+    results = {}
+    for name in (BENCHMARKS if names is None else names):
+        operation, operations_per_call = BENCHMARKS[name]()
+        timer = timeit.Timer(operation)
+        number, _ = timer.autorange()
+        number = max(number, int(number * min_time / 0.2))
+        durations = timer.repeat(repeat, number)
+        results[name] = {
+            "seconds_per_operation": min(durations) / (number * operations_per_call),
+            "operations": number * operations_per_call
+        }
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> list[dict]:
+    """
+    Compare deux résultats de run et retourne, pour chaque mesure présente dans les deux, le rapport des durées
+    (current / baseline) et si c'est une régression, i.e si la mesure a ralenti de plus de threshold (10 % par défaut).
+    """
+    comparisons = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        ratio = result["seconds_per_operation"] / baseline["results"][name]["seconds_per_operation"]
+        comparisons.append({"name": name, "ratio": ratio, "regression": ratio > 1 + threshold})
+    return comparisons
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Mesure les performances des chemins critiques du jeu.")
+    parser.add_argument("names", nargs="*", help="mesures à exécuter (par défaut, toutes)")
+    parser.add_argument("--output", default=None, help="fichier JSON où écrire les résultats")
+    parser.add_argument("--compare", default=None, metavar="BASELINE",
+                        help="fichier JSON de résultats de référence auxquels comparer les résultats")
+    parser.add_argument("--current", default=None,
+                        help="avec --compare, fichier JSON de résultats à comparer, au lieu d'exécuter les mesures")
+    parser.add_argument("--threshold", type=float, default=0.1, help="ralentissement toléré (0.1 pour 10 %%)")
+    parser.add_argument("--list", action="store_true", help="affiche la liste des mesures")
+    arguments = parser.parse_args()
+    if arguments.list:
+        print("\n".join(BENCHMARKS))
+        sys.exit(0)
+    unknown_names = set(arguments.names) - set(BENCHMARKS)
+    if unknown_names:
+        parser.error(f"mesures inconnues : {', '.join(sorted(unknown_names))}")
+
+    if arguments.current is not None:
+        with open(arguments.current) as file:
+            current_results = json.load(file)
+    else:
+        current_results = run(arguments.names or None)
+        for benchmark_name, benchmark_result in current_results["results"].items():
+            print(f"{benchmark_name:<30} {benchmark_result['seconds_per_operation'] * 1e6:>12.3f} µs")
+    if arguments.output is not None:
+        with open(arguments.output, "w") as file:
+            json.dump(current_results, file, indent=2)
+
+    if arguments.compare is not None:
+        with open(arguments.compare) as file:
+            baseline_results = json.load(file)
+        regressions = 0
+        for comparison in compare(baseline_results, current_results, arguments.threshold):
+            flag = "RÉGRESSION" if comparison["regression"] else ""
+            print(f"{comparison['name']:<30} x{comparison['ratio']:.2f} {flag}")
+            regressions += comparison["regression"]
+        sys.exit(1 if regressions else 0)
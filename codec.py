@@ -0,0 +1,395 @@
+import argparse
+import json
+import random
+import string
+import time
+
+from constant import CODE_STRINGS, FIRST, SECOND, NEUTRAL, BEFORE_LAST, LAST
+
+# Format binaire compact du DTO de PresidentGameController.get_game_dto et des requêtes de process, équivalent exact de
+# leur forme en dictionnaire :
+# - une carte est un octet, son code (rang * 4 + couleur),
+# - une main triée par code (ce qui est toujours le cas dans le jeu) est un masque de 52 bits sur 7 octets ; une main
+#   dans un autre ordre est une liste d'octets, pour que le décodage redonne exactement la même liste,
+# - les entiers positifs sont des varints (7 bits par octet, le bit de poids fort indiquant qu'un octet suit),
+# - les chaînes sont encodées en UTF-8, précédées de leur longueur,
+# - les rôles connus sont un octet, les autres sont écrits en toutes lettres.
+# Le premier octet indique le type du message : DTO_MESSAGE ou REQUEST_MESSAGE.
+
+DTO_MESSAGE = 1
+REQUEST_MESSAGE = 2
+
+_CARD_CODES = {card: code for code, card in enumerate(CODE_STRINGS)}
+_ROLES = [None, FIRST, SECOND, NEUTRAL, BEFORE_LAST, LAST]
+_ROLE_INDEXES = {role: index for index, role in enumerate(_ROLES)}
+# octet qui précède un rôle ou un dernier joueur écrit en toutes lettres
+_EXPLICIT = 255
+
+_HAND_MASK = 0
+_HAND_LIST = 1
+_MASK_BYTES = 7
+# _BYTE_CARDS[position][byte] : les cartes codées par l'octet byte, à la place position, du masque d'une main
+_BYTE_CARDS = [[tuple(CODE_STRINGS[position * 8 + bit] for bit in range(8)
+                      if byte >> bit & 1 and position * 8 + bit < len(CODE_STRINGS)) for byte in range(256)]
+               for position in range(_MASK_BYTES)]
+
+# drapeaux du DTO
+_IS_TRADE = 1
+_IS_ENDED = 2
+_EXPLICIT_CURRENT_PLAYER = 4
+_HAS_SEQUENCE = 8
+# drapeaux des requêtes
+_SKIP = 1
+_HAS_CARDS = 2
+_HAS_TABLE = 4
+_HAS_SKIP = 8
+
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    """
+    Écrit un entier positif sous forme de varint à la fin de buffer.
+    """
+    if value < 0:
+        raise ValueError("Seuls les entiers positifs peuvent être encodés.")
+    while value >= 0x80:
+        buffer.append(value & 0x7F | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _write_string(buffer: bytearray, value: string) -> None:
+    """
+    Écrit une chaîne à la fin de buffer : sa longueur en octets, puis son encodage UTF-8.
+    """
+    encoded = value.encode()
+    write_varint(buffer, len(encoded))
+    buffer += encoded
+
+
+def _write_cards(buffer: bytearray, cards: list) -> None:
+    """
+    Écrit une liste de cartes à la fin de buffer : leur nombre, puis un octet par carte.
+    """
+    write_varint(buffer, len(cards))
+    try:
+        buffer += bytes(_CARD_CODES[card] for card in cards)
+    except KeyError as error:
+        raise ValueError(f"La carte {error.args[0]} n'existe pas.") from None
+
+
+def _write_hand(buffer: bytearray, hand: list) -> None:
+    """
+    Écrit une main à la fin de buffer : un masque si elle est triée par code sans doublon, une liste de cartes sinon.
+    """
+    try:
+        codes = [_CARD_CODES[card] for card in hand]
+    except KeyError as error:
+        raise ValueError(f"La carte {error.args[0]} n'existe pas.") from None
+    mask = 0
+    previous = -1
+    for code in codes:
+        # une main qui n'est pas triée par code, ou qui contient des doublons, est écrite carte par carte
+        if code <= previous:
+            buffer.append(_HAND_LIST)
+            write_varint(buffer, len(codes))
+            buffer += bytes(codes)
+            return
+        mask |= 1 << code
+        previous = code
+    buffer.append(_HAND_MASK)
+    buffer += mask.to_bytes(_MASK_BYTES, 'little')
+
+
+def _write_role(buffer: bytearray, role) -> None:
+    """
+    Écrit un rôle à la fin de buffer : son indice s'il est connu, la chaîne sinon.
+    """
+    index = _ROLE_INDEXES.get(role)
+    if index is not None:
+        buffer.append(index)
+    else:
+        buffer.append(_EXPLICIT)
+        _write_string(buffer, role)
+
+
+def _write_player(buffer: bytearray, player: dict) -> None:
+    """
+    Écrit le dictionnaire d'un joueur (nom, main, rôle) à la fin de buffer.
+    """
+    _write_string(buffer, player["name"])
+    _write_hand(buffer, player["hand"])
+    _write_role(buffer, player["role"])
+
+
+class _Reader:
+    """
+    Lit, dans l'ordre, les éléments d'un message binaire.
+    """
+
+    def __init__(self, data: bytes):
+        """
+        Le constructeur de la classe _Reader.
+        """
+        self.data = data
+        self.position = 0
+
+    def byte(self) -> int:
+        """
+        Lit un octet.
+        """
+        if self.position >= len(self.data):
+            raise IndexError("Le message est tronqué.")
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def varint(self) -> int:
+        """
+        Lit un entier encodé sous forme de varint.
+        """
+        value = self.byte()
+        if value < 0x80:
+            return value
+        value &= 0x7F
+        shift = 7
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                return value
+            shift += 7
+
+    def bytes(self, length: int) -> bytes:
+        """
+        Lit length octets.
+        """
+        start = self.position
+        self.position += length
+        if self.position > len(self.data):
+            raise IndexError("Le message est tronqué.")
+        return self.data[start:self.position]
+
+    def string(self) -> string:
+        """
+        Lit une chaîne.
+        """
+        return self.bytes(self.varint()).decode()
+
+    def cards(self) -> list:
+        """
+        Lit une liste de cartes.
+        """
+        return [CODE_STRINGS[code] for code in self.bytes(self.varint())]
+
+    def hand(self) -> list:
+        """
+        Lit une main.
+        """
+        if self.byte() == _HAND_MASK:
+            hand = []
+            for position, byte in enumerate(self.bytes(_MASK_BYTES)):
+                if byte:
+                    hand.extend(_BYTE_CARDS[position][byte])
+            return hand
+        return self.cards()
+
+    def role(self):
+        """
+        Lit un rôle.
+        """
+        index = self.byte()
+        return self.string() if index == _EXPLICIT else _ROLES[index]
+
+    def player(self) -> dict:
+        """
+        Lit le dictionnaire d'un joueur.
+        """
+        return {"name": self.string(), "hand": self.hand(), "role": self.role()}
+
+
+def encode_game_dto(game_dto: dict) -> bytes:
+    """
+    Retourne la forme binaire du DTO donné en paramètre (voir PresidentGameController.get_game_dto).
+    Lève ValueError si le DTO contient une carte qui n'existe pas ou un entier négatif.
+    """
+    buffer = bytearray((DTO_MESSAGE,))
+    players = game_dto["players"]
+    current_player_index = game_dto["current_player_index"]
+    flags = 0
+    if game_dto["is_trade"]:
+        flags |= _IS_TRADE
+    if game_dto["is_ended"]:
+        flags |= _IS_ENDED
+    # le joueur courant n'est écrit que s'il diffère de celui de la liste des joueurs
+    if not 0 <= current_player_index < len(players) or game_dto["current_player"] != players[current_player_index]:
+        flags |= _EXPLICIT_CURRENT_PLAYER
+    if "sequence" in game_dto:
+        flags |= _HAS_SEQUENCE
+    buffer.append(flags)
+    write_varint(buffer, current_player_index)
+    write_varint(buffer, game_dto["turns_without_play"])
+    write_varint(buffer, game_dto["current_set"])
+    if flags & _HAS_SEQUENCE:
+        write_varint(buffer, game_dto["sequence"])
+
+    write_varint(buffer, len(players))
+    for player in players:
+        _write_player(buffer, player)
+    if flags & _EXPLICIT_CURRENT_PLAYER:
+        _write_player(buffer, game_dto["current_player"])
+
+    current_trick = game_dto["current_trick"]
+    _write_cards(buffer, current_trick["cards"])
+    write_varint(buffer, current_trick["number_of_cards"])
+    # le dernier joueur du pli est écrit par son indice (plus 1, 0 pour aucun joueur), ou en toutes lettres
+    last_player = current_trick["last_player"]
+    if last_player is None:
+        buffer.append(0)
+    else:
+        last_player_index = next((index for index, player in enumerate(players)
+                                  if player["name"] == last_player), None)
+        if last_player_index is not None and last_player_index + 1 < _EXPLICIT:
+            buffer.append(last_player_index + 1)
+        else:
+            buffer.append(_EXPLICIT)
+            _write_string(buffer, last_player)
+    return bytes(buffer)
+
+
+def decode_game_dto(data: bytes) -> dict:
+    """
+    Retourne le DTO dont la forme binaire est donnée en paramètre, identique à celui qui a été encodé.
+    """
+    reader = _Reader(data)
+    if reader.byte() != DTO_MESSAGE:
+        raise ValueError("Le message n'est pas un DTO.")
+    flags = reader.byte()
+    current_player_index = reader.varint()
+    turns_without_play = reader.varint()
+    current_set = reader.varint()
+    sequence = reader.varint() if flags & _HAS_SEQUENCE else None
+    players = [reader.player() for _ in range(reader.varint())]
+    current_player = reader.player() if flags & _EXPLICIT_CURRENT_PLAYER \
+        else dict(players[current_player_index], hand=list(players[current_player_index]["hand"]))
+    trick_cards = reader.cards()
+    number_of_cards = reader.varint()
+    last_player_index = reader.byte()
+    if last_player_index == _EXPLICIT:
+        last_player = reader.string()
+    else:
+        last_player = players[last_player_index - 1]["name"] if last_player_index > 0 else None
+    game_dto = {
+        "current_player_index": current_player_index,
+        "current_player": current_player,
+        "turns_without_play": turns_without_play,
+        "current_set": current_set,
+        "is_trade": bool(flags & _IS_TRADE),
+        "current_trick": {
+            "cards": trick_cards,
+            "number_of_cards": number_of_cards,
+            "last_player": last_player
+        },
+        "players": players,
+        "is_ended": bool(flags & _IS_ENDED)
+    }
+    if sequence is not None:
+        game_dto["sequence"] = sequence
+    return game_dto
+
+
+def encode_request(request: dict) -> bytes:
+    """
+    Retourne la forme binaire de la requête donnée en paramètre (voir PresidentGameController.process), avec
+    éventuellement le numéro de la table à laquelle elle s'adresse (entrée table). Lève ValueError si la requête
+    contient d'autres entrées, une entrée skip qui n'est pas un booléen ou une carte qui n'existe pas.
+    """
+    if not set(request) <= {"skip", "cards", "table"}:
+        raise ValueError("Seules les entrées 'skip', 'cards' et 'table' peuvent être encodées.")
+    flags = 0
+    if "skip" in request:
+        if not isinstance(request["skip"], bool):
+            raise ValueError("L'entrée 'skip' doit être vraie ou fausse.")
+        flags |= _HAS_SKIP | (_SKIP if request["skip"] else 0)
+    if "cards" in request:
+        flags |= _HAS_CARDS
+    if "table" in request:
+        flags |= _HAS_TABLE
+    buffer = bytearray((REQUEST_MESSAGE, flags))
+    if flags & _HAS_TABLE:
+        write_varint(buffer, request["table"])
+    if flags & _HAS_CARDS:
+        _write_cards(buffer, request["cards"])
+    return bytes(buffer)
+
+
+def decode_request(data: bytes) -> dict:
+    """
+    Retourne la requête dont la forme binaire est donnée en paramètre.
+    """
+    reader = _Reader(data)
+    if reader.byte() != REQUEST_MESSAGE:
+        raise ValueError("Le message n'est pas une requête.")
+    flags = reader.byte()
+    request = {}
+    if flags & _HAS_TABLE:
+        request["table"] = reader.varint()
+    if flags & _HAS_SKIP:
+        request["skip"] = bool(flags & _SKIP)
+    if flags & _HAS_CARDS:
+        request["cards"] = reader.cards()
+    return request
+
+
+def benchmark(number_of_games: int = 100, number_of_players: int = 4, number_of_sets: int = 3, seed: int = 0) -> dict:
+    """
+    Compare le format binaire à JSON sur les DTO de toutes les positions de number_of_games parties entre IA :
+    taille moyenne d'un DTO, et durées d'encodage et de décodage de tous les DTO, en secondes.
+    """
+    from controller import PresidentGameController
+    from model import AIPlayer
+
+    game_random = random.Random(seed)
+    game_dtos = []
+    for _ in range(number_of_games):
+        players = [AIPlayer(f"IA {index + 1}", game_random) for index in range(number_of_players)]
+        controller = PresidentGameController(players, number_of_sets, auto_ai=False)
+        game_dtos.append(controller.get_game_dto())
+        while controller.ai_step():
+            game_dtos.append(controller.get_game_dto())
+
+    def measure(function, values):
+        start = time.perf_counter()
+        results = [function(value) for value in values]
+        return results, time.perf_counter() - start
+
+    json_messages, json_encoding = measure(lambda dto: json.dumps(dto, ensure_ascii=False).encode(), game_dtos)
+    _, json_decoding = measure(json.loads, json_messages)
+    binary_messages, binary_encoding = measure(encode_game_dto, game_dtos)
+    decoded_dtos, binary_decoding = measure(decode_game_dto, binary_messages)
+    if decoded_dtos != game_dtos:
+        raise AssertionError("Le format binaire ne redonne pas les DTO d'origine.")
+    return {
+        "dtos": len(game_dtos),
+        "json_bytes": sum(map(len, json_messages)) / len(game_dtos),
+        "binary_bytes": sum(map(len, binary_messages)) / len(game_dtos),
+        "json_encoding": json_encoding,
+        "json_decoding": json_decoding,
+        "binary_encoding": binary_encoding,
+        "binary_decoding": binary_decoding
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare le format binaire des DTO à JSON.")
+    parser.add_argument("--games", type=int, default=100, help="nombre de parties jouées pour produire les DTO")
+    parser.add_argument("--players", type=int, default=4, choices=range(3, 7), help="nombre de joueurs (3 à 6)")
+    parser.add_argument("--sets", type=int, default=3, help="nombre de manches par partie")
+    arguments = parser.parse_args()
+    result = benchmark(arguments.games, arguments.players, arguments.sets)
+    print(f"{result['dtos']} DTO")
+    print(f"JSON    : {result['json_bytes']:.0f} octets, "
+          f"encodage {result['json_encoding'] * 1e6 / result['dtos']:.1f} µs, "
+          f"décodage {result['json_decoding'] * 1e6 / result['dtos']:.1f} µs")
+    print(f"Binaire : {result['binary_bytes']:.0f} octets, "
+          f"encodage {result['binary_encoding'] * 1e6 / result['dtos']:.1f} µs, "
+          f"décodage {result['binary_decoding'] * 1e6 / result['dtos']:.1f} µs")
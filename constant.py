@@ -16,3 +16,14 @@ ROLES = {
     6: [FIRST, SECOND, NEUTRAL, NEUTRAL, BEFORE_LAST, LAST]
 }
 
+
+# encodage des cartes sous forme d'entiers : code = rang * nombre de couleurs + couleur
+NUMBER_OF_SUITS = len(SUITS)
+NUMBER_OF_CARDS = len(VALUES) * NUMBER_OF_SUITS
+VALUE_RANKS = {value: rank for rank, value in enumerate(VALUES)}
+SUIT_INDEXES = {suit: index for index, suit in enumerate(SUITS)}
+# tables précalculées indexées par le code de la carte
+CODE_RANKS = [code // NUMBER_OF_SUITS for code in range(NUMBER_OF_CARDS)]
+CODE_SUITS = [code % NUMBER_OF_SUITS for code in range(NUMBER_OF_CARDS)]
+CODE_STRINGS = [VALUES[CODE_RANKS[code]] + SUITS[CODE_SUITS[code]] for code in range(NUMBER_OF_CARDS)]
+TWO_RANK = VALUE_RANKS['2']
@@ -1,4 +1,7 @@
-from model import PresidentGame, Card, Player, AIPlayer, Cards
+from collections import deque
+
+from model import PresidentGame, Player, AIPlayer, Cards, mask_codes
+from constant import CODE_STRINGS
 import utils
 from exception import NotInRulesException, WrongRequestException
 
@@ -9,18 +12,45 @@ class PresidentGameController:
     modèle en conséquence et retourne les informations nécessaires à l'affichage graphique à la vue (un DTO).
     """
 
-    def __init__(self, players: list[Player] = None, number_of_sets: int = 1):
+    def __init__(self, players: list[Player] = None, number_of_sets: int = 1, auto_ai: bool = True,
+                 events_kept: int = 256):
         """
         Le constructeur de la classe PresidentGameController.
+        Si auto_ai est faux, les tours des IA ne sont pas joués automatiquement : c'est à l'appelant de les faire jouer
+        un par un avec ai_step (par exemple pour ne pas bloquer un serveur qui gère plusieurs tables).
+        Le contrôleur garde les events_kept derniers événements de la partie (voir events_since).
         """
         self.__game = PresidentGame(players, number_of_sets)
+        self.__auto_ai = auto_ai
+        # vérification des requêtes, qui garde les coups autorisés de la position courante
+        self.__validator = utils.MoveValidator()
+        # numéro du dernier événement, événements pas encore retournés par take_delta et derniers événements
+        self.__sequence = 0
+        self.__pending_events = []
+        self.__events = deque(maxlen=events_kept)
         # effectue les premiers tours des intelligences artificielles si c'est à elles de jouer
-        self.ai_turn()
+        if self.__auto_ai:
+            self.ai_turn()
+
+    @property
+    def game(self) -> PresidentGame:
+        """
+        Le getter de la partie pilotée par le contrôleur.
+        """
+        return self.__game
+
+    @property
+    def sequence(self) -> int:
+        """
+        Le getter du numéro du dernier événement de la partie.
+        """
+        return self.__sequence
 
     def get_game_dto(self):
         """
         Retourne un Data Transfer Object sous forme d'un dictionnaire, contenant l'information nécessaire et suffisante
-        à l'affichage
+        à l'affichage, ainsi que le numéro du dernier événement qu'il prend en compte (sequence) : les événements
+        suivants s'appliquent à partir de cet état.
         """
         game = self.__game
         players = game.players
@@ -43,7 +73,8 @@ class PresidentGameController:
                 "last_player": players[trick_last_player_index].name if trick_last_player_index >= 0 else None
             },
             "players": [],
-            "is_ended": game.is_game_ended()
+            "is_ended": game.is_game_ended(),
+            "sequence": self.__sequence
         }
         for player in players:
             game_dto["players"].append(
@@ -54,99 +85,190 @@ class PresidentGameController:
                 })
         return game_dto
 
-    def process(self, request: dict = None):
+    def take_delta(self) -> dict:
+        """
+        Retourne les événements de la partie qui n'ont pas encore été retournés, sous forme d'un dictionnaire :
+        - sequence : le numéro du dernier événement,
+        - events : la liste des événements, dans l'ordre, chacun avec son numéro (sequence) et son type (type) :
+          - play et skip : le joueur (player) a joué des cartes (cards) ou passé,
+          - out : le joueur (player) n'a plus de cartes,
+          - trick_reset : le tour est terminé, le pli est vidé,
+          - set_end : la manche est terminée, avec le rôle de chaque joueur (roles),
+          - deal : une nouvelle manche commence, avec la main de chaque joueur (hands),
+          - trade : le joueur (player) a mis des cartes (cards) à l'échange,
+          - trade_done : l'échange est fait, avec les cartes reçues par chaque joueur (received),
+        - current_player_index : l'indice du joueur dont c'est le tour.
+        C'est beaucoup plus compact qu'un DTO complet, qui reste disponible avec get_game_dto.
+        """
+        events = self.__pending_events
+        self.__pending_events = []
+        return {
+            "sequence": self.__sequence,
+            "events": events,
+            "current_player_index": self.__game.current_player_index
+        }
+
+    def events_since(self, sequence: int):
+        """
+        Retourne la liste des événements de numéro supérieur à sequence, ou None s'ils ne sont plus tous gardés par le
+        contrôleur (il faut alors repartir d'un DTO complet).
+        """
+        if sequence >= self.__sequence:
+            return []
+        if sequence < self.__sequence - len(self.__events):
+            return None
+        return list(self.__events)[sequence - self.__sequence:]
+
+    def __add_event(self, event: dict) -> None:
+        """
+        Numérote l'événement donné en paramètre et l'ajoute aux événements de la partie.
+        """
+        self.__sequence += 1
+        event["sequence"] = self.__sequence
+        self.__pending_events.append(event)
+        self.__events.append(event)
+
+    def __apply_move(self, cards: Cards) -> None:
+        """
+        Applique le coup du joueur courant (voir PresidentGame.apply_move) et en déduit les événements de la partie.
+        """
+        game = self.__game
+        player_index = game.current_player_index
+        cards_str = [str(card) for card in cards]
+        if game.is_trade:
+            hand_masks = [player.hand.mask for player in game.players]
+            game.apply_move(cards)
+            self.__add_event({"type": "trade", "player": player_index, "cards": cards_str})
+            if not game.is_trade:
+                self.__add_event({"type": "trade_done", "received": [
+                    [CODE_STRINGS[code] for code in mask_codes(player.hand.mask & ~hand_mask)]
+                    for player, hand_mask in zip(game.players, hand_masks)]})
+            return
+
+        current_set = game.current_set
+        players_without_card = len(game.players_without_card)
+        game.apply_move(cards)
+        self.__add_event({"type": "play", "player": player_index, "cards": cards_str} if len(cards) != 0
+                         else {"type": "skip", "player": player_index})
+        if game.current_set != current_set:
+            self.__add_event({"type": "set_end", "roles": [player.role for player in game.players]})
+            if not game.is_game_ended():
+                self.__add_event({"type": "deal", "hands": [[str(card) for card in player.hand]
+                                                             for player in game.players]})
+            return
+        if len(game.players_without_card) != players_without_card:
+            self.__add_event({"type": "out", "player": player_index})
+        if len(game.current_trick.cards) == 0:
+            self.__add_event({"type": "trick_reset"})
+
+    def process(self, request: dict = None) -> dict:
         """
         Traite la requête envoyée par l'utilisateur et met à jour le modèle (le jeu).
+        Retourne les événements de la partie depuis le dernier appel (voir take_delta), coups des IA compris.
         """
         try:
-            # teste si la forme de la requête est bonne
-            utils.check_request(request)
-
-            # si request.skip est True, passe le tour du joueur
-            if request["skip"]:
-                # teste si le joueur a le droit de passer, d'après les règles
-                utils.check_skip(self.__game)
-                self.__game.skip_turn()
-            # sinon,
-            else:
-                # génère les cartes de la requête
-                cards = Cards()
-                for card_str in request["cards"]:
-                    cards.append(Card(card_str[0], card_str[1]))
-
-                # si le jeu en est à la phase d'échange des cartes
-                if self.__game.is_trade:
-                    # teste si l'échange est dans les règles
-                    utils.check_trade(self.__game, cards)
-                    # met les cartes à l'échange
-                    self.__game.add_cards_to_trade(cards)
-                    # met éventuellement fin à l'échange
-                    if self.__game.is_trade_over():
-                        self.__game.trade_cards()
-
-                # jouer les cartes de la requête
-                else:
-                    # teste si le coup est valable
-                    utils.check_play(self.__game, cards)
-                    self.__game.play(Cards(cards))
-
-            # passe la main au joueur suivant
-            self.__game.next_player()
-
-            # effectue les tours des IA.
-            self.ai_turn()
+            # teste la forme de la requête et si le coup est dans les règles, puis met les cartes à l'échange, les joue
+            # ou passe, passe la main au joueur suivant et effectue les tours des IA
+            self.__apply_request_move(self.__validator.validate(self.__game, request))
+            return self.take_delta()
 
         except (NotInRulesException, WrongRequestException) as error:
             raise error
 
+    def process_many(self, requests, dto: bool = False) -> dict:
+        """
+        Traite une suite de requêtes, par exemple celles d'un robot ou d'une partie enregistrée, de façon atomique :
+        chaque requête est traitée comme par process (tours des IA compris, si auto_ai est vrai), mais si l'une d'elles
+        est refusée, la partie et ses événements sont remis dans leur état d'avant la première requête, et l'exception
+        est relancée, avec l'indice de la requête refusée dans son attribut request_index. Les générateurs aléatoires
+        des IA qui ont joué entre-temps ne sont pas remis en arrière.
+        Retourne les événements de la partie depuis le dernier appel (voir take_delta), ou le DTO de la partie si dto
+        est vrai, calculés une seule fois, après la dernière requête. Avec le DTO, les événements des requêtes sont
+        considérés comme transmis, mais ceux qui étaient déjà en attente avant l'appel le restent.
+        """
+        game = self.__game
+        snapshot = game.snapshot()
+        sequence = self.__sequence
+        pending_events = len(self.__pending_events)
+        # la file bornée des derniers événements perd ses plus anciens si la suite en produit trop : elle est copiée
+        events = self.__events.copy()
+        try:
+            self.__validator.validate_many(game, requests, self.__apply_request_move)
+        except (NotInRulesException, WrongRequestException):
+            game.restore(snapshot)
+            # les événements des requêtes annulées sont retirés
+            self.__events = events
+            del self.__pending_events[pending_events:]
+            self.__sequence = sequence
+            raise
+        if dto:
+            del self.__pending_events[pending_events:]
+            return self.get_game_dto()
+        return self.take_delta()
+
+    def __apply_request_move(self, cards: Cards) -> None:
+        """
+        Applique le coup d'une requête déjà vérifiée, puis effectue les tours des IA si auto_ai est vrai.
+        """
+        self.__apply_move(cards)
+        if self.__auto_ai:
+            self.ai_turn()
+
     def ai_turn(self):
         """
         Effectue le tour de jeu des différentes IA consécutives.
         """
-        # tant que le joueur courant est une intelligence artificielle, joue
-        while isinstance(self.__game.get_current_player(), AIPlayer):
-            # si le jeu est en phase d'échange, l'ia met des cartes à l'échange puis teste la fin des échanges
-            if self.__game.is_trade:
-                self.ai_trade()
-                if self.__game.is_trade_over():
-                    self.__game.trade_cards()
-            # sinon l'ia joue des cartes ou passe son tour
-            else:
-                self.ai_play()
-                if self.__game.is_turn_ended():
-                    self.end_turn()
-            # passe la main au joueur suivant
-            self.__game.next_player()
+        # tant que la partie n'est pas finie et que le joueur courant est une intelligence artificielle, joue
+        while self.ai_step():
+            pass
+
+    def is_game_ended(self) -> bool:
+        """
+        Retourne True si la partie est finie.
+        """
+        return self.__game.is_game_ended()
+
+    def is_ai_turn(self) -> bool:
+        """
+        Retourne True si la partie n'est pas finie et que c'est à une intelligence artificielle de jouer.
+        """
+        return not self.__game.is_game_ended() and isinstance(self.__game.get_current_player(), AIPlayer)
+
+    def ai_step(self) -> bool:
+        """
+        Fait jouer un seul coup à l'IA dont c'est le tour. Retourne False, sans rien faire, si ce n'est pas à une IA de
+        jouer.
+        """
+        if not self.is_ai_turn():
+            return False
+        # si le jeu est en phase d'échange, l'ia met des cartes à l'échange
+        if self.__game.is_trade:
+            self.ai_trade()
+        # sinon l'ia joue des cartes ou passe son tour
+        else:
+            self.ai_play()
+        return True
 
     def ai_play(self):
         """
         L'IA joue une carte ou passe son tour.
         """
-        # choisit une liste de cartes au hasard parmi les cartes que l'IA est autorisée à jouer.
-        cards_to_play = self.__game.get_current_player().random_cards_to_play(self.__game.current_trick)
-        # s'il n'y a pas de carte dans la liste de cartes, passe son tour.
-        if len(cards_to_play) == 0:
-            self.__game.skip_turn()
-        # sinon, joue les cartes de la liste
-        else:
-            self.__game.play(cards_to_play)
+        # choisit une liste de cartes parmi les cartes que l'IA est autorisée à jouer. S'il n'y a pas de carte dans la
+        # liste de cartes, l'IA passe son tour.
+        cards_to_play = self.__game.get_current_player().choose_cards_to_play(self.__game)
+        self.apply_ai_move(cards_to_play)
 
     def ai_trade(self):
         """
         L'IA choisit les cartes qu'elle met à l'échange.
         """
-        # choisit au hasard des cartes parmi celles que l'IA peut échanger
-        cards_to_trade = self.__game.get_current_player().random_cards_to_trade()
-        self.__game.add_cards_to_trade(cards_to_trade)
+        # choisit des cartes parmi celles que l'IA peut échanger
+        cards_to_trade = self.__game.get_current_player().choose_cards_to_trade(self.__game)
+        self.apply_ai_move(cards_to_trade)
 
-    def end_turn(self):
+    def apply_ai_move(self, cards: Cards):
         """
-        Met à jour les infos de fin de tour et, éventuellement de fin de manche, voire de fin de partie.
+        Applique le coup choisi par l'IA dont c'est le tour : met les cartes à l'échange, les joue ou passe (liste
+        vide), puis passe la main au joueur suivant. Le choix peut avoir été fait ailleurs, sur une copie de la partie.
         """
-        self.__game.end_turn()
-        if self.__game.is_set_ended():
-            self.__game.end_set()
-            if self.__game.is_game_ended():
-                self.__game.end_game()
-            else:
-                self.__game.start_set()
+        self.__apply_move(cards)
@@ -0,0 +1,161 @@
+import numpy as np
+
+import constant
+from constant import NUMBER_OF_CARDS
+from model import CARDS
+
+# Distribution des cartes en masse, pour les simulations : des milliers de decks sont mélangés en un seul appel NumPy
+# (une permutation par ligne), et les mains sont triées de la même façon, toutes à la fois.
+# Comme dans PresidentGame.distribute, la k-ième carte du deck va au joueur (k + current_player_index) % nombre de
+# joueurs : la distribution commence par le joueur qui ouvre la manche. Les mains sont donc calculées par place dans la
+# distribution (la place 0 est celle du premier servi, qui a le plus de cartes), et attribuées aux joueurs au moment de
+# la distribution, selon le joueur qui ouvre la manche.
+
+
+class DealBatch:
+    """
+    La classe DealBatch contient number_of_deals distributions à number_of_players joueurs, sous forme de tableaux :
+    - codes[k, place] : les codes des cartes de la main servie à la place donnée dans la distribution k, triés, la fin
+      de la ligne étant complétée par -1 pour les places qui ont une carte de moins,
+    - masks[k, place] : le masque de 52 bits de cette main,
+    - sizes[place] : le nombre de cartes de la main servie à chaque place.
+    """
+
+    def __init__(self, number_of_deals: int, number_of_players: int, rng: np.random.Generator = None):
+        """
+        Le constructeur de la classe DealBatch, qui mélange les decks et distribue les cartes. Le générateur aléatoire
+        peut être fourni (par défaut, un générateur NumPy sans graine).
+        """
+        if number_of_players not in constant.ROLES:
+            raise ValueError("Le jeu se joue de 3 à 6 joueurs.")
+        rng = np.random.default_rng() if rng is None else rng
+        self.__number_of_players = number_of_players
+        decks = rng.permuted(np.tile(np.arange(NUMBER_OF_CARDS, dtype=np.int8), (number_of_deals, 1)), axis=1)
+        self.__place_sizes = [len(range(place, NUMBER_OF_CARDS, number_of_players))
+                              for place in range(number_of_players)]
+        self.__codes = np.full((number_of_deals, number_of_players, self.__place_sizes[0]), -1, dtype=np.int8)
+        self.__masks = np.zeros((number_of_deals, number_of_players), dtype=np.uint64)
+        for place in range(number_of_players):
+            # la place reçoit une carte sur number_of_players, à partir de la carte d'indice place
+            hands = np.sort(decks[:, place::number_of_players], axis=1)
+            self.__codes[:, place, :hands.shape[1]] = hands
+            self.__masks[:, place] = np.bitwise_or.reduce(np.left_shift(np.uint64(1), hands.astype(np.uint64)),
+                                                          axis=1)
+        self.__rows = None
+        self.__mask_rows = None
+
+    def __len__(self) -> int:
+        """
+        Retourne le nombre de distributions.
+        """
+        return self.__codes.shape[0]
+
+    @property
+    def number_of_players(self):
+        """
+        Le getter du nombre de joueurs des distributions.
+        """
+        return self.__number_of_players
+
+    @property
+    def codes(self):
+        """
+        Le getter des codes des cartes des mains, un tableau de forme (distributions, places, cartes).
+        """
+        return self.__codes
+
+    @property
+    def masks(self):
+        """
+        Le getter des masques des mains, un tableau de forme (distributions, places).
+        """
+        return self.__masks
+
+    @property
+    def sizes(self):
+        """
+        Le getter du nombre de cartes de la main servie à chaque place.
+        """
+        return np.array(self.__place_sizes)
+
+    def hands(self, index: int, first_player_index: int = 0) -> list[list]:
+        """
+        Retourne les mains de la distribution d'indice index, joueur par joueur, sous forme de listes de cartes triées
+        (les cartes partagées de model.CARDS), quand la distribution commence par le joueur d'indice
+        first_player_index.
+        """
+        if self.__rows is None:
+            # les lignes sont converties une fois pour toutes en listes Python, plus rapides à parcourir
+            self.__rows = self.__codes.tolist()
+        places = self.__rows[index]
+        sizes = self.__place_sizes
+        number_of_players = self.__number_of_players
+        hands = []
+        for player_index in range(number_of_players):
+            place = (player_index - first_player_index) % number_of_players
+            hands.append([CARDS[code] for code in places[place][:sizes[place]]])
+        return hands
+
+    def hand_masks(self, index: int, first_player_index: int = 0) -> list[int]:
+        """
+        Retourne les masques de 52 bits des mains de la distribution d'indice index, joueur par joueur, quand la
+        distribution commence par le joueur d'indice first_player_index.
+        """
+        if self.__mask_rows is None:
+            self.__mask_rows = self.__masks.tolist()
+        places = self.__mask_rows[index]
+        number_of_players = self.__number_of_players
+        return [places[(player_index - first_player_index) % number_of_players]
+                for player_index in range(number_of_players)]
+
+    def iter_hands(self, first_player_index: int = 0):
+        """
+        Itère sur les distributions, sous la forme retournée par hands.
+        """
+        for index in range(len(self)):
+            yield self.hands(index, first_player_index)
+
+
+class BulkDealer:
+    """
+    La classe BulkDealer fournit des distributions à des parties (voir le paramètre dealer de PresidentGame), en les
+    calculant par lots de batch_size avec DealBatch. Les parties reçoivent les masques des mains (next_masks), à partir
+    desquels Cards.extend_mask remplit les mains rang par rang.
+    """
+
+    def __init__(self, number_of_players: int, batch_size: int = 4096, seed: int = None):
+        """
+        Le constructeur de la classe BulkDealer. Avec une graine, la suite des distributions est reproductible.
+        """
+        self.__number_of_players = number_of_players
+        self.__batch_size = batch_size
+        self.__random = np.random.default_rng(seed)
+        self.__batch = None
+        self.__index = 0
+
+    def __next_deal(self) -> int:
+        """
+        Retourne l'indice, dans le lot en cours, de la distribution suivante. Un nouveau lot est calculé quand le
+        précédent est épuisé.
+        """
+        if self.__batch is None or self.__index == len(self.__batch):
+            self.__batch = DealBatch(self.__batch_size, self.__number_of_players, self.__random)
+            self.__index = 0
+        self.__index += 1
+        return self.__index - 1
+
+    def next_hands(self, first_player_index: int = 0) -> list[list]:
+        """
+        Retourne les mains triées de la distribution suivante, joueur par joueur, la distribution commençant par le
+        joueur d'indice first_player_index (voir DealBatch.hands).
+        """
+        index = self.__next_deal()
+        return self.__batch.hands(index, first_player_index)
+
+    def next_masks(self, first_player_index: int = 0) -> list[int]:
+        """
+        Retourne les masques des mains de la distribution suivante, joueur par joueur, la distribution commençant par
+        le joueur d'indice first_player_index (voir DealBatch.hand_masks).
+        """
+        index = self.__next_deal()
+        return self.__batch.hand_masks(index, first_player_index)
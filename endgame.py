@@ -0,0 +1,158 @@
+import random
+import string
+import threading
+from collections import OrderedDict
+
+import movegen
+from mcts import legal_moves, move_cards, set_rewards
+from model import AIPlayer, Cards, PresidentGame
+
+# Résolution exacte des fins de manche. Quand il reste peu de cartes en jeu, tous les coups possibles peuvent être
+# explorés : chaque joueur choisit le coup qui maximise sa propre récompense (max-n, la généralisation du minimax à
+# plusieurs joueurs). Les positions déjà résolues sont gardées dans une table de transposition bornée, partagée d'une
+# partie à l'autre : les mêmes fins de manche reviennent sans cesse.
+
+
+class EndgameSolver:
+    """
+    La classe EndgameSolver résout les fins de manche d'une partie par une recherche max-n, en supposant que toutes les
+    mains sont connues. La récompense d'un joueur est celle de mcts.set_rewards (1 pour le premier à finir, 0 pour le
+    dernier).
+    Les couleurs des cartes n'ayant pas d'influence sur le jeu, une position est identifiée par le nombre de cartes de
+    chaque rang de chaque main et par l'état du pli et du tour. La table de transposition en garde au plus max_entries :
+    la position utilisée le moins récemment est évincée (LRU).
+    """
+
+    def __init__(self, max_entries: int = 1 << 18):
+        """
+        Le constructeur de la classe EndgameSolver.
+        """
+        self.__max_entries = max_entries
+        # position -> (valeurs de la position pour chaque joueur, meilleur coup)
+        self.__table = OrderedDict()
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        """
+        Retourne le nombre de positions de la table de transposition.
+        """
+        return len(self.__table)
+
+    def clear(self) -> None:
+        """
+        Vide la table de transposition et remet ses compteurs à zéro.
+        """
+        with self.__lock:
+            self.__table.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def solve(self, game: PresidentGame) -> tuple:
+        """
+        Retourne la valeur de la position de la partie donnée en paramètre pour chaque joueur, i.e sa récompense à la
+        fin de la manche si tous les joueurs jouent parfaitement, et le meilleur coup du joueur courant (un couple
+        (rang, nombre de cartes), ou None pour passer). La partie n'est pas modifiée.
+        Seules les valeurs des joueurs qui ont encore des cartes ont un sens : celles des joueurs qui ont fini
+        dépendent de l'ordre dans lequel ils ont fini, que les positions de la table ne distinguent pas.
+        """
+        state = game.clone()
+        state.enable_history()
+        with self.__lock:
+            return self.__solve(state)
+
+    def best_cards(self, game: PresidentGame) -> Cards:
+        """
+        Retourne les cartes que le joueur courant doit jouer (un objet Cards vide pour passer).
+        """
+        _, move = self.solve(game)
+        return move_cards(game.get_current_player().hand, move)
+
+    @staticmethod
+    def __key(state: PresidentGame) -> tuple:
+        """
+        Retourne la clé de la position de la partie dans la table de transposition.
+        """
+        trick = state.current_trick
+        trick_key = (-1, 0) if len(trick.cards) == 0 else (trick.rank, trick.number_of_cards)
+        return (tuple(movegen.rank_counts(player.hand) for player in state.players), trick_key,
+                trick.last_player_index, state.current_player_index, state.turns_without_plays,
+                len(state.players_without_card))
+
+    def __solve(self, state: PresidentGame) -> tuple:
+        """
+        Retourne les valeurs de la position de state et le meilleur coup du joueur courant, en les cherchant dans la
+        table ou en explorant tous les coups du joueur courant. state est remise dans son état initial (voir
+        PresidentGame.undo).
+        """
+        if state.is_set_ended():
+            return tuple(set_rewards(state)), None
+        table = self.__table
+        key = self.__key(state)
+        entry = table.get(key)
+        if entry is not None:
+            table.move_to_end(key)
+            self.hits += 1
+            return entry
+        self.misses += 1
+        player_index = state.current_player_index
+        hand = state.get_current_player().hand
+        # la meilleure récompense possible : finir au prochain rang
+        max_reward = 1 - len(state.players_without_card) / (len(state.players) - 1)
+        best_values = None
+        best_move = None
+        for move in legal_moves(state):
+            history_length = state.history_length()
+            state.play_move(move_cards(hand, move))
+            values, _ = self.__solve(state)
+            state.undo(history_length)
+            # à valeur égale, le premier coup (le plus petit) est gardé
+            if best_values is None or values[player_index] > best_values[player_index]:
+                best_values = values
+                best_move = move
+                # aucun autre coup ne peut faire mieux
+                if values[player_index] >= max_reward:
+                    break
+        table[key] = (best_values, best_move)
+        if len(table) > self.__max_entries:
+            table.popitem(last=False)
+        return best_values, best_move
+
+
+# table de transposition par défaut, partagée par les EndgamePlayer
+SOLVER = EndgameSolver()
+
+
+def remaining_cards(game: PresidentGame) -> int:
+    """
+    Retourne le nombre total de cartes encore en main.
+    """
+    return sum(len(player.hand) for player in game.players)
+
+
+class EndgamePlayer(AIPlayer):
+    """
+    La classe EndgamePlayer est une IA qui joue comme AIPlayer, sauf en fin de manche : dès qu'il reste au plus
+    threshold cartes en main, tous joueurs confondus, elle joue le coup parfait calculé par un EndgameSolver (qui voit
+    toutes les mains).
+    """
+
+    def __init__(self, name: string = '', rng: random.Random = None, threshold: int = 10,
+                 solver: EndgameSolver = None):
+        """
+        Le constructeur de la classe EndgamePlayer. Par défaut, la table de transposition est celle de SOLVER, partagée
+        par toutes les IA.
+        """
+        super().__init__(name, rng)
+        self._threshold = threshold
+        self._solver = SOLVER if solver is None else solver
+
+    def choose_cards_to_play(self, game: PresidentGame) -> Cards:
+        """
+        Retourne les cartes jouées par l'IA (un objet Cards vide si elle passe) : le coup parfait en fin de manche, un
+        coup au hasard sinon.
+        """
+        if remaining_cards(game) <= self._threshold:
+            return self._solver.best_cards(game)
+        return super().choose_cards_to_play(game)
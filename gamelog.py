@@ -0,0 +1,263 @@
+import mmap
+import string
+
+import constant
+from codec import write_varint
+from constant import NUMBER_OF_SUITS, VALUE_RANKS, SUIT_INDEXES
+from model import CARDS, Cards, PresidentGame
+
+# Journal des parties : un fichier binaire où les parties sont écrites les unes à la suite des autres, sans jamais
+# réécrire ce qui l'a déjà été. Une partie est une suite d'enregistrements, chacun commençant par un octet :
+# - GAME_RECORD, puis la graine de la partie (un varint, plus 1, 0 s'il n'y en a pas), le nombre de joueurs (un octet)
+#   et le nombre de manches (un varint),
+# - DEAL_RECORD, puis la main de chaque joueur au début de la manche (un masque de 52 bits sur 7 octets),
+# - un coup (une mise à l'échange, des cartes jouées ou un tour passé) : le nombre de cartes (de 0 à 4), puis le code de
+#   chaque carte, dans l'ordre où elles ont été données,
+# - SET_END_RECORD, puis l'indice de chaque joueur dans l'ordre où ils ont fini la manche (un octet par joueur),
+# - GAME_END_RECORD, à la fin de la partie.
+
+GAME_RECORD = 0xF0
+DEAL_RECORD = 0xF1
+SET_END_RECORD = 0xF2
+GAME_END_RECORD = 0xF3
+
+_MASK_BYTES = 7
+_QUEEN_OF_HEARTS_CODE = VALUE_RANKS['Q'] * NUMBER_OF_SUITS + SUIT_INDEXES['♡']
+
+
+def _read_varint(data, position: int) -> tuple[int, int]:
+    """
+    Lit le varint qui commence à la position donnée et retourne sa valeur et la position qui le suit.
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
+
+
+def cards_from_codes(codes) -> Cards:
+    """
+    Retourne la liste des cartes dont les codes sont donnés en paramètre (un coup du journal).
+    """
+    cards = CARDS
+    return Cards([cards[code] for code in codes])
+
+
+class GameLogWriter:
+    """
+    La classe GameLogWriter écrit des parties à la fin d'un journal. Les enregistrements sont accumulés dans un tampon,
+    écrit dans le fichier par blocs de buffer_size octets, à la fermeture du journal ou sur demande (flush).
+    """
+
+    def __init__(self, path: string, buffer_size: int = 1 << 16):
+        """
+        Le constructeur de la classe GameLogWriter. Ouvre le journal en ajout, en le créant s'il n'existe pas.
+        """
+        self.__file = open(path, 'ab')
+        self.__buffer = bytearray()
+        self.__buffer_size = buffer_size
+        self.__current_set = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def start_game(self, game: PresidentGame, seed: int = None) -> None:
+        """
+        Commence l'enregistrement de la partie donnée en paramètre, qui vient d'être créée, et de sa première
+        distribution. La graine, si elle est fournie, doit être un entier positif ou nul.
+        """
+        if seed is not None and seed < 0:
+            raise ValueError("La graine d'une partie enregistrée doit être un entier positif ou nul.")
+        buffer = self.__buffer
+        buffer.append(GAME_RECORD)
+        write_varint(buffer, 0 if seed is None else seed + 1)
+        buffer.append(len(game.players))
+        write_varint(buffer, game.number_of_sets)
+        self.__record_deal(game)
+        self.__current_set = game.current_set
+
+    def apply_move(self, game: PresidentGame, cards: Cards) -> None:
+        """
+        Enregistre le coup du joueur courant (des cartes mises à l'échange, jouées, ou une liste vide pour passer), puis
+        l'applique à la partie (voir PresidentGame.apply_move). Enregistre aussi la fin de la manche et la
+        distribution suivante, ou la fin de la partie, s'il y a lieu.
+        """
+        buffer = self.__buffer
+        buffer.append(len(cards))
+        buffer += bytes(card.code for card in cards)
+        game.apply_move(cards)
+        if game.current_set != self.__current_set:
+            self.__current_set = game.current_set
+            buffer.append(SET_END_RECORD)
+            buffer += bytes(game.players.index(player) for player in game.players_without_card)
+            if game.is_game_ended():
+                buffer.append(GAME_END_RECORD)
+            else:
+                self.__record_deal(game)
+        if len(buffer) >= self.__buffer_size:
+            self.flush()
+
+    def __record_deal(self, game: PresidentGame) -> None:
+        """
+        Enregistre les mains des joueurs au début de la manche.
+        """
+        buffer = self.__buffer
+        buffer.append(DEAL_RECORD)
+        for player in game.players:
+            buffer += player.hand.mask.to_bytes(_MASK_BYTES, 'little')
+
+    def flush(self) -> None:
+        """
+        Écrit le tampon dans le journal.
+        """
+        if len(self.__buffer) != 0:
+            self.__file.write(self.__buffer)
+            self.__buffer.clear()
+        self.__file.flush()
+
+    def close(self) -> None:
+        """
+        Écrit le tampon dans le journal et le ferme.
+        """
+        if not self.__file.closed:
+            self.flush()
+            self.__file.close()
+
+
+class LoggedGame:
+    """
+    La classe LoggedGame est une partie lue dans le journal : sa graine, ses distributions, ses coups (les codes des
+    cartes données à chaque coup, manche par manche) et l'ordre dans lequel les joueurs ont fini chaque manche.
+    """
+    __slots__ = ('seed', 'number_of_players', 'number_of_sets', 'deals', 'moves', 'orders', 'offset', 'is_complete')
+
+    def __init__(self, seed, number_of_players: int, number_of_sets: int, offset: int = 0):
+        """
+        Le constructeur de la classe LoggedGame. offset est la position de la partie dans le journal.
+        """
+        self.seed = seed
+        self.number_of_players = number_of_players
+        self.number_of_sets = number_of_sets
+        self.deals: list[tuple] = []
+        self.moves: list[list[bytes]] = []
+        self.orders: list[tuple] = []
+        self.offset = offset
+        self.is_complete = False
+
+    def number_of_moves(self) -> int:
+        """
+        Retourne le nombre total de coups de la partie.
+        """
+        return sum(len(set_moves) for set_moves in self.moves)
+
+    def roles(self, set_index: int) -> list:
+        """
+        Retourne le rôle de chaque joueur à la fin de la manche d'indice set_index.
+        """
+        roles = [None] * self.number_of_players
+        for position, player_index in enumerate(self.orders[set_index]):
+            roles[player_index] = constant.ROLES[self.number_of_players][position]
+        return roles
+
+    def set_start_snapshot(self, set_index: int) -> tuple:
+        """
+        Retourne l'état de la partie au début de la manche d'indice set_index (voir PresidentGame.snapshot) : juste
+        après la distribution, avant les échanges.
+        """
+        hands = self.deals[set_index]
+        if set_index == 0:
+            roles = [None] * self.number_of_players
+            queen_of_hearts_bit = 1 << _QUEEN_OF_HEARTS_CODE
+            current_player_index = next(index for index, hand in enumerate(hands) if hand & queen_of_hearts_bit)
+            players_without_card = ()
+        else:
+            # le trou de la manche précédente commence, après les échanges
+            roles = self.roles(set_index - 1)
+            players_without_card = self.orders[set_index - 1]
+            current_player_index = players_without_card[-1]
+        return (tuple((hand, 0, role) for hand, role in zip(hands, roles)), ((), 0, -1), current_player_index, 0,
+                set_index, players_without_card, set_index != 0, 0)
+
+    def replay(self, number_of_moves: int = None) -> PresidentGame:
+        """
+        Retourne la partie dans l'état où elle était après number_of_moves coups (par défaut, tous les coups
+        enregistrés). Ses joueurs sont de simples Player.
+        La partie est reconstruite au début de la manche qui contient l'état demandé, à partir de sa distribution et de
+        la fin de la manche précédente, puis les coups de la manche sont rejoués avec PresidentGame.apply_move.
+        """
+        total = self.number_of_moves()
+        number_of_moves = total if number_of_moves is None else number_of_moves
+        if not 0 <= number_of_moves <= total:
+            raise ValueError(f"La partie ne compte que {total} coups.")
+        set_index = 0
+        start = 0
+        while set_index + 1 < len(self.deals) and number_of_moves >= start + len(self.moves[set_index]):
+            start += len(self.moves[set_index])
+            set_index += 1
+        game = PresidentGame.from_snapshot(self.set_start_snapshot(set_index), self.number_of_sets)
+        for codes in self.moves[set_index][:number_of_moves - start]:
+            game.apply_move(cards_from_codes(codes))
+        return game
+
+
+def iter_games(data, offset: int = 0):
+    """
+    Itère sur les parties du journal dont le contenu est donné en paramètre (bytes, ou mmap pour un fichier projeté en
+    mémoire), à partir de la position offset. Une partie inachevée à la fin du journal est retournée, avec
+    is_complete à False.
+    """
+    length = len(data)
+    position = offset
+    game = None
+    number_of_players = 0
+    while position < length:
+        record = data[position]
+        position += 1
+        if record <= NUMBER_OF_SUITS:
+            game.moves[-1].append(data[position:position + record])
+            position += record
+        elif record == DEAL_RECORD:
+            end = position + _MASK_BYTES * number_of_players
+            game.deals.append(tuple(int.from_bytes(data[start:start + _MASK_BYTES], 'little')
+                                    for start in range(position, end, _MASK_BYTES)))
+            game.moves.append([])
+            position = end
+        elif record == SET_END_RECORD:
+            game.orders.append(tuple(data[position:position + number_of_players]))
+            position += number_of_players
+        elif record == GAME_END_RECORD:
+            game.is_complete = True
+            yield game
+            game = None
+        elif record == GAME_RECORD:
+            if game is not None:
+                yield game
+            game_offset = position - 1
+            seed, position = _read_varint(data, position)
+            number_of_players = data[position]
+            number_of_sets, position = _read_varint(data, position + 1)
+            game = LoggedGame(seed - 1 if seed > 0 else None, number_of_players, number_of_sets, game_offset)
+        else:
+            raise ValueError(f"Enregistrement inconnu à la position {position - 1} du journal.")
+    if game is not None:
+        yield game
+
+
+def read_log(path: string):
+    """
+    Itère sur les parties du journal dont le chemin est donné en paramètre. Le fichier est projeté en mémoire (mmap) :
+    il n'est pas chargé en entier, même s'il contient des millions de parties.
+    """
+    with open(path, 'rb') as file:
+        if file.seek(0, 2) == 0:
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            yield from iter_games(data)
@@ -0,0 +1,295 @@
+import argparse
+import os
+import string
+
+import numpy as np
+
+import constant
+import gamelog
+from constant import CODE_RANKS, NUMBER_OF_CARDS
+from model import PresidentGame
+
+# Stockage en colonnes des parties terminées, pour les analyser en masse. Le stockage est un répertoire de blocs
+# (chunks), numérotés dans l'ordre où ils ont été écrits et jamais réécrits. Chaque bloc contient deux tables, chaque
+# colonne d'une table étant un fichier .npy qui peut être projeté en mémoire :
+# - sets : une ligne par joueur et par manche, avec la partie (game), la manche (set), la place à la table (seat), le
+#   nombre de joueurs (players), la place d'arrivée (position, 0 pour le président), celle de la manche précédente
+#   (previous_position, -1 pour la première manche), la main distribuée (hand, un masque de 52 bits) et sa force
+#   (strength, le rang moyen de ses cartes, de 0 pour des '3' à 12 pour des '2'),
+# - moves : une ligne par coup, avec la partie (game), la manche (set), l'indice du coup dans la manche (index), la
+#   place du joueur (seat), les cartes données (cards, un masque), leur nombre (number_of_cards) et la phase du coup
+#   (is_trade).
+
+SETS_COLUMNS = {
+    "game": np.int64,
+    "set": np.int16,
+    "seat": np.int8,
+    "players": np.int8,
+    "position": np.int8,
+    "previous_position": np.int8,
+    "hand": np.uint64,
+    "strength": np.float32
+}
+MOVES_COLUMNS = {
+    "game": np.int64,
+    "set": np.int16,
+    "index": np.int16,
+    "seat": np.int8,
+    "cards": np.uint64,
+    "number_of_cards": np.int8,
+    "is_trade": np.bool_
+}
+TABLES = {"sets": SETS_COLUMNS, "moves": MOVES_COLUMNS}
+
+# _MASK_RANK_SUMS[position][byte] : la somme des rangs des cartes codées par un octet, à la place position, d'un masque
+_MASK_RANK_SUMS = [[sum(CODE_RANKS[position * 8 + bit] for bit in range(8)
+                        if byte >> bit & 1 and position * 8 + bit < NUMBER_OF_CARDS) for byte in range(256)]
+                   for position in range(7)]
+
+
+def hand_strength(hand: int) -> float:
+    """
+    Retourne la force de la main dont le masque est donné en paramètre : le rang moyen de ses cartes.
+    """
+    number_of_cards = hand.bit_count()
+    if number_of_cards == 0:
+        return 0.0
+    return sum(_MASK_RANK_SUMS[position][hand >> 8 * position & 255] for position in range(7)) / number_of_cards
+
+
+def _chunk_names(path: string) -> list[string]:
+    """
+    Retourne les noms des blocs du stockage, dans l'ordre où ils ont été écrits.
+    """
+    if not os.path.isdir(path):
+        return []
+    return sorted(name for name in os.listdir(path) if name.isdigit())
+
+
+def _column_path(path: string, chunk_name: string, table: string, column: string) -> string:
+    """
+    Retourne le chemin du fichier d'une colonne d'une table d'un bloc.
+    """
+    return os.path.join(path, chunk_name, f"{table}_{column}.npy")
+
+
+class HistoryStoreWriter:
+    """
+    La classe HistoryStoreWriter ajoute des parties terminées au stockage. Les lignes sont accumulées en mémoire et
+    écrites dans un nouveau bloc dès que la table sets en compte chunk_rows, ainsi qu'à la fermeture.
+    """
+
+    def __init__(self, path: string, chunk_rows: int = 1 << 20):
+        """
+        Le constructeur de la classe HistoryStoreWriter. Crée le stockage s'il n'existe pas ; sinon, les parties sont
+        ajoutées à la suite de celles qu'il contient déjà.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.__path = path
+        self.__chunk_rows = chunk_rows
+        self.__rows = {table: {column: [] for column in columns} for table, columns in TABLES.items()}
+        chunk_names = _chunk_names(path)
+        self.__next_chunk = int(chunk_names[-1]) + 1 if len(chunk_names) != 0 else 0
+        self.__next_game = 0
+        if len(chunk_names) != 0:
+            games = np.load(_column_path(path, chunk_names[-1], "sets", "game"), mmap_mode='r')
+            self.__next_game = int(games.max()) + 1 if len(games) != 0 else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def add_game(self, logged_game: gamelog.LoggedGame) -> int:
+        """
+        Ajoute au stockage une partie lue dans le journal (voir gamelog) et retourne son numéro dans le stockage. Seules
+        les manches terminées sont ajoutées. La place du joueur de chaque coup est retrouvée en rejouant les manches.
+        """
+        game_id = self.__next_game
+        self.__next_game += 1
+        sets = self.__rows["sets"]
+        moves = self.__rows["moves"]
+        number_of_players = logged_game.number_of_players
+        for set_index, order in enumerate(logged_game.orders):
+            positions = [0] * number_of_players
+            for position, seat in enumerate(order):
+                positions[seat] = position
+            previous_positions = [-1] * number_of_players
+            if set_index > 0:
+                for position, seat in enumerate(logged_game.orders[set_index - 1]):
+                    previous_positions[seat] = position
+            for seat, hand in enumerate(logged_game.deals[set_index]):
+                sets["game"].append(game_id)
+                sets["set"].append(set_index)
+                sets["seat"].append(seat)
+                sets["players"].append(number_of_players)
+                sets["position"].append(positions[seat])
+                sets["previous_position"].append(previous_positions[seat])
+                sets["hand"].append(hand)
+                sets["strength"].append(hand_strength(hand))
+
+            game = PresidentGame.from_snapshot(logged_game.set_start_snapshot(set_index), logged_game.number_of_sets)
+            for move_index, codes in enumerate(logged_game.moves[set_index]):
+                cards = 0
+                for code in codes:
+                    cards |= 1 << code
+                moves["game"].append(game_id)
+                moves["set"].append(set_index)
+                moves["index"].append(move_index)
+                moves["seat"].append(game.current_player_index)
+                moves["cards"].append(cards)
+                moves["number_of_cards"].append(len(codes))
+                moves["is_trade"].append(game.is_trade)
+                # le dernier coup termine la manche : il n'est pas rejoué, il déclencherait une nouvelle distribution
+                if move_index + 1 < len(logged_game.moves[set_index]):
+                    game.apply_move(gamelog.cards_from_codes(codes))
+        if len(sets["game"]) >= self.__chunk_rows:
+            self.flush()
+        return game_id
+
+    def flush(self) -> None:
+        """
+        Écrit les lignes accumulées dans un nouveau bloc.
+        """
+        if len(self.__rows["sets"]["game"]) == 0:
+            return
+        chunk_name = f"{self.__next_chunk:06d}"
+        os.makedirs(os.path.join(self.__path, chunk_name))
+        for table, columns in TABLES.items():
+            for column, dtype in columns.items():
+                np.save(_column_path(self.__path, chunk_name, table, column),
+                        np.array(self.__rows[table][column], dtype=dtype))
+                self.__rows[table][column].clear()
+        self.__next_chunk += 1
+
+    def close(self) -> None:
+        """
+        Écrit les lignes accumulées et ferme le stockage.
+        """
+        self.flush()
+
+
+class HistoryStore:
+    """
+    La classe HistoryStore lit le stockage en colonnes. Les colonnes sont projetées en mémoire et les requêtes
+    agrègent les blocs un par un : le stockage n'est jamais chargé en entier.
+    """
+
+    def __init__(self, path: string):
+        """
+        Le constructeur de la classe HistoryStore.
+        """
+        self.__path = path
+        self.__chunk_names = _chunk_names(path)
+
+    @property
+    def number_of_chunks(self) -> int:
+        """
+        Le getter du nombre de blocs du stockage.
+        """
+        return len(self.__chunk_names)
+
+    def columns(self, table: string, columns: list[string]):
+        """
+        Itère sur les blocs du stockage, en retournant pour chacun un dictionnaire des colonnes demandées de la table,
+        projetées en mémoire.
+        """
+        if table not in TABLES or not set(columns) <= set(TABLES[table]):
+            raise ValueError(f"La table {table} n'a pas toutes les colonnes {columns}.")
+        for chunk_name in self.__chunk_names:
+            yield {column: np.load(_column_path(self.__path, chunk_name, table, column), mmap_mode='r')
+                   for column in columns}
+
+    def count(self, table: string = "sets") -> int:
+        """
+        Retourne le nombre de lignes de la table.
+        """
+        return sum(len(chunk["game"]) for chunk in self.columns(table, ["game"]))
+
+    def win_rate(self, by: string, number_of_players: int = None, bins=None) -> dict:
+        """
+        Retourne, pour chaque valeur de la colonne by de la table sets, le nombre de manches jouées, la proportion de
+        manches gagnées (le joueur est président) et la place d'arrivée moyenne, sous forme d'un dictionnaire
+        valeur -> {"sets", "win_rate", "average_position"}.
+        Seules les manches à number_of_players joueurs sont comptées, s'il est fourni. Si bins est fourni (les bornes
+        croissantes d'intervalles), les valeurs sont regroupées par intervalle, désigné par sa borne inférieure.
+        """
+        totals = {}
+        for chunk in self.columns("sets", list({by, "players", "position"})):
+            selection = slice(None) if number_of_players is None else chunk["players"] == number_of_players
+            values = np.asarray(chunk[by][selection])
+            positions = np.asarray(chunk["position"][selection])
+            if bins is not None:
+                bins = np.asarray(bins)
+                values = bins[np.clip(np.digitize(values, bins) - 1, 0, len(bins) - 1)]
+            keys, inverse = np.unique(values, return_inverse=True)
+            counts = np.bincount(inverse, minlength=len(keys))
+            wins = np.bincount(inverse, weights=positions == 0, minlength=len(keys))
+            position_sums = np.bincount(inverse, weights=positions, minlength=len(keys))
+            for key, count, win_count, position_sum in zip(keys.tolist(), counts.tolist(), wins.tolist(),
+                                                           position_sums.tolist()):
+                total = totals.setdefault(key, [0, 0.0, 0.0])
+                total[0] += count
+                total[1] += win_count
+                total[2] += position_sum
+        return {key: {"sets": count, "win_rate": win_count / count, "average_position": position_sum / count}
+                for key, (count, win_count, position_sum) in sorted(totals.items())}
+
+    def win_rate_by_seat(self, number_of_players: int = None) -> dict:
+        """
+        Retourne les statistiques de win_rate par place à la table.
+        """
+        return self.win_rate("seat", number_of_players)
+
+    def win_rate_by_hand_strength(self, number_of_players: int = None, bins=None) -> dict:
+        """
+        Retourne les statistiques de win_rate par force de la main distribuée, par intervalles d'un demi-rang par
+        défaut.
+        """
+        return self.win_rate("strength", number_of_players, np.arange(0, 12.5, 0.5) if bins is None else bins)
+
+    def win_rate_by_previous_role(self, number_of_players: int) -> dict:
+        """
+        Retourne les statistiques de win_rate par rôle obtenu à la manche précédente (None pour la première manche) à
+        number_of_players joueurs. Les places qui donnent le même rôle (les neutres à 6 joueurs) sont regroupées.
+        """
+        roles = {}
+        for previous_position, statistics in self.win_rate("previous_position", number_of_players).items():
+            role = constant.ROLES[number_of_players][previous_position] if previous_position >= 0 else None
+            total = roles.setdefault(role, [0, 0.0, 0.0])
+            total[0] += statistics["sets"]
+            total[1] += statistics["win_rate"] * statistics["sets"]
+            total[2] += statistics["average_position"] * statistics["sets"]
+        return {role: {"sets": count, "win_rate": win_count / count, "average_position": position_sum / count}
+                for role, (count, win_count, position_sum) in roles.items()}
+
+
+def import_log(log_path: string, store_path: string, chunk_rows: int = 1 << 20) -> int:
+    """
+    Ajoute au stockage store_path les parties terminées du journal log_path et retourne le nombre de parties ajoutées.
+    """
+    number_of_games = 0
+    with HistoryStoreWriter(store_path, chunk_rows) as writer:
+        for logged_game in gamelog.read_log(log_path):
+            if logged_game.is_complete:
+                writer.add_game(logged_game)
+                number_of_games += 1
+    return number_of_games
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Analyse les parties terminées d'un journal de parties.")
+    parser.add_argument("store", help="répertoire du stockage en colonnes")
+    parser.add_argument("--import-log", default=None, help="journal dont les parties sont ajoutées au stockage")
+    parser.add_argument("--players", type=int, default=4, choices=range(3, 7), help="nombre de joueurs (3 à 6)")
+    arguments = parser.parse_args()
+    if arguments.import_log is not None:
+        print(f"{import_log(arguments.import_log, arguments.store)} parties ajoutées")
+    store = HistoryStore(arguments.store)
+    for title, statistics in (("Place", store.win_rate_by_seat(arguments.players)),
+                              ("Rôle précédent", store.win_rate_by_previous_role(arguments.players)),
+                              ("Force de la main", store.win_rate_by_hand_strength(arguments.players))):
+        for key, values in statistics.items():
+            print(f"{title} {key} - {values['sets']} manches, {values['win_rate']:.1%} de victoires, "
+                  f"place moyenne {values['average_position']:.2f}")
@@ -0,0 +1,275 @@
+import math
+import random
+import string
+import time
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor
+
+import movegen
+from model import AIPlayer, Cards, PresidentGame
+
+
+class SearchNode:
+    """
+    Un nœud de l'arbre de recherche de MCTSPlayer. Il correspond au coup move (un couple (rang, nombre de cartes), ou
+    None pour passer) joué par le joueur d'indice player_index, et accumule le nombre de visites et la somme des
+    récompenses de ce joueur.
+    """
+    __slots__ = ('move', 'player_index', 'children', 'visits', 'reward', 'availability')
+
+    def __init__(self, move, player_index: int):
+        """
+        Le constructeur de la classe SearchNode.
+        """
+        self.move = move
+        self.player_index = player_index
+        self.children = {}
+        self.visits = 0
+        self.reward = 0.0
+        # nombre de fois où le coup était jouable quand le nœud parent a été visité
+        self.availability = 0
+
+
+def legal_moves(game: PresidentGame) -> list:
+    """
+    Retourne les coups du joueur courant, sous forme de couples (rang, nombre de cartes), auxquels s'ajoute None
+    (passer) si le pli est commencé. Les couleurs des cartes n'ont pas d'influence sur le jeu et ne sont donc pas
+    distinguées.
+    """
+    trick = game.current_trick
+    counts = movegen.rank_counts(game.get_current_player().hand)
+    if len(trick.cards) == 0:
+        return [(rank, size) for rank, size, _ in movegen.legal_moves(counts, -1, 0)]
+    moves = [(rank, size) for rank, size, _ in movegen.legal_moves(counts, trick.rank, trick.number_of_cards)]
+    moves.append(None)
+    return moves
+
+
+def move_cards(hand: Cards, move) -> Cards:
+    """
+    Retourne les cartes de la main qui correspondent au coup donné en paramètre (un objet Cards vide pour passer).
+    """
+    if move is None:
+        return Cards()
+    rank, size = move
+    return Cards(movegen.cards_of_rank(hand, rank)[:size])
+
+
+def set_rewards(game: PresidentGame) -> list[float]:
+    """
+    Retourne la récompense de chaque joueur à la fin de la manche : 1 pour le premier à finir, 0 pour le dernier, et
+    des valeurs régulièrement réparties entre les deux.
+    """
+    number_of_players = len(game.players)
+    rewards = [0.0] * number_of_players
+    for position, player in enumerate(game.players_without_card):
+        rewards[game.players.index(player)] = 1 - position / (number_of_players - 1)
+    return rewards
+
+
+def root_statistics(root: SearchNode) -> dict:
+    """
+    Retourne les statistiques des coups de la racine de l'arbre : un dictionnaire coup -> (visites, somme des
+    récompenses).
+    """
+    return {move: (child.visits, child.reward) for move, child in root.children.items()}
+
+
+def _search_worker(snapshot: tuple, seed: int, iterations: int, time_limit: float, exploration: float) -> dict:
+    """
+    Effectue, dans un processus du pool, une recherche à partir de la partie décrite par snapshot et retourne les
+    statistiques des coups de la racine.
+    """
+    game = PresidentGame.from_snapshot(snapshot)
+    player = MCTSPlayer(rng=random.Random(seed), iterations=iterations, time_limit=time_limit,
+                        exploration=exploration)
+    return root_statistics(player.search(game))
+
+
+class MCTSPlayer(AIPlayer):
+    """
+    La classe MCTSPlayer est une IA qui choisit ses coups par une recherche arborescente Monte-Carlo (MCTS)
+    déterminisée : à chaque itération, les cartes qu'elle ne voit pas sont redistribuées au hasard entre les autres
+    joueurs, puis la fin de la manche est simulée. Le coup retenu est le plus visité.
+    La recherche est limitée par un nombre d'itérations ou, à défaut, par une durée par coup. Elle peut être répartie
+    sur plusieurs processus : chacun effectue une recherche indépendante, et les statistiques des coups sont
+    additionnées. Le pool de processus créé par l'IA est arrêté par close, à la sortie d'un bloc with, ou au plus tard
+    quand l'IA est détruite.
+    Pour les échanges de cartes, elle se comporte comme AIPlayer.
+    """
+
+    def __init__(self, name: string = '', rng: random.Random = None, iterations: int = None,
+                 time_limit: float = 0.05, exploration: float = 0.7, workers: int = 1, executor: Executor = None):
+        """
+        Le constructeur de la classe MCTSPlayer. iterations fixe le nombre total d'itérations de la recherche ; sinon,
+        la recherche dure time_limit secondes. exploration est la constante d'exploration de la formule UCB.
+        workers est le nombre de processus entre lesquels la recherche est répartie (1 pour rester dans le processus
+        courant). Avec un nombre d'itérations fixé et un générateur aléatoire initialisé par une graine, le coup choisi
+        est reproductible, quel que soit le nombre de processus disponibles (mode déterministe).
+        Un pool de processus peut être fourni (executor), par exemple pour le partager entre plusieurs IA : il n'est
+        alors pas arrêté par l'IA. Sinon, l'IA crée le sien à sa première recherche répartie.
+        """
+        super().__init__(name, rng)
+        self._iterations = iterations
+        self._time_limit = time_limit
+        self._exploration = exploration
+        self._workers = workers
+        self._executor = executor
+        # arrêt du pool créé par l'IA, appelé par close ou à la destruction de l'IA
+        self._shutdown = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def clone(self):
+        """
+        Retourne une copie de l'IA (voir AIPlayer.clone). Elle partage le pool fourni à l'IA copiée, mais pas celui que
+        l'IA copiée a créé : elle créera le sien si besoin.
+        """
+        player = super().clone()
+        if self._shutdown is not None:
+            player._executor = None
+            player._shutdown = None
+        return player
+
+    def choose_cards_to_play(self, game: PresidentGame) -> Cards:
+        """
+        Retourne les cartes jouées par l'IA (un objet Cards vide si elle passe), choisies par la recherche.
+        """
+        moves = legal_moves(game)
+        if len(moves) <= 1:
+            return move_cards(self._hand, moves[0] if len(moves) == 1 else None)
+        if self._workers > 1:
+            statistics = self.parallel_search(game)
+        else:
+            statistics = root_statistics(self.search(game))
+        # le coup le plus visité, le premier dans l'ordre des coups légaux en cas d'égalité
+        best_move = max(moves, key=lambda move: statistics.get(move, (0, 0.0))[0])
+        return move_cards(self._hand, best_move)
+
+    def parallel_search(self, game: PresidentGame) -> dict:
+        """
+        Répartit la recherche entre les processus du pool de l'IA et retourne les statistiques (visites, somme des
+        récompenses) de chaque coup, additionnées sur toutes les recherches.
+        Chaque recherche a sa propre graine, tirée du générateur de l'IA, et, si le nombre d'itérations est fixé, sa
+        part des itérations. La fonction reste synchrone : elle attend la fin de toutes les recherches.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            self._shutdown = weakref.finalize(self, self._executor.shutdown)
+        snapshot = game.snapshot()
+        futures = []
+        for worker in range(self._workers):
+            iterations = None
+            if self._iterations is not None:
+                iterations = self._iterations // self._workers + (1 if worker < self._iterations % self._workers else 0)
+            futures.append(self._executor.submit(_search_worker, snapshot, self._random.getrandbits(64), iterations,
+                                                 self._time_limit, self._exploration))
+        statistics = {}
+        # les résultats sont fusionnés dans l'ordre de soumission, ce qui rend la fusion déterministe
+        for future in futures:
+            for move, (visits, reward) in future.result().items():
+                total_visits, total_reward = statistics.get(move, (0, 0.0))
+                statistics[move] = (total_visits + visits, total_reward + reward)
+        return statistics
+
+    def close(self) -> None:
+        """
+        Arrête le pool de processus de l'IA, s'il a été créé par l'IA.
+        """
+        if self._shutdown is not None:
+            self._shutdown()
+            self._shutdown = None
+            self._executor = None
+
+    def search(self, game: PresidentGame) -> SearchNode:
+        """
+        Effectue la recherche à partir de l'état de la partie donnée en paramètre, où c'est au tour de l'IA de jouer,
+        et retourne la racine de l'arbre.
+        La partie n'est pas modifiée : la recherche travaille sur une copie, remise dans son état initial après chaque
+        itération grâce à l'historique d'annulation.
+        """
+        state = game.clone()
+        state.enable_history()
+        root_index = game.current_player_index
+        root = SearchNode(None, root_index)
+        deadline = time.perf_counter() + self._time_limit
+        iteration = 0
+        while (iteration < self._iterations) if self._iterations is not None else (time.perf_counter() < deadline):
+            self.determinize(state, root_index)
+            path = self.select_and_expand(state, root)
+            self.rollout(state)
+            rewards = set_rewards(state)
+            root.visits += 1
+            for node in path:
+                node.visits += 1
+                node.reward += rewards[node.player_index]
+            state.undo(0)
+            iteration += 1
+        return root
+
+    def determinize(self, state: PresidentGame, root_index: int) -> None:
+        """
+        Redistribue au hasard les cartes que l'IA ne voit pas entre les autres joueurs, chacun gardant le même nombre de
+        cartes.
+        """
+        others = [player for index, player in enumerate(state.players)
+                  if index != root_index and len(player.hand) != 0]
+        unseen_cards = [card for player in others for card in player.hand]
+        self._random.shuffle(unseen_cards)
+        start = 0
+        for player in others:
+            number_of_cards = len(player.hand)
+            player.hand.clear()
+            player.add_to_hand(unseen_cards[start:start + number_of_cards])
+            player.sort_hand()
+            start += number_of_cards
+        # les mains ont été modifiées sans passer par la partie
+        state.rehash()
+
+    def select_and_expand(self, state: PresidentGame, root: SearchNode) -> list[SearchNode]:
+        """
+        Descend dans l'arbre en jouant les coups dans state, en choisissant à chaque nœud le coup qui maximise UCB parmi
+        ceux qui sont jouables, jusqu'à trouver un coup jamais essayé, qui est ajouté à l'arbre. Retourne le chemin
+        parcouru (sans la racine).
+        """
+        node = root
+        path = []
+        while not state.is_set_ended():
+            moves = legal_moves(state)
+            untried_moves = []
+            for move in moves:
+                child = node.children.get(move)
+                if child is None:
+                    untried_moves.append(move)
+                else:
+                    child.availability += 1
+            if len(untried_moves) != 0:
+                move = self._random.choice(untried_moves)
+                child = SearchNode(move, state.current_player_index)
+                node.children[move] = child
+                state.play_move(move_cards(state.get_current_player().hand, move))
+                path.append(child)
+                return path
+            node = max((node.children[move] for move in moves), key=self.ucb)
+            state.play_move(move_cards(state.get_current_player().hand, node.move))
+            path.append(node)
+        return path
+
+    def ucb(self, node: SearchNode) -> float:
+        """
+        Retourne la valeur UCB du nœud, pour le joueur qui y joue, en tenant compte du nombre de fois où son coup était
+        jouable.
+        """
+        return node.reward / node.visits + self._exploration * math.sqrt(math.log(node.availability) / node.visits)
+
+    def rollout(self, state: PresidentGame) -> None:
+        """
+        Joue la fin de la manche au hasard, comme AIPlayer.
+        """
+        while not state.is_set_ended():
+            hand = state.get_current_player().hand
+            state.play_move(Cards(movegen.sample_rank_then_play(hand, state.current_trick, self._random)))
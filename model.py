@@ -1,75 +1,260 @@
+import copy
 import random
 import string
+from bisect import bisect_left
 
 import constant
-from constant import VALUES, SUITS, NAMES
-from itertools import combinations
+import movegen
+from constant import VALUES, SUITS, NAMES, NUMBER_OF_SUITS, NUMBER_OF_CARDS, VALUE_RANKS, SUIT_INDEXES, CODE_RANKS, \
+    CODE_SUITS, CODE_STRINGS, TWO_RANK
+from zobrist import HAND_KEYS, TRADED_KEYS, TRICK_KEYS, TRICK_NUMBER_KEYS, LAST_PLAYER_KEYS, CURRENT_PLAYER_KEYS, \
+    TURNS_KEYS, TURNS_MASK, OUT_KEYS, TRADE_KEY, game_hash, trick_hash
+from operator import attrgetter
 
 
 class Card:
     """
     La classe Card qui permet d'initialiser les cartes avec leur valeur ('3', 'J', ...) et leur couleur ('♡', '♢', ...)
     et d'effectuer les comparaisons entre elles.
+    En interne, une carte est représentée par un entier, son code (rang * 4 + couleur), et son rang. Les comparaisons ne
+    manipulent donc que des entiers.
+    Les cartes sont immuables et n'existent qu'en un exemplaire chacune (voir CARDS) : Card('Q', '♡') retourne
+    toujours le même objet.
     """
+    # le code (rang * 4 + couleur, entre 0 et 51) et le rang (l'indice de la valeur dans constant.VALUES) de la carte,
+    # en lecture seule
+    __slots__ = ('code', 'rank')
 
-    def __init__(self, value: string, suit: string):
+    def __new__(cls, value: string, suit: string):
         """
-        Le constructeur de la classe Carte.
+        Le constructeur de la classe Carte, qui retourne la carte partagée de la valeur et de la couleur données.
         Il n'existe pas de constructeur avec des valeurs par défaut. Les cartes ont forcément une couleur et une valeur.
         """
-        self.__suit: string = suit
-        self.__value: string = value
+        return CARDS[VALUE_RANKS[value] * NUMBER_OF_SUITS + SUIT_INDEXES[suit]]
+
+    @classmethod
+    def _new(cls, code: int):
+        """
+        Crée une nouvelle carte à partir de son code, sans passer par les chaînes de caractères. Ne sert qu'à créer les
+        cartes partagées de CARDS.
+        """
+        card = object.__new__(cls)
+        object.__setattr__(card, 'code', code)
+        object.__setattr__(card, 'rank', CODE_RANKS[code])
+        return card
+
+    @classmethod
+    def from_code(cls, code: int):
+        """
+        Retourne la carte de code donné (rang * 4 + couleur). Les cartes ne changeant jamais, c'est la carte partagée de
+        CARDS : aucune carte n'est créée.
+        """
+        return CARDS[code]
+
+    def __setattr__(self, name, value):
+        """
+        Empêche la modification des cartes, qui sont partagées.
+        """
+        raise AttributeError("Une carte ne peut pas être modifiée")
+
+    def __delattr__(self, name):
+        """
+        Empêche la modification des cartes, qui sont partagées.
+        """
+        raise AttributeError("Une carte ne peut pas être modifiée")
+
+    def __reduce__(self):
+        """
+        Décrit comment sérialiser la carte avec pickle (ou la copier avec copy) : c'est la carte partagée de même code
+        qui est retrouvée.
+        """
+        return Card.from_code, (self.code,)
 
     @property
     def value(self):
         """
         Le getter de la valeur de la carte.
         """
-        return self.__value
+        return VALUES[self.rank]
 
     @property
     def suit(self):
         """
         Le getter de la couleur de la carte.
         """
-        return self.__suit
+        return SUITS[CODE_SUITS[self.code]]
 
     def __eq__(self, other) -> bool:
         """
         La définition de l'opérateur d'égalité pour la classe Carte.
-        Deux cartes sont égales si elles ont une valeur identique.
+        Deux cartes sont égales si elles ont la même valeur et la même couleur. Les cartes étant partagées, c'est un
+        simple test d'identité. Pour comparer les valeurs seules, il faut comparer les rangs (card.rank).
         """
-        return self.__value == other.value
+        if other.__class__ is not Card:
+            return NotImplemented
+        return self is other
+
+    def __hash__(self) -> int:
+        """
+        La définition du hash de la classe Carte, cohérente avec l'égalité : c'est le code de la carte. Deux cartes
+        différentes ont donc des hash différents, et les cartes peuvent servir de clés d'ensembles et de dictionnaires.
+        """
+        return self.code
 
     def __lt__(self, other) -> bool:
         """
         La définition de l'opérateur strictement inférieur pour la classe Carte.
-        La position d'une carte relativement à une autre est déterminée par sa position dans la liste constant.VALUES.
-        Plus son index dans constant.VALUES est important, plus elle sera supérieure à d'autres cartes.
+        La position d'une carte relativement à une autre est déterminée par son rang, i.e sa position dans la liste
+        constant.VALUES. Plus son rang est important, plus elle sera supérieure à d'autres cartes.
         """
-        return VALUES.index(self.__value) < VALUES.index(other.value)
+        return self.rank < other.rank
 
     def __ne__(self, other) -> bool:
         """
         La définition de l'opérateur d'inégalité pour la classe Carte.
-        Deux cartes sont différentes si elles ont des valeurs différentes.
+        Deux cartes sont différentes si elles n'ont pas la même valeur ou pas la même couleur.
         """
-        return self.__value != other.value
+        if other.__class__ is not Card:
+            return NotImplemented
+        return self is not other
 
     def __gt__(self, other) -> bool:
         """
         La définition de l'opérateur strictement supérieur pour la classe Carte.
-        La position d'une carte relativement à une autre est déterminée par sa position dans la liste constant.VALUES.
-        Plus son index dans constant.VALUES est important, plus elle sera supérieure à d'autres cartes.
+        La position d'une carte relativement à une autre est déterminée par son rang, i.e sa position dans la liste
+        constant.VALUES. Plus son rang est important, plus elle sera supérieure à d'autres cartes.
         """
-        return VALUES.index(self.__value) > VALUES.index(other.value)
+        return self.rank > other.rank
+
+    def __repr__(self):
+        """
+        La définition de __repr__ : Card('3', '♡').
+        """
+        return f"Card({self.value!r}, {self.suit!r})"
 
     def __str__(self):
         """
         La définition de __str__.
         str(Card('3', '♡')  = '3♡'
         """
-        return self.__value + self.__suit
+        return CODE_STRINGS[self.code]
+
+
+# les 52 cartes du jeu, indexées par leur code, partagées par les decks, les mains et les plis de toutes les parties
+CARDS = tuple(Card._new(code) for code in range(NUMBER_OF_CARDS))
+
+_CARD_CODE = attrgetter('code')
+_RANK_MASK = (1 << NUMBER_OF_SUITS) - 1
+# _RANK_CARDS[rank][suits] : les cartes du rang dont les couleurs sont les bits à 1 de suits (4 bits), triées
+_RANK_CARDS = [[tuple(CARDS[rank * NUMBER_OF_SUITS + suit] for suit in range(NUMBER_OF_SUITS) if suits >> suit & 1)
+                for suits in range(1 << NUMBER_OF_SUITS)] for rank in range(len(VALUES))]
+
+
+class CardMask:
+    """
+    La classe CardMask représente un ensemble de cartes sous la forme d'un entier de 52 bits : le bit d'indice
+    card.code vaut 1 si la carte est dans l'ensemble. Les 4 bits d'un même rang sont contigus, ce qui permet de
+    compter les cartes d'une valeur sans parcourir l'ensemble.
+    """
+
+    def __init__(self, cards=None, mask: int = 0):
+        """
+        Le constructeur de la classe CardMask. Crée l'ensemble à partir d'un masque, auquel on ajoute les cartes
+        données en paramètre.
+        """
+        self.__mask: int = mask
+        if cards is not None:
+            for card in cards:
+                self.__mask |= 1 << card.code
+
+    @property
+    def mask(self):
+        """
+        Le getter de l'entier de 52 bits représentant l'ensemble.
+        """
+        return self.__mask
+
+    def add(self, card: Card) -> None:
+        """
+        Ajoute la carte donnée en paramètre à l'ensemble.
+        """
+        self.__mask |= 1 << card.code
+
+    def remove(self, card: Card) -> None:
+        """
+        Retire la carte donnée en paramètre de l'ensemble. Lève une KeyError si elle n'y est pas.
+        """
+        bit = 1 << card.code
+        if not self.__mask & bit:
+            raise KeyError(str(card))
+        self.__mask ^= bit
+
+    def count_rank(self, rank: int) -> int:
+        """
+        Retourne le nombre de cartes de l'ensemble ayant le rang donné en paramètre.
+        """
+        return mask_count_rank(self.__mask, rank)
+
+    def ranks_with_at_least(self, number: int) -> list[int]:
+        """
+        Retourne la liste croissante des rangs dont l'ensemble contient au moins number cartes.
+        """
+        return mask_ranks_with_at_least(self.__mask, number)
+
+    def to_cards(self):
+        """
+        Retourne les cartes de l'ensemble sous la forme d'un objet Cards trié.
+        """
+        return Cards(Card.from_code(code) for code in mask_codes(self.__mask))
+
+    def __contains__(self, card) -> bool:
+        """
+        La définition de __contains__ : teste le bit de la carte, en tenant compte de sa valeur ET de sa couleur.
+        """
+        return (self.__mask >> card.code) & 1 == 1
+
+    def __len__(self) -> int:
+        """
+        Le nombre de cartes de l'ensemble.
+        """
+        return self.__mask.bit_count()
+
+    def __eq__(self, other) -> bool:
+        """
+        Deux ensembles sont égaux s'ils contiennent exactement les mêmes cartes.
+        """
+        return isinstance(other, CardMask) and self.__mask == other.mask
+
+    def __str__(self):
+        """
+        La définition de __str__ de la classe CardMask.
+        """
+        return str(self.to_cards())
+
+
+def mask_count_rank(mask: int, rank: int) -> int:
+    """
+    Retourne le nombre de cartes du rang donné en paramètre dans le masque.
+    """
+    return ((mask >> (rank * NUMBER_OF_SUITS)) & _RANK_MASK).bit_count()
+
+
+def mask_ranks_with_at_least(mask: int, number: int) -> list[int]:
+    """
+    Retourne la liste croissante des rangs dont le masque contient au moins number cartes.
+    """
+    return [rank for rank in range(len(VALUES))
+            if ((mask >> (rank * NUMBER_OF_SUITS)) & _RANK_MASK).bit_count() >= number]
+
+
+def mask_codes(mask: int):
+    """
+    Itère, dans l'ordre croissant, sur les codes des cartes présentes dans le masque.
+    """
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
 
 
 class Cards(list[Card]):
@@ -77,40 +262,217 @@ class Cards(list[Card]):
     La classe Cards qui hérite de list[Card].
     C'est une liste de cartes où le mot-clé in (__contains__) est redéfini et qui ajoute des méthodes propres à ce type
     de liste.
+    Elle maintient, à chaque modification, le masque de 52 bits des cartes qu'elle contient (voir CardMask) et l'index
+    de ses cartes par valeur, ce qui rend les tests d'appartenance et les regroupements par valeur indépendants de la
+    taille de la liste.
     """
 
+    def __init__(self, cards=()):
+        """
+        Le constructeur de la classe Cards, identique à celui de list, qui calcule en plus le masque et l'index par
+        valeur des cartes.
+        """
+        super().__init__(cards)
+        self._mask: int = 0
+        self._cards_by_value: dict[str, list[Card]] = {}
+        self._reset_index()
+
+    def __reduce__(self):
+        """
+        Décrit comment sérialiser la liste avec pickle : elle est reconstruite par le constructeur, qui recalcule le
+        masque et l'index (sans cela, pickle ajouterait les cartes avant que le masque et l'index n'existent).
+        """
+        return self.__class__, (list(self),)
+
+    @property
+    def mask(self):
+        """
+        Le getter de l'entier de 52 bits représentant les cartes de la liste.
+        """
+        return self._mask
+
+    def as_mask(self) -> CardMask:
+        """
+        Retourne les cartes de la liste sous la forme d'un objet CardMask.
+        """
+        return CardMask(mask=self._mask)
+
+    def count_rank(self, rank: int) -> int:
+        """
+        Retourne le nombre de cartes de la liste ayant le rang donné en paramètre.
+        """
+        return mask_count_rank(self._mask, rank)
+
+    def ranks_with_at_least(self, number: int) -> list[int]:
+        """
+        Retourne la liste croissante des rangs dont la liste contient au moins number cartes.
+        """
+        return mask_ranks_with_at_least(self._mask, number)
+
+    def append(self, card: Card) -> None:
+        """
+        Ajoute une carte à la fin de la liste et met à jour le masque et l'index.
+        """
+        super().append(card)
+        self._index_add(card)
+
+    def extend(self, cards) -> None:
+        """
+        Ajoute des cartes à la fin de la liste et met à jour le masque.
+        """
+        for card in cards:
+            self.append(card)
+
+    def __iadd__(self, cards):
+        """
+        La définition de l'opérateur +=, équivalente à extend.
+        """
+        self.extend(cards)
+        return self
+
+    def insert(self, index: int, card: Card) -> None:
+        """
+        Insère une carte dans la liste et met à jour le masque et l'index.
+        """
+        super().insert(index, card)
+        self._index_add(card)
+
+    def add_sorted(self, cards) -> None:
+        """
+        Insère les cartes données en paramètre à leur place dans la liste, supposée triée par code (voir sort).
+        """
+        for card in cards:
+            self.insert(bisect_left(self, card.code, key=_CARD_CODE), card)
+
+    def extend_mask(self, mask: int) -> None:
+        """
+        Ajoute à leur place les cartes du masque de 52 bits donné en paramètre, qui ne doivent pas être dans la liste,
+        supposée triée par code (voir sort). Si la liste est vide, elle est remplie rang par rang, sans ajouter les
+        cartes une à une.
+        """
+        if len(self) != 0:
+            self.add_sorted([CARDS[code] for code in mask_codes(mask)])
+            return
+        cards_by_value = self._cards_by_value
+        for rank, rank_cards in enumerate(_RANK_CARDS):
+            suits = mask >> (rank * NUMBER_OF_SUITS) & _RANK_MASK
+            if suits:
+                cards = rank_cards[suits]
+                list.extend(self, cards)
+                cards_by_value[VALUES[rank]] = list(cards)
+        self._mask = mask
+
+    def remove(self, card: Card) -> None:
+        """
+        Retire la carte donnée en paramètre de la liste.
+        Retire la carte qui a la même valeur ET la même couleur, trouvée par son code, et met à jour le masque et
+        l'index. Lève une ValueError si elle n'est pas dans la liste.
+        """
+        code = card.code
+        if not (self._mask >> code) & 1:
+            raise ValueError(f"{card} n'est pas dans la liste")
+        for index, card_in_list in enumerate(self):
+            if card_in_list.code == code:
+                super().__delitem__(index)
+                self._index_remove(card_in_list)
+                break
+
+    def pop(self, index: int = -1) -> Card:
+        """
+        Retire et retourne la carte à l'indice donné et met à jour le masque et l'index.
+        """
+        card = super().pop(index)
+        self._index_remove(card)
+        return card
+
+    def clear(self) -> None:
+        """
+        Vide la liste, le masque et l'index.
+        """
+        super().clear()
+        self._mask = 0
+        self._cards_by_value.clear()
+
+    def reverse(self) -> None:
+        """
+        Inverse l'ordre de la liste et de l'index.
+        """
+        super().reverse()
+        self._reset_index()
+
+    def __setitem__(self, index, value) -> None:
+        """
+        Remplace une carte (ou une tranche de cartes) et recalcule le masque et l'index.
+        """
+        super().__setitem__(index, value)
+        self._reset_index()
+
+    def __delitem__(self, index) -> None:
+        """
+        Supprime une carte (ou une tranche de cartes) et recalcule le masque et l'index.
+        """
+        super().__delitem__(index)
+        self._reset_index()
+
+    def _index_add(self, card: Card) -> None:
+        """
+        Ajoute la carte donnée en paramètre au masque et à l'index par valeur.
+        """
+        self._mask |= 1 << card.code
+        cards_same_value = self._cards_by_value.get(card.value)
+        if cards_same_value is None:
+            self._cards_by_value[card.value] = [card]
+        else:
+            cards_same_value.append(card)
+
+    def _index_remove(self, card: Card) -> None:
+        """
+        Retire la carte donnée en paramètre du masque et de l'index par valeur.
+        """
+        self._mask &= ~(1 << card.code)
+        cards_same_value = self._cards_by_value[card.value]
+        for index, card_same_value in enumerate(cards_same_value):
+            if card_same_value.code == card.code:
+                del cards_same_value[index]
+                break
+        # une valeur dont il ne reste aucune carte n'apparaît plus dans l'index
+        if len(cards_same_value) == 0:
+            del self._cards_by_value[card.value]
+
+    def _reset_index(self) -> None:
+        """
+        Recalcule entièrement le masque et l'index à partir des cartes de la liste.
+        """
+        self._mask = 0
+        self._cards_by_value = {}
+        for card in self:
+            self._index_add(card)
+
     def get_as_dict(self):
         """
         Retourne la liste de cartes self sous la forme d'un dictionnaire où :
         - la clé est la valeur de la carte ('3', '4', 'J', 'Q', ...),
         - la valeur est la liste des cartes de self ayant cette valeur.
+        Le dictionnaire est l'index maintenu par la liste, il est retourné sans copie et ne doit pas être modifié.
         """
-        cards_as_dict = {}
-        for card in self:
-            # Si la liste des cartes de la valeur est vide, on la crée.
-            if card.value not in list(cards_as_dict.keys()):
-                cards_as_dict[card.value] = [card]
-            # Sinon, on lui ajoute les cartes déjà présentes.
-            else:
-                cards_as_dict[card.value] = [card] + cards_as_dict[card.value]
-        return cards_as_dict
+        return self._cards_by_value
 
     def __contains__(self, card):
         """
         La définition de __contains__, c'est-à-dire du mot-clé in.
-        La définition de l'égalité pour la classe Card entraîne qu'une carte d'une certaine valeur est contenue dans
-        une liste de cartes dès lors qu'une carte de la même valeur y est, peu importe si la couleur correspond.
-        Card('3', '♡') in [Card('3', '♢')] = True, ce qui est un problème.
-        Cette définition de __contains__ tient compte de la valeur ET de la couleur des cartes.
-        """
-        cards_as_dict = self.get_as_dict()
-        contain = False
-        # si une carte de même valeur est présente dans self, on compare ensuite les couleurs
-        if card.value in list(cards_as_dict.keys()):
-            for card_same_value in cards_as_dict[card.value]:
-                if card_same_value.suit == card.suit:
-                    contain = True
-        return contain
+        Elle teste le bit de la carte dans le masque de la liste, en temps constant : une carte n'est contenue dans la
+        liste que si la même carte, de même valeur ET de même couleur, y est.
+        """
+        return (self._mask >> card.code) & 1 == 1
+
+    def sort(self, key=None, reverse=False) -> None:
+        """
+        Trie la liste de cartes. Par défaut, les cartes sont triées selon leur code (rang puis couleur), ce qui évite
+        toute comparaison entre objets Card.
+        """
+        list.sort(self, key=_CARD_CODE if key is None else key, reverse=reverse)
+        # l'ordre des valeurs de l'index suit celui de la liste triée
+        self._reset_index()
 
     def __str__(self):
         """
@@ -128,15 +490,14 @@ class Deck:
     La classe Deck. Un deck plein contient toutes les cartes qu'il peut mélanger.
     """
 
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
         """
         Le constructeur de la classe Deck qui a pour attribut un Cards (une liste de carte évoluée).
         À l'initialisation, toutes les cartes possibles sont ajoutées une fois au deck.
+        Le générateur aléatoire utilisé pour mélanger le deck peut être fourni (par défaut, celui du module random).
         """
-        self.__cards = Cards()
-        for value in VALUES:
-            for suit in SUITS:
-                self.__cards.append(Card(value, suit))
+        self.__cards = Cards(CARDS)
+        self.__random = random if rng is None else rng
 
     @property
     def cards(self):
@@ -145,6 +506,13 @@ class Deck:
         """
         return self.__cards
 
+    @property
+    def mask(self):
+        """
+        Le getter du masque de 52 bits des cartes du deck.
+        """
+        return self.__cards.mask
+
     def __eq__(self, other):
         """
         La définition de l'opérateur d'égalité entre les decks.
@@ -155,8 +523,11 @@ class Deck:
     def shuffle(self):
         """
         Mélange les cartes du deck.
+        Le mélange se fait sur une liste simple, l'index de Cards n'est recalculé qu'une fois à la fin.
         """
-        random.shuffle(self.__cards)
+        cards = list(self.__cards)
+        self.__random.shuffle(cards)
+        self.__cards = Cards(cards)
 
 
 class Trick:
@@ -167,23 +538,56 @@ class Trick:
     def __init__(self):
         """
         Le constructeur de la classe Trick. Contient la liste des cartes, le nombre de cartes demandées pour le pli
-        (initialisé à 0) et l'indice du dernier joueur à avoir posé une carte dans le pli (initialisé à -1).
+        (initialisé à 0), l'indice du dernier joueur à avoir posé une carte dans le pli (initialisé à -1) et le rang de
+        la plus forte carte du pli (initialisé à -1).
         """
         self.__cards = Cards()
         self.__number_of_cards = 0
         self.__last_player_index = -1
+        self.__rank = -1
 
     def add_cards(self, cards: Cards, player_index: int) -> None:
         """
         Ajoute les cartes données en paramètre aux cartes du pli.
         Met à jour le nombre de cartes demandées pour le pli s'il s'agit de la première carte jouée.
         Met à jour l'indice du dernier joueur à avoir posé une carte à partir du paramètre fourni en entrée.
+        Met à jour le rang de la plus forte carte du pli.
         """
         if len(self.__cards) == 0:
             self.__number_of_cards = len(cards)
         self.__cards.extend(cards)
+        for card in cards:
+            if card.rank > self.__rank:
+                self.__rank = card.rank
         self.__last_player_index = player_index
 
+    def undo_add_cards(self, cards: Cards, number_of_cards: int, last_player_index: int, rank: int) -> None:
+        """
+        Annule l'ajout des cartes données en paramètre, qui sont les dernières du pli, et restaure le nombre de cartes
+        demandées, l'indice du dernier joueur et le rang de la plus forte carte d'avant leur ajout.
+        """
+        del self.__cards[len(self.__cards) - len(cards):]
+        self.__number_of_cards = number_of_cards
+        self.__last_player_index = last_player_index
+        self.__rank = rank
+
+    def reset(self) -> None:
+        """
+        Vide le pli sur place, pour le réutiliser au tour suivant au lieu d'en créer un nouveau.
+        """
+        self.__cards.clear()
+        self.__number_of_cards = 0
+        self.__last_player_index = -1
+        self.__rank = -1
+
+    def clone(self):
+        """
+        Retourne une copie du pli, dont la liste de cartes est indépendante de celle du pli copié.
+        """
+        trick = copy.copy(self)
+        trick.__cards = Cards(self.__cards)
+        return trick
+
     @property
     def cards(self):
         """
@@ -212,6 +616,20 @@ class Trick:
         """
         return self.__last_player_index
 
+    @property
+    def rank(self):
+        """
+        Le getter du rang de la plus forte carte du pli (-1 si le pli est vide).
+        """
+        return self.__rank
+
+    @property
+    def mask(self):
+        """
+        Le getter du masque de 52 bits des cartes du pli.
+        """
+        return self.__cards.mask
+
     def __str__(self):
         """
         La définition de __str__ de la classe Trick.
@@ -226,13 +644,15 @@ class Player:
     peut effectuer dessus.
     """
 
-    def __init__(self, name: string = ""):
+    def __init__(self, name: string = "", rng: random.Random = None):
         """
         Le constructeur de la classe Player qui initialise son nom (en lui donnant une valeur au hasard parmi celles de
         constant.NAMES), sa main (ses cartes) et son rôle à la fin du tour (une valeur parmi celle de constant.ROLES),
         initialisé à None.
+        Le générateur aléatoire du joueur peut être fourni (par défaut, celui du module random).
         """
-        self._name: string = random.choice(NAMES) if name == "" else name
+        self._random = random if rng is None else rng
+        self._name: string = self._random.choice(NAMES) if name == "" else name
         self._hand = Cards()
         self._traded_cards = Cards()
         self._role = None
@@ -290,7 +710,7 @@ class Player:
         """
         Vide la main du joueur.
         """
-        self._hand = []
+        self._hand.clear()
 
     def sort_hand(self) -> None:
         """
@@ -298,6 +718,16 @@ class Player:
         """
         self.hand.sort()
 
+    def clone(self):
+        """
+        Retourne une copie du joueur, dont la main et les cartes à échanger sont indépendantes de celles du joueur
+        copié.
+        """
+        player = copy.copy(self)
+        player._hand = Cards(self._hand)
+        player._traded_cards = Cards(self._traded_cards)
+        return player
+
     def has_card(self, card: Card) -> bool:
         """
         Retourne True si le joueur a en main la carte donnée en paramètre, False sinon.
@@ -315,9 +745,15 @@ class Player:
         Échange les cartes données en paramètres, i.e les retire de la main du joueur et les ajoute à ses cartes à
         échanger.
         """
-        self._traded_cards = cards
+        self._traded_cards.extend(cards)
         self.remove_from_hand(cards)
 
+    def clear_traded_cards(self) -> None:
+        """
+        Vide les cartes que le joueur a mises à l'échange.
+        """
+        self._traded_cards.clear()
+
     def get_cards_allowed_to_play(self, trick: Trick) -> Cards:
         """
         Retourne la liste des cartes de la main du joueur que ce dernier peut jouer dans le respect des règles du jeu,
@@ -329,11 +765,10 @@ class Player:
             cards_allowed = self._hand
         # sinon
         else:
-            trick.cards.sort()
             cards_as_dict = self._hand.get_as_dict()
             for value, cards in cards_as_dict.items():
                 # le joueur ne peut jouer que les cartes qui ont une valeur supérieure à la plus grande du pli
-                if cards[0] > trick.cards[-1] and \
+                if cards[0].rank > trick.rank and \
                         len(cards) >= trick.number_of_cards:  # les cartes de la valeur doivent être plus nombreuses que
                                                               # le nombre de cartes que le pli attend
                     cards_allowed.extend(cards)
@@ -349,8 +784,8 @@ class Player:
         if self._role == constant.FIRST or self._role == constant.SECOND:
             cards_allowed = self._hand
         elif self._role == constant.BEFORE_LAST or self._role == constant.LAST:
-            max_value = max(self._hand).value
-            cards_allowed = hand_dict[max_value]
+            max_value = self._hand[-1].value
+            cards_allowed = Cards(hand_dict[max_value])
         return cards_allowed
 
     def __str__(self):
@@ -366,56 +801,82 @@ class AIPlayer(Player):
     La classe AIPlayer qui hérite de la classe Player et définit des comportements automatiques de jeu.
     """
 
-    def __init__(self, name: string = ''):
+    def __init__(self, name: string = '', rng: random.Random = None):
         """
-        Le constructeur de la classe AIPlayer, identique à la classe parent.
+        Le constructeur de la classe AIPlayer, identique à la classe parent. Le générateur aléatoire fourni est aussi
+        celui qui décide des coups de l'IA.
         """
-        super().__init__(name)
+        super().__init__(name, rng)
+        # les cartes du dernier coup choisi par random_cards_to_play, réutilisées d'un coup à l'autre
+        self._move = Cards()
+
+    def clone(self):
+        """
+        Retourne une copie de l'IA (voir Player.clone), qui a ses propres cartes de coup.
+        """
+        player = super().clone()
+        player._move = Cards()
+        return player
+
+    def choose_cards_to_play(self, game) -> Cards:
+        """
+        Retourne les cartes que l'IA joue dans la partie donnée en paramètre (un objet Cards vide si elle passe).
+        C'est la méthode appelée par le controller : les IA plus élaborées la redéfinissent.
+        """
+        return self.random_cards_to_play(game.current_trick)
+
+    def choose_cards_to_trade(self, game) -> Cards:
+        """
+        Retourne les cartes que l'IA met à l'échange dans la partie donnée en paramètre.
+        C'est la méthode appelée par le controller : les IA plus élaborées la redéfinissent.
+        """
+        return self.random_cards_to_trade()
 
     def random_cards_to_play(self, trick: Trick) -> Cards:
         """
         Joue des cartes ou passe son tour au hasard en respectant les règles au vu du pli donné en entrée.
+        L'IA choisit au hasard une valeur parmi celles qu'elle peut jouer, puis une combinaison des cartes de cette
+        valeur (sur un pli déjà commencé, passer son tour compte comme une combinaison de plus). Les combinaisons
+        proviennent des tables précalculées de movegen.py.
+        La liste retournée est réutilisée au coup suivant de l'IA : elle doit être jouée (ou copiée) avant de lui
+        demander un autre coup.
         """
-        # récupère les cartes autorisées sous forme d'un dictionnaire
-        cards_allowed = self.get_cards_allowed_to_play(trick)
-        cards_allowed_dict = cards_allowed.get_as_dict()
-        # choisit au hasard une valeur parmi celles qui sont autorisées
-        values = list(cards_allowed_dict.keys())
-        random_value = random.choice(values)
-        # la liste des cartes de la main de l'IA qui ont la valeur retenue
-        cards_allowed_value = cards_allowed_dict[random_value]
-        # si ce n'est pas le début du tour (la liste des cartes du pli n'est pas vide)
-        if len(trick.cards) != 0:
-            # récupère une liste de toutes les combinaisons des cartes de la valeur choisie de longueur le nombre de
-            # cartes demandées pour le pli
-            cards_combination_allowed = list(combinations(cards_allowed_value, trick.number_of_cards))
-            # ajoute une liste vide, si elle est retenue, l'IA passe son tour
-            cards_combination_allowed.append([])
-        # si c'est le début du tour
-        else:
-            # récupère la liste de toutes les combinaisons possibles de longueur au moins 1 des cartes de la valeur
-            # choisie.
-            nb_cards_with_value = len(cards_allowed_value)
-            cards_combination_allowed = [list(comb) for nb_cards in range(1, nb_cards_with_value + 1)
-                                         for comb in combinations(cards_allowed_value, nb_cards)]
-        # retourne un objet Cards, choisi aléatoirement parmi les combinaisons retenues.
-        return Cards(random.choice(cards_combination_allowed))
+        move = self._move
+        move.clear()
+        move.extend(movegen.sample_rank_then_play(self._hand, trick, self._random))
+        return move
 
     def random_cards_to_trade(self):
         """
-        Retourne au hasard des cartes à échanger parmi celles qui ont la plus petite valeur.
+        Retourne au hasard des cartes à échanger : les plus petites cartes pour le président et le vice-président, les
+        plus grandes pour le trou et le vice-trou. Parmi les cartes d'une même valeur, le choix se fait au hasard.
         """
-        cards_allowed = self.get_cards_allowed_to_trade()
-        cards_allowed_dict = cards_allowed.get_as_dict()
         nb_cards_to_trade = 0
         if self._role == constant.FIRST or self._role == constant.LAST:
             nb_cards_to_trade = 2
         elif self._role == constant.SECOND or self._role == constant.BEFORE_LAST:
             nb_cards_to_trade = 1
-        min_value = min(cards_allowed).value
-        cards_to_trade = cards_allowed_dict[min_value]
-        cards_combinations_allowed = list(combinations(cards_to_trade, nb_cards_to_trade))
-        return Cards(random.choice(cards_combinations_allowed))
+        self._hand.sort()
+        values = list(self._hand.get_as_dict().keys())
+        # le trou et le vice-trou donnent leurs meilleures cartes
+        if self._role == constant.BEFORE_LAST or self._role == constant.LAST:
+            values.reverse()
+        # comme pour random_cards_to_play, la liste retournée est réutilisée au coup suivant
+        cards_to_trade = self._move
+        cards_to_trade.clear()
+        for value in values:
+            nb_cards_missing = nb_cards_to_trade - len(cards_to_trade)
+            if nb_cards_missing == 0:
+                break
+            cards_same_value = self._hand.get_as_dict()[value]
+            if len(cards_same_value) <= nb_cards_missing:
+                cards_to_trade.extend(cards_same_value)
+            else:
+                cards_to_trade.extend(self._random.sample(cards_same_value, nb_cards_missing))
+        return cards_to_trade
+
+
+_QUEEN_OF_HEARTS_CODE = VALUE_RANKS['Q'] * NUMBER_OF_SUITS + SUIT_INDEXES['♡']
 
 
 class PresidentGame:
@@ -424,12 +885,19 @@ class PresidentGame:
     effectuées dessus.
     """
 
-    def __init__(self, players: list[Player] = None, number_of_sets: int = 1):
+    def __init__(self, players: list[Player] = None, number_of_sets: int = 1, rng: random.Random = None,
+                 dealer=None):
         """
         Le constructeur de la classe PresidentGame. Crée par défaut une liste de 3 joueurs, initialise les variables et
         commence la première manche.
-        """
-        self.__players = [Player(), Player(), Player()] if players is None else players
+        Le générateur aléatoire utilisé pour la distribution peut être fourni (par défaut, celui du module random) :
+        avec un random.Random initialisé par une graine, la distribution est reproductible.
+        Les distributions peuvent aussi être fournies par un dealer, qui retourne les masques de 52 bits des mains des
+        joueurs avec sa méthode next_masks(first_player_index) (voir dealing.BulkDealer, qui les calcule en masse).
+        """
+        self.__random = random if rng is None else rng
+        self.__dealer = dealer
+        self.__players = [Player(rng=rng), Player(rng=rng), Player(rng=rng)] if players is None else players
         self.__current_trick: Trick = Trick()
         self.__current_player_index: int = 0
         self.__turns_without_plays: int = 0
@@ -438,6 +906,13 @@ class PresidentGame:
         self.__players_without_card: list[Player] = []
         self.__is_trade = False
         self.__nb_players_traded = 0
+        # les cartes mélangées à chaque distribution, réutilisées d'une manche à l'autre
+        self.__deck_cards: list[Card] = list(CARDS)
+        # historique des opérations à annuler (voir enable_history), désactivé par défaut
+        self.__history: list = None
+        # hash de Zobrist de la partie et de son pli (voir zobrist.py), calculés à la distribution
+        self.__hash = 0
+        self.__trick_hash = 0
         self.start_set()
 
     @property
@@ -466,6 +941,7 @@ class PresidentGame:
         """
         Le setter de l'indice du joueur de qui c'est le tour.
         """
+        self.__hash ^= CURRENT_PLAYER_KEYS[self.__current_player_index] ^ CURRENT_PLAYER_KEYS[index]
         self.__current_player_index = index
 
     @property
@@ -482,6 +958,13 @@ class PresidentGame:
         """
         return self.__current_set
 
+    @property
+    def number_of_sets(self):
+        """
+        Le getter du nombre de manches de la partie.
+        """
+        return self.__number_of_sets
+
     @property
     def is_trade(self):
         """
@@ -489,6 +972,160 @@ class PresidentGame:
         """
         return self.__is_trade
 
+    @property
+    def players_without_card(self):
+        """
+        Le getter de la liste des joueurs qui n'ont plus de cartes, dans l'ordre où ils ont fini la manche.
+        """
+        return self.__players_without_card
+
+    @property
+    def zobrist_hash(self):
+        """
+        Le getter du hash de Zobrist de 64 bits de la position (voir zobrist.game_hash). Il est mis à jour à chaque
+        opération de la partie, en temps constant pour les coups : deux positions identiques ont le même hash, quel que
+        soit le chemin qui y a mené.
+        """
+        return self.__hash
+
+    def rehash(self) -> int:
+        """
+        Recalcule entièrement le hash de Zobrist de la partie et le retourne. Nécessaire seulement après avoir modifié
+        les mains des joueurs sans passer par les méthodes de la partie.
+        """
+        self.__trick_hash = trick_hash(self.__current_trick)
+        self.__hash = game_hash(self)
+        return self.__hash
+
+    @classmethod
+    def from_snapshot(cls, snapshot: tuple, number_of_sets: int = 1, players: list[Player] = None):
+        """
+        Crée une partie dans l'état décrit par snapshot (voir la méthode snapshot), sans distribuer les cartes. Si la
+        liste des joueurs n'est pas fournie, ce sont des joueurs (Player) nommés d'après leur place.
+        Un snapshot étant un simple tuple, il peut être envoyé à un autre processus pour y reconstruire la partie.
+        """
+        game = cls.__new__(cls)
+        game.__random = random
+        game.__players = [Player(f"Joueur {index + 1}") for index in range(len(snapshot[0]))] \
+            if players is None else players
+        game.__number_of_sets = number_of_sets
+        game.__current_trick = Trick()
+        game.__deck_cards = list(CARDS)
+        game.__dealer = None
+        game.__history = None
+        game.restore(snapshot)
+        return game
+
+    def clone(self):
+        """
+        Retourne une copie de la partie, indépendante de la partie copiée (joueurs, mains et pli compris), sans son
+        historique. C'est beaucoup moins coûteux qu'un copy.deepcopy.
+        """
+        game = copy.copy(self)
+        game.__players = [player.clone() for player in self.__players]
+        game.__current_trick = self.__current_trick.clone()
+        game.__deck_cards = list(CARDS)
+        game.__players_without_card = [game.__players[self.__players.index(player)]
+                                       for player in self.__players_without_card]
+        game.__history = None
+        return game
+
+    def snapshot(self) -> tuple:
+        """
+        Retourne l'état de la partie sous la forme d'un tuple immuable et compact, à passer à restore :
+        - pour chaque joueur, le masque de 52 bits de sa main (toujours triée), celui de ses cartes à échanger et son
+          rôle,
+        - les codes des cartes du pli dans l'ordre où elles ont été jouées, le nombre de cartes demandées et l'indice
+          du dernier joueur à avoir joué,
+        - l'indice du joueur courant, le nombre de tours sans cartes jouées, la manche en cours, les indices des joueurs
+          qui n'ont plus de cartes, la phase d'échange et le nombre de joueurs qui ont échangé.
+        """
+        players = self.__players
+        trick = self.__current_trick
+        return (tuple((player.hand.mask, player.traded_cards.mask, player.role) for player in players),
+                (tuple(card.code for card in trick.cards), trick.number_of_cards, trick.last_player_index),
+                self.__current_player_index,
+                self.__turns_without_plays,
+                self.__current_set,
+                tuple(players.index(player) for player in self.__players_without_card),
+                self.__is_trade,
+                self.__nb_players_traded)
+
+    def restore(self, snapshot: tuple) -> None:
+        """
+        Remet la partie dans l'état décrit par snapshot (voir la méthode snapshot). Seules les mains qui ont changé
+        sont reconstruites.
+        """
+        players_state, trick_state, self.__current_player_index, self.__turns_without_plays, self.__current_set, \
+            players_without_card, self.__is_trade, self.__nb_players_traded = snapshot
+        for player, (hand_mask, traded_cards_mask, role) in zip(self.__players, players_state):
+            if player.hand.mask != hand_mask:
+                player.hand.clear()
+                player.hand.extend(CARDS[code] for code in mask_codes(hand_mask))
+            if player.traded_cards.mask != traded_cards_mask:
+                player.clear_traded_cards()
+                player.traded_cards.extend(CARDS[code] for code in mask_codes(traded_cards_mask))
+            player.role = role
+        codes, number_of_cards, last_player_index = trick_state
+        self.__current_trick.reset()
+        if len(codes) != 0:
+            self.__current_trick.add_cards([CARDS[code] for code in codes], last_player_index)
+            self.__current_trick.number_of_cards = number_of_cards
+        self.__players_without_card = [self.__players[index] for index in players_without_card]
+        self.rehash()
+
+    def enable_history(self) -> None:
+        """
+        Active l'historique des opérations play, skip_turn, next_player et end_turn, qui permet de les annuler avec
+        undo, ainsi que start_set, add_cards_to_trade, trade_cards et end_set, qui sont plus rares et annulées en
+        restaurant l'état (voir snapshot) d'avant l'opération. L'historique est vidé.
+        Les opérations de l'historique gardent aussi le hash de Zobrist d'avant l'opération, remis en place par undo.
+        """
+        self.__history = []
+
+    def disable_history(self) -> None:
+        """
+        Désactive l'historique des opérations.
+        """
+        self.__history = None
+
+    def history_length(self) -> int:
+        """
+        Retourne le nombre d'opérations de l'historique, à passer à undo pour revenir à l'état actuel.
+        """
+        return len(self.__history)
+
+    def undo(self, history_length: int = None) -> None:
+        """
+        Annule les opérations de l'historique jusqu'à ce qu'il ne contienne plus que history_length opérations (par
+        défaut, annule la dernière opération).
+        """
+        if history_length is None:
+            history_length = len(self.__history) - 1
+        while len(self.__history) > history_length:
+            operation = self.__history.pop()
+            kind = operation[0]
+            if kind == 'next_player':
+                self.__current_player_index = operation[1]
+                self.__hash = operation[2]
+            elif kind == 'skip_turn':
+                self.__turns_without_plays = operation[1]
+                self.__hash = operation[2]
+            elif kind == 'play':
+                _, player_index, cards, turns_without_plays, trick_state, self.__hash, self.__trick_hash = operation
+                player = self.__players[player_index]
+                if len(player.hand) == 0:
+                    self.__players_without_card.pop()
+                # la main étant toujours triée, les cartes retrouvent leur place
+                player.hand.add_sorted(cards)
+                self.__current_trick.undo_add_cards(cards, *trick_state)
+                self.__turns_without_plays = turns_without_plays
+            elif kind == 'end_turn':
+                _, self.__current_trick, self.__current_player_index, self.__turns_without_plays, self.__hash, \
+                    self.__trick_hash = operation
+            elif kind == 'snapshot':
+                self.restore(operation[1])
+
     def get_current_player(self):
         """
         Retourne le joueur dont l'indice est celui du joueur dont c'est le tour (un attribut de classe)
@@ -499,36 +1136,53 @@ class PresidentGame:
         """
         Commence la manche, c'est-à-dire distribue et détermine qui est le joueur qui commence à jouer.
         """
+        if self.__history is not None:
+            self.__history.append(('snapshot', self.snapshot()))
         # distribue les cartes
         self.distribute()
         # s'il s'agit de la première manche de la partie
         if self.__current_set == 0:
             # puis détermine qui commence, i.e le joueur qui a la dame de cœur.
+            queen_of_hearts_bit = 1 << _QUEEN_OF_HEARTS_CODE
             for index, player in enumerate(self.__players):
-                if player.has_card(Card("Q", "♡")):
+                if player.hand.mask & queen_of_hearts_bit:
                     self.__current_player_index = index
+        self.rehash()
 
     def distribute(self):
         """
         Mélange le deck, distribue les cartes aux joueurs et ordonne chacune des cartes.
-        """
-        deck = Deck()
-        deck.shuffle()
-        cards = deck.cards
-        number_of_players = len(self.players)
-        for index, card in enumerate(cards):
+        Les cartes sont les cartes partagées de CARDS, mélangées dans une liste réutilisée d'une manche à l'autre
+        (remise dans l'ordre du deck avant le mélange, pour que la distribution soit la même qu'avec Deck). Chaque
+        joueur reçoit toutes ses cartes en une fois, triées (voir Cards.extend_mask).
+        Si la partie a un dealer, c'est lui qui fournit les mains, selon la même règle.
+        """
+        if self.__dealer is not None:
+            for player, mask in zip(self.__players, self.__dealer.next_masks(self.__current_player_index)):
+                player.hand.extend_mask(mask)
+            return
+        cards = self.__deck_cards
+        cards[:] = CARDS
+        self.__random.shuffle(cards)
+        number_of_players = len(self.__players)
+        for index, player in enumerate(self.__players):
             # commence la distribution par le joueur qui ouvre la manche (il fait partie de ceux qui ont le plus de
-            # cartes)
-            player = self.players[(index + self.__current_player_index) % number_of_players]
-            player.add_to_hand(Cards([card]))
-        # trie les cartes de chaque joueur
-        for player in self.__players:
-            player.hand.sort()
+            # cartes) : le joueur reçoit une carte sur number_of_players à partir de sa place dans la distribution
+            mask = 0
+            for card in cards[(index - self.__current_player_index) % number_of_players::number_of_players]:
+                mask |= 1 << card.code
+            player.hand.extend_mask(mask)
 
     def add_cards_to_trade(self, cards: Cards):
         """
         Ajoute les cartes en paramètre aux cartes du joueur courant à échanger
         """
+        if self.__history is not None:
+            self.__history.append(('snapshot', self.snapshot()))
+        hand_keys = HAND_KEYS[self.__current_player_index]
+        traded_keys = TRADED_KEYS[self.__current_player_index]
+        for card in cards:
+            self.__hash ^= hand_keys[card.code] ^ traded_keys[card.code]
         self.get_current_player().trade(cards)
         self.__nb_players_traded += 1
 
@@ -538,42 +1192,142 @@ class PresidentGame:
         cartes à l'échange.
         """
         roles = constant.ROLES[len(self.__players)]
-        return self.__nb_players_traded == [role for role in roles if role != constant.NEUTRAL]
+        return self.__nb_players_traded == len([role for role in roles if role != constant.NEUTRAL])
 
     def trade_cards(self):
         """
-        Échange les cartes entre les joueurs, entre trou et président, et entre vice-trou et vice-président
+        Échange les cartes entre les joueurs, entre trou et président, et entre vice-trou et vice-président.
+        Termine ensuite la phase d'échange : c'est le trou qui ouvre la manche.
         """
+        if self.__history is not None:
+            self.__history.append(('snapshot', self.snapshot()))
         president = self.__players_without_card[0]
         trou = self.__players_without_card[-1]
-        president.add_to_hand(trou.traded_cards)
-        trou.add_to_hand(president.traded_cards)
-
+        self.__trade_between(president, trou)
         if len(self.__players) > 3:
             vice_president = self.__players_without_card[1]
             vice_trou = self.__players_without_card[-2]
-            vice_president.add_to_hand(vice_trou.traded_cards)
-            vice_trou.add_to_hand(vice_president.traded_cards)
+            self.__trade_between(vice_president, vice_trou)
 
+        for player in self.__players:
+            player.sort_hand()
+            player.clear_traded_cards()
+        trou_index = self.__players.index(trou)
+        self.__hash ^= CURRENT_PLAYER_KEYS[self.__current_player_index] \
+            ^ CURRENT_PLAYER_KEYS[trou_index] ^ TRADE_KEY
+        for position, player in enumerate(self.__players_without_card):
+            self.__hash ^= OUT_KEYS[position][self.__players.index(player)]
+        self.__current_player_index = trou_index
+        self.__players_without_card = []
+        self.__nb_players_traded = 0
         self.__is_trade = False
 
+    def __trade_between(self, first_player: Player, second_player: Player) -> None:
+        """
+        Donne à chacun des deux joueurs les cartes que l'autre a mises à l'échange, et met à jour le hash de la partie.
+        """
+        for giver, receiver in ((first_player, second_player), (second_player, first_player)):
+            traded_keys = TRADED_KEYS[self.__players.index(giver)]
+            hand_keys = HAND_KEYS[self.__players.index(receiver)]
+            for card in giver.traded_cards:
+                self.__hash ^= traded_keys[card.code] ^ hand_keys[card.code]
+        first_player.add_to_hand(second_player.traded_cards)
+        second_player.add_to_hand(first_player.traded_cards)
+
     def next_player(self):
         """
         Passe la main au joueur suivant. Augmente l'indice du joueur dont c'est le tour de 1.
         Revient à 0 si l'indice atteint le nombre de joueurs de la partie.
+        Les joueurs qui n'ont plus de cartes sont sautés, ainsi que les neutres pendant la phase d'échange.
+        """
+        if self.__history is not None:
+            self.__history.append(('next_player', self.__current_player_index, self.__hash))
+        current_player_keys = CURRENT_PLAYER_KEYS
+        self.__hash ^= current_player_keys[self.__current_player_index]
+        number_of_players = len(self.__players)
+        for _ in range(number_of_players):
+            self.__current_player_index = (self.__current_player_index + 1) % number_of_players
+            player = self.__players[self.__current_player_index]
+            if len(player.hand) != 0 and not (self.__is_trade and player.role == constant.NEUTRAL):
+                break
+        self.__hash ^= current_player_keys[self.__current_player_index]
+
+    def apply_move(self, cards: Cards) -> None:
+        """
+        Applique le coup du joueur courant et fait avancer la partie.
+        Pendant la phase d'échange, met les cartes données en paramètre à l'échange (et échange les cartes si tous les
+        joueurs concernés l'ont fait). Sinon, joue les cartes, ou passe si la liste est vide, puis termine le tour, la
+        manche, voire la partie, s'il y a lieu. Passe enfin la main au joueur suivant.
+        Les règles ne sont pas vérifiées ici (voir utils.py).
+        """
+        if self.__is_trade:
+            self.add_cards_to_trade(cards)
+            # l'échange terminé, le trou ouvre la manche
+            if self.is_trade_over():
+                self.trade_cards()
+            else:
+                self.next_player()
+            return
+
+        self.play_move(cards)
+        if self.is_set_ended():
+            self.end_set()
+            if self.is_game_ended():
+                self.end_game()
+            else:
+                self.start_set()
+
+    def play_move(self, cards: Cards) -> None:
+        """
+        Joue les cartes données en paramètre, ou passe si la liste est vide, puis termine le tour s'il y a lieu ou passe
+        la main au joueur suivant. Contrairement à apply_move, ne termine pas la manche : toutes les opérations
+        effectuées peuvent être annulées avec undo.
         """
-        self.__current_player_index = (self.__current_player_index + 1) % len(self.__players)
+        if len(cards) == 0:
+            self.skip_turn()
+        else:
+            self.play(cards)
+
+        # le dernier joueur à avoir posé des cartes ouvre le tour suivant
+        if self.is_set_ended() or self.is_turn_ended():
+            self.end_turn()
+        else:
+            self.next_player()
 
     def skip_turn(self):
         """
         Passe le tour du joueur. Augmente le nombre de tours sans cartes jouées de 1.
         """
-        self.__turns_without_plays += 1
+        if self.__history is not None:
+            self.__history.append(('skip_turn', self.__turns_without_plays, self.__hash))
+        turns_without_plays = self.__turns_without_plays
+        self.__hash ^= TURNS_KEYS[turns_without_plays & TURNS_MASK] ^ TURNS_KEYS[(turns_without_plays + 1) & TURNS_MASK]
+        self.__turns_without_plays = turns_without_plays + 1
 
     def play(self, cards: Cards) -> None:
         """
         Le joueur courant joue les cartes données en paramètre.
         """
+        if self.__history is not None:
+            trick = self.__current_trick
+            # les cartes sont copiées : la liste jouée peut être réutilisée par le joueur (voir AIPlayer)
+            self.__history.append(('play', self.__current_player_index, tuple(cards), self.__turns_without_plays,
+                                   (trick.number_of_cards, trick.last_player_index, trick.rank), self.__hash,
+                                   self.__trick_hash))
+        # met à jour le hash : les cartes passent de la main du joueur au pli, dont il devient le dernier joueur
+        player_index = self.__current_player_index
+        trick = self.__current_trick
+        hand_keys = HAND_KEYS[player_index]
+        game_delta = TURNS_KEYS[self.__turns_without_plays & TURNS_MASK] ^ TURNS_KEYS[0]
+        trick_delta = LAST_PLAYER_KEYS[trick.last_player_index + 1] ^ LAST_PLAYER_KEYS[player_index + 1]
+        for card in cards:
+            code = card.code
+            game_delta ^= hand_keys[code]
+            trick_delta ^= TRICK_KEYS[code]
+        if len(trick.cards) == 0:
+            trick_delta ^= TRICK_NUMBER_KEYS[0] ^ TRICK_NUMBER_KEYS[len(cards)]
+        self.__trick_hash ^= trick_delta
+        self.__hash ^= game_delta ^ trick_delta
         # remet à 0 le nombre de tours sans cartes jouées consécutif.
         self.__turns_without_plays = 0
         current_player = self.get_current_player()
@@ -583,28 +1337,45 @@ class PresidentGame:
         self.__current_trick.add_cards(cards, self.__current_player_index)
         # si le joueur n'a plus de cartes, détermine le rôle du joueur
         if len(current_player.hand) == 0:
+            self.__hash ^= OUT_KEYS[len(self.__players_without_card)][self.__current_player_index]
             self.__players_without_card.append(current_player)
 
     def is_turn_ended(self) -> bool:
         """
         Retourne True si le tour est terminé, false sinon.
         Un tour est terminé si le pli n'est pas vide et si :
-        - soit tous les joueurs ont passé consécutivement,
+        - soit tous les joueurs qui ont encore des cartes ont passé consécutivement,
         - soit si la plus haute carte jouée est un 2.
         """
-        self.__current_trick.cards.sort()
         return not len(self.__current_trick.cards) == 0 \
-               and (self.__turns_without_plays >= len(self.__players)
-                    or self.__current_trick.cards[-1].value == 2)
+               and (self.__turns_without_plays >= len(self.__players) - len(self.__players_without_card)
+                    or self.__current_trick.rank == TWO_RANK)
 
     def end_turn(self) -> None:
         """
         Termine le tour, i.e réinitialise les variables.
-        Le joueur qui commence le tour suivant est celui qui a posé la dernière carte du précédent.
-        """
+        Le joueur qui commence le tour suivant est celui qui a posé la dernière carte du précédent. S'il n'a plus de
+        cartes, c'est le joueur suivant qui commence.
+        """
+        if self.__history is not None:
+            self.__history.append(('end_turn', self.__current_trick, self.__current_player_index,
+                                   self.__turns_without_plays, self.__hash, self.__trick_hash))
+        # le pli vide n'a que les clés de 0 carte demandée et d'aucun dernier joueur
+        empty_trick_hash = TRICK_NUMBER_KEYS[0] ^ LAST_PLAYER_KEYS[0]
+        self.__hash ^= self.__trick_hash ^ empty_trick_hash \
+            ^ CURRENT_PLAYER_KEYS[self.__current_player_index] \
+            ^ CURRENT_PLAYER_KEYS[self.__current_trick.last_player_index] \
+            ^ TURNS_KEYS[self.__turns_without_plays & TURNS_MASK] ^ TURNS_KEYS[0]
+        self.__trick_hash = empty_trick_hash
         self.__current_player_index = self.__current_trick.last_player_index
-        self.__current_trick = Trick()
+        if self.__history is not None:
+            # le pli terminé est gardé par l'historique, pour être remis en place par undo
+            self.__current_trick = Trick()
+        else:
+            self.__current_trick.reset()
         self.__turns_without_plays = 0
+        if len(self.get_current_player().hand) == 0:
+            self.next_player()
 
     def is_set_ended(self) -> bool:
         """
@@ -616,6 +1387,8 @@ class PresidentGame:
         """
         Termine la manche, i.e désigne le trou, le désigne comme premier joueur de la manche suivante et vide sa main.
         """
+        if self.__history is not None:
+            self.__history.append(('snapshot', self.snapshot()))
         for index, player in enumerate(self.__players):
             if len(player.hand) != 0:
                 self.__current_player_index = index
@@ -623,7 +1396,9 @@ class PresidentGame:
                 self.__players_without_card.append(player)
         self.assign_role()
         self.__current_set += 1
-        self.__is_trade = True
+        # les échanges n'ont lieu que si une nouvelle manche commence
+        self.__is_trade = not self.is_game_ended()
+        self.rehash()
 
     def assign_role(self) -> None:
         """
@@ -0,0 +1,152 @@
+import random
+from functools import lru_cache
+from itertools import combinations
+
+from constant import VALUES, NUMBER_OF_SUITS
+
+# Génération des coups légaux à partir de tables précalculées. Les coups ne dépendent que du nombre de cartes de chaque
+# rang de la main et du pli en cours : les tables sont indexées par ces seules informations et mises en cache, et les
+# coups ne sont construits qu'à la demande.
+
+NUMBER_OF_RANKS = len(VALUES)
+_RANK_MASK = (1 << NUMBER_OF_SUITS) - 1
+# _BYTE_RANK_COUNTS[byte] : le nombre de cartes des deux rangs codés par un octet du masque d'une main
+_BYTE_RANK_COUNTS = [((byte & _RANK_MASK).bit_count(), (byte >> NUMBER_OF_SUITS).bit_count()) for byte in range(256)]
+
+# COMBINATIONS[count][size] : les combinaisons de size indices parmi count cartes d'une même valeur
+COMBINATIONS = [[tuple(combinations(range(count), size)) for size in range(NUMBER_OF_SUITS + 1)]
+                for count in range(NUMBER_OF_SUITS + 1)]
+# NON_EMPTY_SUBSETS[count] : les combinaisons non vides de count cartes d'une même valeur, par taille croissante
+NON_EMPTY_SUBSETS = [tuple(combination for size in range(1, count + 1) for combination in COMBINATIONS[count][size])
+                     for count in range(NUMBER_OF_SUITS + 1)]
+
+
+def rank_counts(cards) -> tuple:
+    """
+    Retourne le vecteur du nombre de cartes de chaque rang (de '3' à '2') de la liste de cartes (model.Cards) donnée
+    en paramètre, calculé à partir de son masque, octet par octet.
+    """
+    mask = cards.mask
+    counts = _BYTE_RANK_COUNTS
+    return (counts[mask & 255] + counts[mask >> 8 & 255] + counts[mask >> 16 & 255] + counts[mask >> 24 & 255]
+            + counts[mask >> 32 & 255] + counts[mask >> 40 & 255] + counts[mask >> 48 & 255])[:NUMBER_OF_RANKS]
+
+
+@lru_cache(maxsize=1 << 16)
+def legal_ranks(counts: tuple, trick_rank: int, trick_number_of_cards: int) -> tuple:
+    """
+    Retourne les rangs qui peuvent être joués avec une main de vecteur counts sur un pli dont la plus forte carte a le
+    rang trick_rank (-1 si le pli est vide) et qui demande trick_number_of_cards cartes. Les règles sont celles de
+    Player.get_cards_allowed_to_play.
+    Le résultat est mis en cache : les formes de main se répètent d'une partie à l'autre.
+    """
+    number_of_cards = max(trick_number_of_cards, 1)
+    return tuple(rank for rank in range(trick_rank + 1, NUMBER_OF_RANKS) if counts[rank] >= number_of_cards)
+
+
+@lru_cache(maxsize=1 << 16)
+def legal_moves(counts: tuple, trick_rank: int, trick_number_of_cards: int) -> tuple:
+    """
+    Retourne la table des coups légaux (sans compter le fait de passer) d'une main de vecteur counts sur le pli décrit
+    par trick_rank et trick_number_of_cards. La table est un tuple de triplets (rang, nombre de cartes, nombre cumulé
+    de coups) : un coup est le choix d'une combinaison de cartes d'un rang, et le nombre cumulé permet de retrouver
+    en temps logarithmique le coup d'indice donné.
+    """
+    table = []
+    total = 0
+    for rank in legal_ranks(counts, trick_rank, trick_number_of_cards):
+        # sur un pli vide, le joueur pose autant de cartes du rang qu'il veut, sinon le nombre demandé
+        sizes = range(1, counts[rank] + 1) if trick_rank < 0 else (trick_number_of_cards,)
+        for size in sizes:
+            total += len(COMBINATIONS[counts[rank]][size])
+            table.append((rank, size, total))
+    return tuple(table)
+
+
+def _trick_key(trick) -> tuple:
+    """
+    Retourne le rang de la plus forte carte et le nombre de cartes demandées du pli, -1 et 0 si le pli est vide.
+    """
+    if len(trick.cards) == 0:
+        return -1, 0
+    return trick.rank, trick.number_of_cards
+
+
+def cards_of_rank(cards, rank: int) -> list:
+    """
+    Retourne les cartes de la liste qui ont le rang donné en paramètre, sans copie.
+    """
+    return cards.get_as_dict()[VALUES[rank]]
+
+
+def count_legal_plays(cards, trick) -> int:
+    """
+    Retourne le nombre de coups légaux (sans compter le fait de passer) pour la main cards sur le pli trick.
+    """
+    table = legal_moves(rank_counts(cards), *_trick_key(trick))
+    return table[-1][2] if len(table) > 0 else 0
+
+
+def iter_legal_plays(cards, trick):
+    """
+    Itère sur les coups légaux pour la main cards (model.Cards) sur le pli trick (model.Trick), sous forme de listes de
+    cartes, sans construire la liste complète des coups.
+    """
+    for rank, size, _ in legal_moves(rank_counts(cards), *_trick_key(trick)):
+        rank_cards = cards_of_rank(cards, rank)
+        for combination in COMBINATIONS[len(rank_cards)][size]:
+            yield [rank_cards[index] for index in combination]
+
+
+def legal_play(cards, trick, move_index: int) -> list:
+    """
+    Retourne le coup légal d'indice move_index (entre 0 et count_legal_plays - 1), dans l'ordre de iter_legal_plays.
+    """
+    table = legal_moves(rank_counts(cards), *_trick_key(trick))
+    # recherche dichotomique du groupe (rang, nombre de cartes) qui contient le coup
+    low, high = 0, len(table) - 1
+    while low < high:
+        middle = (low + high) // 2
+        if table[middle][2] <= move_index:
+            low = middle + 1
+        else:
+            high = middle
+    rank, size, total = table[low]
+    rank_cards = cards_of_rank(cards, rank)
+    group = COMBINATIONS[len(rank_cards)][size]
+    combination = group[move_index - (total - len(group))]
+    return [rank_cards[index] for index in combination]
+
+
+def sample_legal_play(cards, trick, rng: random.Random = None) -> list:
+    """
+    Retourne un coup légal tiré uniformément pour la main cards sur le pli trick, ou une liste vide si aucun coup
+    n'est possible.
+    """
+    number_of_plays = count_legal_plays(cards, trick)
+    if number_of_plays == 0:
+        return []
+    return legal_play(cards, trick, (random if rng is None else rng).randrange(number_of_plays))
+
+
+def sample_rank_then_play(cards, trick, rng: random.Random = None) -> list:
+    """
+    Retourne un coup tiré comme le fait AIPlayer : un rang au hasard parmi les rangs jouables, puis une combinaison de
+    cartes de ce rang au hasard. Sur un pli non vide, le fait de passer (une liste vide) est une combinaison de plus.
+    Retourne une liste vide si aucun rang n'est jouable.
+    """
+    rng = random if rng is None else rng
+    trick_rank, trick_number_of_cards = _trick_key(trick)
+    ranks = legal_ranks(rank_counts(cards), trick_rank, trick_number_of_cards)
+    if len(ranks) == 0:
+        return []
+    rank_cards = cards_of_rank(cards, rng.choice(ranks))
+    # sur un pli vide, toutes les combinaisons non vides de cartes du rang sont possibles
+    if trick_rank < 0:
+        return [rank_cards[index] for index in rng.choice(NON_EMPTY_SUBSETS[len(rank_cards)])]
+    combinations_allowed = COMBINATIONS[len(rank_cards)][trick_number_of_cards]
+    # le dernier indice correspond au fait de passer
+    combination_index = rng.randrange(len(combinations_allowed) + 1)
+    if combination_index == len(combinations_allowed):
+        return []
+    return [rank_cards[index] for index in combinations_allowed[combination_index]]
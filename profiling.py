@@ -0,0 +1,245 @@
+import functools
+import string
+import time
+import weakref
+
+import utils
+from controller import PresidentGameController
+from model import PresidentGame
+
+# Instrumentation optionnelle du jeu. Tant qu'elle n'est pas activée, elle ne coûte rien : enable remplace les fonctions
+# instrumentées par des versions chronométrées, et disable remet les fonctions d'origine en place.
+
+# fonctions instrumentées : (objet qui les porte, nom de l'attribut, nom de la mesure)
+TIMED_FUNCTIONS = [
+    (PresidentGame, "start_set", "PresidentGame.start_set"),
+    (PresidentGame, "distribute", "PresidentGame.distribute"),
+    (PresidentGame, "end_set", "PresidentGame.end_set"),
+    (PresidentGameController, "ai_play", "PresidentGameController.ai_play"),
+    (PresidentGameController, "ai_trade", "PresidentGameController.ai_trade"),
+    (PresidentGameController, "get_game_dto", "PresidentGameController.get_game_dto"),
+    (utils, "check_request", "utils.check_request"),
+    (utils, "check_skip", "utils.check_skip"),
+    (utils, "check_cards", "utils.check_cards"),
+    (utils, "check_play", "utils.check_play"),
+    (utils, "check_trade", "utils.check_trade"),
+    (utils.MoveValidator, "validate", "utils.MoveValidator.validate")
+]
+# mesures dont la durée alimente l'histogramme de latence des décisions des IA
+AI_FUNCTIONS = {"PresidentGameController.ai_play", "PresidentGameController.ai_trade"}
+
+MOVES_PER_SET_BUCKETS = (25, 50, 75, 100, 125, 150, 200, 300)
+AI_LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    """
+    La classe Histogram compte les valeurs observées par intervalles, à la manière des histogrammes de Prometheus :
+    chaque borne compte les valeurs qui lui sont inférieures ou égales.
+    """
+
+    def __init__(self, buckets: tuple):
+        """
+        Le constructeur de la classe Histogram. buckets contient les bornes supérieures des intervalles, croissantes.
+        """
+        self.__buckets = tuple(buckets)
+        self.__counts = [0] * (len(self.__buckets) + 1)
+        self.__sum = 0.0
+        self.__count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Compte la valeur donnée en paramètre.
+        """
+        index = 0
+        for bucket in self.__buckets:
+            if value <= bucket:
+                break
+            index += 1
+        self.__counts[index] += 1
+        self.__sum += value
+        self.__count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Retourne le contenu de l'histogramme : le nombre cumulé de valeurs par borne (la dernière étant +Inf), la
+        somme et le nombre des valeurs.
+        """
+        buckets = {}
+        cumulated_count = 0
+        for bucket, count in zip(self.__buckets + (float("inf"),), self.__counts):
+            cumulated_count += count
+            buckets[bucket] = cumulated_count
+        return {"buckets": buckets, "sum": self.__sum, "count": self.__count}
+
+
+class Profiler:
+    """
+    La classe Profiler chronomètre et compte les appels des fonctions de TIMED_FUNCTIONS, et tient les histogrammes du
+    nombre de coups par manche et de la latence des décisions des IA (durée de ai_play et ai_trade, coup compris).
+    Un seul Profiler doit être activé à la fois.
+    """
+
+    def __init__(self):
+        """
+        Le constructeur de la classe Profiler.
+        """
+        self.__originals = []
+        self.__moves_in_set = weakref.WeakKeyDictionary()
+        self.reset()
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+
+    def is_enabled(self) -> bool:
+        """
+        Retourne True si l'instrumentation est activée.
+        """
+        return len(self.__originals) != 0
+
+    def reset(self) -> None:
+        """
+        Remet à zéro toutes les mesures.
+        """
+        self.__calls = {name: 0 for _, _, name in TIMED_FUNCTIONS}
+        self.__seconds = {name: 0.0 for _, _, name in TIMED_FUNCTIONS}
+        self.__moves_per_set = Histogram(MOVES_PER_SET_BUCKETS)
+        self.__ai_latency = Histogram(AI_LATENCY_BUCKETS)
+
+    def enable(self) -> None:
+        """
+        Active l'instrumentation, en remplaçant les fonctions instrumentées par des versions chronométrées.
+        """
+        if self.is_enabled():
+            return
+        for owner, attribute, name in TIMED_FUNCTIONS:
+            original = owner.__dict__[attribute]
+            self.__originals.append((owner, attribute, original))
+            setattr(owner, attribute, self.__timed(name, original))
+        original_apply_move = PresidentGame.__dict__["apply_move"]
+        self.__originals.append((PresidentGame, "apply_move", original_apply_move))
+        setattr(PresidentGame, "apply_move", self.__counted(original_apply_move))
+
+    def disable(self) -> None:
+        """
+        Désactive l'instrumentation, en remettant en place les fonctions d'origine. Les mesures sont conservées.
+        """
+        for owner, attribute, original in reversed(self.__originals):
+            setattr(owner, attribute, original)
+        self.__originals.clear()
+
+    def __timed(self, name: string, function):
+        """
+        Retourne la version chronométrée de la fonction donnée en paramètre.
+        """
+        is_ai_function = name in AI_FUNCTIONS
+        is_end_set = name == "PresidentGame.end_set"
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def timed_function(*args, **kwargs):
+            if is_end_set:
+                self.__moves_per_set.observe(self.__moves_in_set.pop(args[0], 0))
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                duration = perf_counter() - start
+                self.__calls[name] += 1
+                self.__seconds[name] += duration
+                if is_ai_function:
+                    self.__ai_latency.observe(duration)
+        return timed_function
+
+    def __counted(self, apply_move):
+        """
+        Retourne la version de PresidentGame.apply_move qui compte les coups de la manche en cours.
+        """
+        moves_in_set = self.__moves_in_set
+
+        @functools.wraps(apply_move)
+        def counted_apply_move(game, cards):
+            moves_in_set[game] = moves_in_set.get(game, 0) + 1
+            return apply_move(game, cards)
+        return counted_apply_move
+
+    def snapshot(self) -> dict:
+        """
+        Retourne toutes les mesures sous forme d'un dictionnaire :
+        - functions : pour chaque fonction instrumentée, le nombre d'appels (calls) et la durée totale en secondes
+          (seconds),
+        - moves_per_set et ai_latency : le contenu des histogrammes (voir Histogram.snapshot).
+        """
+        return {
+            "functions": {name: {"calls": self.__calls[name], "seconds": self.__seconds[name]}
+                          for name in self.__calls},
+            "moves_per_set": self.__moves_per_set.snapshot(),
+            "ai_latency": self.__ai_latency.snapshot()
+        }
+
+    def prometheus_text(self) -> string:
+        """
+        Retourne toutes les mesures au format texte de Prometheus.
+        """
+        snapshot = self.snapshot()
+        lines = ["# HELP president_function_calls_total Nombre d'appels des fonctions instrumentées.",
+                 "# TYPE president_function_calls_total counter"]
+        for name, values in snapshot["functions"].items():
+            lines.append(f'president_function_calls_total{{function="{name}"}} {values["calls"]}')
+        lines += ["# HELP president_function_seconds_total Durée totale des appels des fonctions instrumentées.",
+                  "# TYPE president_function_seconds_total counter"]
+        for name, values in snapshot["functions"].items():
+            lines.append(f'president_function_seconds_total{{function="{name}"}} {values["seconds"]!r}')
+        for metric, help_text in (("moves_per_set", "Nombre de coups (échanges compris) par manche."),
+                                  ("ai_latency", "Durée d'un coup d'IA (ai_play ou ai_trade), en secondes.")):
+            histogram = snapshot[metric]
+            lines += [f"# HELP president_{metric} {help_text}", f"# TYPE president_{metric} histogram"]
+            for bucket, count in histogram["buckets"].items():
+                bucket_str = "+Inf" if bucket == float("inf") else repr(bucket)
+                lines.append(f'president_{metric}_bucket{{le="{bucket_str}"}} {count}')
+            lines.append(f"president_{metric}_sum {histogram['sum']!r}")
+            lines.append(f"president_{metric}_count {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# instrumentation par défaut, utilisée par les fonctions du module
+PROFILER = Profiler()
+
+
+def enable() -> None:
+    """
+    Active l'instrumentation par défaut.
+    """
+    PROFILER.enable()
+
+
+def disable() -> None:
+    """
+    Désactive l'instrumentation par défaut.
+    """
+    PROFILER.disable()
+
+
+def reset() -> None:
+    """
+    Remet à zéro les mesures de l'instrumentation par défaut.
+    """
+    PROFILER.reset()
+
+
+def snapshot() -> dict:
+    """
+    Retourne les mesures de l'instrumentation par défaut (voir Profiler.snapshot).
+    """
+    return PROFILER.snapshot()
+
+
+def prometheus_text() -> string:
+    """
+    Retourne les mesures de l'instrumentation par défaut au format texte de Prometheus.
+    """
+    return PROFILER.prometheus_text()
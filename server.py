@@ -0,0 +1,182 @@
+import argparse
+import asyncio
+import json
+import string
+
+import profiling
+from async_controller import AIWorkerPool, AsyncPresidentGameController
+from exception import NotInRulesException, WrongRequestException
+from model import Player, AIPlayer
+
+# Serveur de jeu asynchrone : un seul processus et une seule boucle d'événements hébergent toutes les tables. Chaque
+# client envoie des requêtes JSON, une par ligne, et reçoit une réponse JSON par ligne, dans le même ordre.
+# Les requêtes possibles sont :
+# - {"action": "create", "players": [{"name": "...", "ai": false}, ...], "sets": 1} : crée une table,
+# - {"action": "move", "table": 1, "skip": false, "cards": ["10♡", "10♧"]} : joue ou échange des cartes, ou passe,
+#   avec les mêmes entrées skip et cards que PresidentGameController.process,
+# - {"action": "state", "table": 1} : retourne l'état complet de la table,
+# - {"action": "events", "table": 1, "since": 12} : retourne les événements qui suivent le numéro since,
+# - {"action": "close", "table": 1} : ferme la table,
+# - {"action": "metrics"} : retourne les mesures de l'instrumentation (voir profiling) au format texte de Prometheus.
+# La réponse contient le numéro de la table et, selon la requête, son DTO complet ("game", à la création et pour
+# state) ou les événements de la partie depuis la requête précédente ("delta", pour move, voir
+# PresidentGameController.take_delta) ; ou une entrée "error" si la requête a échoué.
+# Le serveur fait confiance à ses clients : une connexion n'est liée ni à une table ni à une place, et une requête move
+# joue pour le joueur dont c'est le tour, quel que soit le client qui l'envoie. Il doit donc être placé derrière un
+# service qui authentifie les joueurs et ne transmet à une table que les coups du joueur dont c'est le tour.
+
+
+class GameServer:
+    """
+    La classe GameServer héberge des tables de jeu, chacune pilotée par un AsyncPresidentGameController, et traite les
+    requêtes des clients. Les tours des IA sont joués un coup à la fois : sans pool, en rendant la main à la boucle
+    d'événements entre deux coups, et avec un AIWorkerPool, en faisant réfléchir les IA hors de la boucle. Une table où
+    les IA jouent ne bloque donc pas les autres.
+    """
+
+    def __init__(self, pool: AIWorkerPool = None):
+        """
+        Le constructeur de la classe GameServer.
+        """
+        self.__tables: dict[int, AsyncPresidentGameController] = {}
+        self.__pool = pool
+        self.__next_table_id = 1
+
+    @property
+    def tables(self) -> dict[int, AsyncPresidentGameController]:
+        """
+        Le getter des tables ouvertes, indexées par leur numéro.
+        """
+        return self.__tables
+
+    def create_table(self, players: list[Player] = None, number_of_sets: int = 1) -> int:
+        """
+        Ouvre une nouvelle table et retourne son numéro. Les tours des IA ne sont pas encore joués.
+        """
+        table_id = self.__next_table_id
+        self.__next_table_id += 1
+        self.__tables[table_id] = AsyncPresidentGameController(players, number_of_sets, self.__pool)
+        return table_id
+
+    async def close_table(self, table_id: int) -> None:
+        """
+        Ferme la table dont le numéro est donné en paramètre.
+        """
+        await self.get_table(table_id).close()
+        del self.__tables[table_id]
+
+    def get_table(self, table_id: int) -> AsyncPresidentGameController:
+        """
+        Retourne le contrôleur de la table dont le numéro est donné en paramètre.
+        """
+        # True et False sont des int pour Python, mais pas des numéros de table
+        if not isinstance(table_id, int) or isinstance(table_id, bool) or table_id not in self.__tables:
+            raise WrongRequestException(f"La table {table_id} n'existe pas.")
+        return self.__tables[table_id]
+
+    async def handle_request(self, request: dict) -> dict:
+        """
+        Traite une requête d'un client et retourne la réponse à lui envoyer.
+        Les requêtes d'une même table sont traitées l'une après l'autre, dans l'ordre d'arrivée, tours des IA compris.
+        """
+        try:
+            if not isinstance(request, dict):
+                raise WrongRequestException("La requête doit être un objet JSON.")
+            action = request.get("action", "move")
+            if action == "metrics":
+                return {"metrics": profiling.prometheus_text()}
+            if action == "create":
+                number_of_sets = request.get("sets", 1)
+                if not isinstance(number_of_sets, int) or isinstance(number_of_sets, bool) or number_of_sets < 1:
+                    raise WrongRequestException("Le nombre de manches doit être un entier positif.")
+                table_id = self.create_table(parse_players(request.get("players")), number_of_sets)
+            else:
+                table_id = request.get("table")
+                self.get_table(table_id)
+                if action == "close":
+                    await self.close_table(table_id)
+                    return {"table": table_id, "closed": True}
+                if action == "events":
+                    since = request.get("since")
+                    if not isinstance(since, int) or isinstance(since, bool):
+                        raise WrongRequestException("La requête doit contenir une entrée 'since', entière.")
+                    return {"table": table_id, "events": self.__tables[table_id].controller.events_since(since)}
+                if action not in ("move", "state"):
+                    raise WrongRequestException(f"L'action '{action}' n'existe pas.")
+            table = self.__tables[table_id]
+            if action == "move":
+                if table.is_game_ended():
+                    raise WrongRequestException("La partie est terminée.")
+                return {"table": table_id, "delta": await table.process(request)}
+            else:
+                await table.ai_turn()
+            return {"table": table_id, "game": table.get_game_dto()}
+        except (NotInRulesException, WrongRequestException) as error:
+            return {"error": str(error), "type": type(error).__name__}
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Lit les requêtes d'un client, une par ligne, et lui écrit les réponses, une par ligne, jusqu'à ce qu'il ferme
+        la connexion.
+        """
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"error": "La requête n'est pas du JSON valide.", "type": "WrongRequestException"}
+                else:
+                    response = await self.handle_request(request)
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: string = "127.0.0.1", port: int = 8765) -> asyncio.Server:
+        """
+        Démarre l'écoute des connexions TCP et retourne le serveur asyncio.
+        """
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+def parse_players(players_request) -> list[Player]:
+    """
+    Retourne les joueurs décrits dans une requête de création de table : une liste de dictionnaires avec un nom et
+    une entrée ai, vraie pour une intelligence artificielle. Par défaut, un joueur humain et trois IA.
+    """
+    if players_request is None:
+        return [Player("Joueur"), AIPlayer("IA 1"), AIPlayer("IA 2"), AIPlayer("IA 3")]
+    if not isinstance(players_request, list) or not all(isinstance(player, dict) for player in players_request):
+        raise WrongRequestException("Les joueurs doivent être une liste d'objets {'name', 'ai'}.")
+    if not 3 <= len(players_request) <= 6:
+        raise WrongRequestException("Le jeu se joue de 3 à 6 joueurs.")
+    return [(AIPlayer if player.get("ai", False) else Player)(str(player.get("name", "")))
+            for player in players_request]
+
+
+async def main(host: string, port: int, ai_threads: bool = False) -> None:
+    """
+    Lance le serveur de jeu et le fait tourner jusqu'à son interruption.
+    """
+    pool = AIWorkerPool() if ai_threads else None
+    server = await GameServer(pool).serve(host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serveur de parties du jeu du Président (JSON ligne par ligne).")
+    parser.add_argument("--host", default="127.0.0.1", help="adresse d'écoute")
+    parser.add_argument("--port", type=int, default=8765, help="port d'écoute")
+    parser.add_argument("--ai-threads", action="store_true", help="fait réfléchir les IA dans un pool de threads")
+    parser.add_argument("--profile", action="store_true", help="active l'instrumentation (action 'metrics')")
+    arguments = parser.parse_args()
+    if arguments.profile:
+        profiling.enable()
+    asyncio.run(main(arguments.host, arguments.port, arguments.ai_threads))
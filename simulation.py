@@ -0,0 +1,98 @@
+import argparse
+import time
+
+import constant
+import profiling
+from gamelog import GameLogWriter
+from model import PresidentGame, AIPlayer
+
+
+def play_game(game: PresidentGame, roles: list[dict] = None, log: GameLogWriter = None) -> None:
+    """
+    Joue la partie donnée en paramètre jusqu'à la fin, tous ses joueurs étant des IA.
+    Si roles est fourni (une liste de dictionnaires, un par place à la table), y compte le rôle obtenu par chaque
+    joueur à la fin de chaque manche.
+    Si log est fourni, la partie, qui vient d'être créée, y est enregistrée.
+    """
+    apply_move = game.apply_move if log is None else lambda cards: log.apply_move(game, cards)
+    if log is not None:
+        log.start_game(game)
+    current_set = game.current_set
+    while not game.is_game_ended():
+        player = game.get_current_player()
+        if game.is_trade:
+            apply_move(player.choose_cards_to_trade(game))
+        else:
+            apply_move(player.choose_cards_to_play(game))
+        # une manche vient de se terminer : enregistre les rôles attribués
+        if roles is not None and game.current_set != current_set:
+            current_set = game.current_set
+            for seat, seat_player in enumerate(game.players):
+                roles[seat][seat_player.role] = roles[seat].get(seat_player.role, 0) + 1
+
+
+def simulate(number_of_games: int, number_of_players: int = 4, number_of_sets: int = 1, log_path: str = None,
+             bulk_deal: bool = False) -> dict:
+    """
+    Joue number_of_games parties entre number_of_players IA, sans vue ni DTO, et retourne les statistiques de la
+    simulation sous forme d'un dictionnaire (les parties sont enregistrées dans le journal log_path s'il est fourni) :
+    - le nombre de parties et de manches jouées,
+    - la durée de la simulation en secondes et le nombre de parties par seconde,
+    - pour chaque place à la table, le nombre de fois où chaque rôle a été obtenu.
+    Avec bulk_deal, les cartes sont distribuées en masse par dealing.BulkDealer (NumPy est alors nécessaire).
+    """
+    if number_of_players not in constant.ROLES:
+        raise ValueError("Le jeu se joue de 3 à 6 joueurs.")
+    dealer = None
+    if bulk_deal:
+        from dealing import BulkDealer
+        dealer = BulkDealer(number_of_players, min(number_of_games * number_of_sets, 4096))
+    roles = [{} for _ in range(number_of_players)]
+    log = None if log_path is None else GameLogWriter(log_path)
+    start = time.perf_counter()
+    try:
+        for _ in range(number_of_games):
+            players = [AIPlayer(f"IA {seat + 1}") for seat in range(number_of_players)]
+            play_game(PresidentGame(players, number_of_sets, dealer=dealer), roles, log)
+    finally:
+        if log is not None:
+            log.close()
+    duration = time.perf_counter() - start
+    return {
+        "games": number_of_games,
+        "sets": number_of_games * number_of_sets,
+        "seconds": duration,
+        "games_per_second": number_of_games / duration if duration > 0 else float("inf"),
+        "roles": roles
+    }
+
+
+def format_result(result: dict) -> str:
+    """
+    Retourne le résultat d'une simulation sous une forme lisible.
+    """
+    result_str = f"{result['games']} parties ({result['sets']} manches) en {result['seconds']:.2f} s, " \
+                 f"soit {result['games_per_second']:.0f} parties/s\n"
+    for seat, roles in enumerate(result["roles"]):
+        roles_str = ", ".join(f"{role} : {count}" for role, count in roles.items())
+        result_str += f"Place {seat + 1} - {roles_str}\n"
+    return result_str
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simule des parties du jeu du Président entre IA.")
+    parser.add_argument("--games", type=int, default=1000, help="nombre de parties à jouer")
+    parser.add_argument("--players", type=int, default=4, choices=range(3, 7), help="nombre de joueurs (3 à 6)")
+    parser.add_argument("--sets", type=int, default=1, help="nombre de manches par partie")
+    parser.add_argument("--log", default=None, help="journal où enregistrer les parties")
+    parser.add_argument("--bulk-deal", action="store_true", help="distribue les cartes en masse, avec NumPy")
+    parser.add_argument("--profile", action="store_true",
+                        help="mesure les durées des phases du jeu et les affiche au format de Prometheus")
+    arguments = parser.parse_args()
+    if arguments.profile:
+        profiling.enable()
+    print(format_result(simulate(arguments.games, arguments.players, arguments.sets, arguments.log,
+                                 arguments.bulk_deal)), end="")
+    if arguments.profile:
+        profiling.disable()
+        print(profiling.prometheus_text(), end="")
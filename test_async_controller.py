@@ -0,0 +1,85 @@
+import asyncio
+import pickle
+import random
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from async_controller import AIWorkerPool, AsyncPresidentGameController
+from exception import NotInRulesException
+from model import AIPlayer, Cards, Player, PresidentGame
+
+
+class SlowAIPlayer(AIPlayer):
+    """
+    Une IA qui attend, avant de jouer, que l'événement qu'on lui donne soit levé.
+    """
+    def __init__(self, name, event):
+        super().__init__(name, random.Random(0))
+        self.event = event
+
+    def choose_cards_to_play(self, game):
+        self.event.wait(5)
+        return super().choose_cards_to_play(game)
+
+
+class TestAsyncPresidentGameController(unittest.IsolatedAsyncioTestCase):
+    def ai_players(self, seed):
+        return [AIPlayer(f"IA {index}", random.Random(seed + index)) for index in range(4)]
+
+    async def test_ai_game_in_thread_pool(self):
+        pool = AIWorkerPool(max_pending=2)
+        try:
+            tables = [AsyncPresidentGameController(self.ai_players(seed), 2, pool) for seed in range(5)]
+            await asyncio.gather(*(table.ai_turn() for table in tables))
+            self.assertTrue(all(table.is_game_ended() for table in tables))
+            self.assertEqual(pool.pending, 0)
+        finally:
+            pool.shutdown()
+
+    async def test_ai_game_in_process_pool(self):
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            table = AsyncPresidentGameController(self.ai_players(0), 1, AIWorkerPool(executor))
+            await table.ai_turn()
+            self.assertTrue(table.is_game_ended())
+
+    async def test_backpressure(self):
+        event = threading.Event()
+        pool = AIWorkerPool(ThreadPoolExecutor(max_workers=4), max_pending=1)
+        tables = [AsyncPresidentGameController([SlowAIPlayer(f"IA {index}", event) for index in range(3)], 1, pool)
+                  for _ in range(2)]
+        tasks = [asyncio.create_task(table.ai_turn()) for table in tables]
+        for _ in range(10):
+            await asyncio.sleep(0.01)
+        # une seule décision est en cours, la seconde table attend sans bloquer la boucle
+        self.assertTrue(pool.is_saturated())
+        self.assertEqual(pool.pending, 1)
+        event.set()
+        await asyncio.gather(*tasks)
+        self.assertTrue(all(table.is_game_ended() for table in tables))
+
+    async def test_requests_are_processed_in_order(self):
+        table = AsyncPresidentGameController([Player("A"), Player("B"), Player("C")])
+        game = table.controller.game
+        first_player = game.get_current_player()
+        cards = [str(card) for card in first_player.hand.get_as_dict()[first_player.hand[0].value]]
+        # le second coup est refusé car le joueur ne peut pas jouer deux fois de suite les mêmes cartes
+        results = await asyncio.gather(table.process({"skip": False, "cards": cards}),
+                                       table.process({"skip": False, "cards": cards}), return_exceptions=True)
+        self.assertEqual(results[0]["events"][0], {"type": "play", "player": game.players.index(first_player),
+                                               "cards": cards, "sequence": 1})
+        self.assertIsInstance(results[1], NotInRulesException)
+        self.assertEqual(game.current_trick.number_of_cards, len(cards))
+        await table.close()
+
+    def test_pickled_cards_keep_their_index(self):
+        game = PresidentGame(self.ai_players(0), rng=random.Random(0))
+        hand = game.players[0].hand
+        copied_hand = pickle.loads(pickle.dumps(hand))
+        self.assertIsInstance(copied_hand, Cards)
+        self.assertEqual(copied_hand.mask, hand.mask)
+        self.assertEqual(copied_hand.get_as_dict().keys(), hand.get_as_dict().keys())
+
+
+if __name__ == '__main__':
+    unittest.main()
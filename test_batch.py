@@ -0,0 +1,53 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import model
+
+if numpy is not None:
+    import batch
+
+
+@unittest.skipIf(numpy is None, "NumPy is required by the batch engine")
+class TestBatchPresidentGame(unittest.TestCase):
+    def test_allowed_ranks_match_model(self):
+        """ The batch legal moves are those of Player.get_cards_allowed_to_play. """
+        games = batch.BatchPresidentGame(50, 4, seed=3)
+        for _ in range(15):
+            allowed = games.allowed_ranks()
+            for index in range(50):
+                if games.is_ended[index]:
+                    continue
+                player = model.Player('Test')
+                player.add_to_hand(model.Cards(model.Card.from_code(int(code)) for code in
+                                               numpy.flatnonzero(games.hands[index, games.current_player[index]])))
+                trick = model.Trick()
+                if games.trick_rank[index] >= 0:
+                    rank = int(games.trick_rank[index])
+                    trick.add_cards(model.Cards(model.Card.from_code(rank * 4 + suit)
+                                                for suit in range(games.trick_number_of_cards[index])), 0)
+                expected = sorted({card.rank for card in player.get_cards_allowed_to_play(trick)})
+                self.assertEqual(numpy.flatnonzero(allowed[index]).tolist(), expected)
+            games.step()
+
+    def test_sets_end_with_every_role(self):
+        for number_of_players in range(3, 7):
+            games = batch.BatchPresidentGame(30, number_of_players, seed=number_of_players)
+            positions = games.run()
+            self.assertTrue(games.is_ended.all())
+            self.assertTrue((numpy.sort(positions, axis=1) == numpy.arange(number_of_players)).all(),
+                            "Every player gets a different finishing position")
+            self.assertTrue(((games.hands.sum(axis=2) > 0).sum(axis=1) == 1).all(),
+                            "Only the last player keeps cards")
+
+    def test_first_player_has_queen_of_hearts(self):
+        games = batch.BatchPresidentGame(20, 5, seed=0)
+        queen_of_hearts = model.Card('Q', '♡').code
+        self.assertTrue(games.hands[numpy.arange(20), games.current_player, queen_of_hearts].all())
+
+
+if __name__ == '__main__':
+    unittest.main()
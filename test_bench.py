@@ -0,0 +1,25 @@
+import json
+import unittest
+
+import bench
+
+
+class TestBench(unittest.TestCase):
+    def test_run_is_json_serializable(self):
+        result = bench.run(["cards_get_as_dict", "full_game_3_players"], min_time=0.01, repeat=1)
+        self.assertEqual(set(result["results"]), {"cards_get_as_dict", "full_game_3_players"})
+        self.assertTrue(all(value["seconds_per_operation"] > 0 for value in result["results"].values()))
+        self.assertEqual(json.loads(json.dumps(result)), result)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"results": {"a": {"seconds_per_operation": 1.0}, "b": {"seconds_per_operation": 1.0}}}
+        current = {"results": {"a": {"seconds_per_operation": 1.05}, "b": {"seconds_per_operation": 1.5},
+                               "c": {"seconds_per_operation": 1.0}}}
+        comparisons = {comparison["name"]: comparison for comparison in bench.compare(baseline, current, 0.1)}
+        self.assertEqual(set(comparisons), {"a", "b"})
+        self.assertFalse(comparisons["a"]["regression"])
+        self.assertTrue(comparisons["b"]["regression"])
+
+
+if __name__ == '__main__':
+    unittest.main()
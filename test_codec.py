@@ -0,0 +1,59 @@
+import random
+import unittest
+
+import codec
+from controller import PresidentGameController
+from model import AIPlayer
+
+
+class TestCodec(unittest.TestCase):
+    def test_game_dtos_round_trip(self):
+        players = [AIPlayer(f"IA {index}", random.Random(index)) for index in range(5)]
+        controller = PresidentGameController(players, 2, auto_ai=False)
+        while True:
+            game_dto = controller.get_game_dto()
+            data = codec.encode_game_dto(game_dto)
+            self.assertEqual(codec.decode_game_dto(data), game_dto)
+            self.assertEqual(list(codec.decode_game_dto(data)), list(game_dto))
+            if not controller.ai_step():
+                break
+
+    def test_unusual_dto_round_trips(self):
+        game_dto = {
+            "current_player_index": 1,
+            "current_player": {"name": "Invité", "hand": ["2♧", "3♡", "3♡"], "role": "Arbitre"},
+            "turns_without_play": 300,
+            "current_set": 1,
+            "is_trade": True,
+            "current_trick": {"cards": ["10♡", "10♤"], "number_of_cards": 2, "last_player": "Inconnu"},
+            "players": [{"name": "Benoît", "hand": ["3♡", "10♧", "2♧"], "role": None},
+                        {"name": "Norbert", "hand": [], "role": "Trou"}],
+            "is_ended": False
+        }
+        self.assertEqual(codec.decode_game_dto(codec.encode_game_dto(game_dto)), game_dto)
+
+    def test_requests_round_trip(self):
+        for request in ({"skip": True}, {"skip": False, "cards": ["10♡", "10♧"]}, {"table": 1000, "skip": True},
+                        {"skip": False, "cards": []}):
+            self.assertEqual(codec.decode_request(codec.encode_request(request)), request)
+
+    def test_truncated_messages(self):
+        controller = PresidentGameController([AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)],
+                                             auto_ai=False)
+        messages = [codec.encode_request({"table": 300, "skip": False, "cards": ["10♡"]}),
+                    codec.encode_game_dto(controller.get_game_dto())]
+        for message in messages:
+            for length in range(len(message)):
+                with self.assertRaisesRegex(IndexError, "tronqué"):
+                    (codec.decode_request if message[0] == codec.REQUEST_MESSAGE else codec.decode_game_dto)(
+                        message[:length])
+
+    def test_wrong_values(self):
+        self.assertRaises(ValueError, codec.encode_request, {"skip": False, "cards": ["11♡"]})
+        self.assertRaises(ValueError, codec.encode_request, {"action": "state"})
+        self.assertRaises(ValueError, codec.encode_request, {"skip": "no", "cards": []})
+        self.assertRaises(ValueError, codec.decode_game_dto, codec.encode_request({"skip": True}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import random
+import unittest
+
+from controller import PresidentGameController
+from exception import NotInRulesException
+from model import AIPlayer, Player, PresidentGame
+
+
+class TestPresidentGameControllerEvents(unittest.TestCase):
+    def apply_events(self, state, events):
+        for event in events:
+            if event["type"] in ("play", "trade"):
+                for card in event["cards"]:
+                    state["hands"][event["player"]].remove(card)
+                if event["type"] == "play":
+                    state["trick"].extend(event["cards"])
+            elif event["type"] == "trick_reset":
+                state["trick"] = []
+            elif event["type"] == "set_end":
+                state["roles"] = event["roles"]
+                state["hands"] = [[] for _ in state["hands"]]
+                state["trick"] = []
+            elif event["type"] == "deal":
+                state["hands"] = event["hands"]
+            elif event["type"] == "trade_done":
+                for hand, received in zip(state["hands"], event["received"]):
+                    hand.extend(received)
+
+    def test_events_rebuild_the_game(self):
+        players = [AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)]
+        controller = PresidentGameController(players, 3, auto_ai=False)
+        dto = controller.get_game_dto()
+        state = {"hands": [player["hand"] for player in dto["players"]], "trick": [], "roles": None}
+        sequence = dto["sequence"]
+        while controller.ai_step():
+            delta = controller.take_delta()
+            self.assertEqual([event["sequence"] for event in delta["events"]],
+                             list(range(sequence + 1, delta["sequence"] + 1)))
+            sequence = delta["sequence"]
+            self.apply_events(state, delta["events"])
+            dto = controller.get_game_dto()
+            self.assertEqual(delta["current_player_index"], dto["current_player_index"])
+            self.assertEqual([sorted(hand) for hand in state["hands"]],
+                             [sorted(player["hand"]) for player in dto["players"]])
+            self.assertEqual(state["trick"], dto["current_trick"]["cards"])
+        self.assertTrue(controller.is_game_ended())
+        self.assertEqual(state["roles"], [player["role"] for player in dto["players"]])
+
+    def test_events_since(self):
+        controller = PresidentGameController([AIPlayer(f"IA {index}") for index in range(3)], events_kept=8)
+        sequence = controller.sequence
+        self.assertGreater(sequence, 8)
+        self.assertEqual(controller.events_since(sequence), [])
+        self.assertEqual([event["sequence"] for event in controller.events_since(sequence - 3)],
+                         [sequence - 2, sequence - 1, sequence])
+        self.assertIsNone(controller.events_since(sequence - 9))
+
+
+class TestPresidentGameControllerProcessMany(unittest.TestCase):
+    def human_requests(self, controller, number):
+        """ Les requêtes que joueraient des IA à la place des joueurs humains, sur une copie de la partie. """
+        players = [AIPlayer(player.name, random.Random(index)) for index, player in enumerate(controller.game.players)]
+        game = PresidentGame.from_snapshot(controller.game.snapshot(), controller.game.number_of_sets, players)
+        requests = []
+        for _ in range(number):
+            player = players[game.current_player_index]
+            cards = player.choose_cards_to_trade(game) if game.is_trade else player.choose_cards_to_play(game)
+            requests.append({"skip": True} if len(cards) == 0
+                            else {"skip": False, "cards": [str(card) for card in cards]})
+            game.apply_move(cards)
+        return requests
+
+    def test_same_result_as_process(self):
+        controllers = [PresidentGameController([Player("A"), Player("B"), Player("C")], 2) for _ in range(2)]
+        controllers[1].game.restore(controllers[0].game.snapshot())
+        for controller in controllers:
+            controller.take_delta()
+        requests = self.human_requests(controllers[0], 30)
+        events = []
+        for request in requests:
+            events += controllers[0].process(request)["events"]
+        delta = controllers[1].process_many(requests)
+        self.assertEqual(delta["events"], events)
+        self.assertEqual(controllers[1].get_game_dto(), controllers[0].get_game_dto())
+        self.assertEqual(controllers[1].process_many([], dto=True), controllers[1].get_game_dto())
+
+    def test_rolls_back_on_error(self):
+        controller = PresidentGameController([Player("A"), Player("B"), Player("C")])
+        controller.take_delta()
+        requests = self.human_requests(controller, 10)
+        dto = controller.get_game_dto()
+        sequence = controller.sequence
+        with self.assertRaises(NotInRulesException) as context:
+            controller.process_many(requests[:5] + [{"skip": False, "cards": ["3♡", "2♤"]}] + requests[5:])
+        self.assertEqual(context.exception.request_index, 5)
+        self.assertEqual(controller.get_game_dto(), dto)
+        self.assertEqual(controller.take_delta()["events"], [])
+        self.assertEqual(controller.events_since(sequence), [])
+        events = controller.process_many(requests)["events"]
+        self.assertEqual([event["sequence"] for event in events], list(range(sequence + 1, sequence + len(events) + 1)))
+
+    def test_rollback_restores_evicted_events(self):
+        controller = PresidentGameController([Player("A"), Player("B"), Player("C")], events_kept=4)
+        requests = self.human_requests(controller, 10)
+        controller.process_many(requests[:5])
+        kept_events = controller.events_since(controller.sequence - 4)
+        with self.assertRaises(NotInRulesException):
+            controller.process_many(requests[5:] + [{"skip": False, "cards": ["3♡", "2♤"]}])
+        self.assertEqual(controller.events_since(controller.sequence - 4), kept_events)
+
+    def test_dto_keeps_events_pending_before_the_batch(self):
+        players = [AIPlayer(f"IA {index}", random.Random(index)) for index in range(3)]
+        controller = PresidentGameController(players, auto_ai=False)
+        sequence = controller.sequence
+        controller.ai_step()
+        pending_events = controller.events_since(sequence)
+        dto = controller.process_many(self.human_requests(controller, 3), dto=True)
+        self.assertEqual(dto["sequence"], controller.sequence)
+        self.assertEqual(controller.take_delta()["events"], pending_events)
+
+
+if __name__ == '__main__':
+    unittest.main()
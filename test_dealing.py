@@ -0,0 +1,51 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import model
+
+if numpy is not None:
+    import dealing
+
+
+@unittest.skipIf(numpy is None, "NumPy is required by the bulk dealer")
+class TestDealBatch(unittest.TestCase):
+    def test_deals_are_sorted_partitions(self):
+        for number_of_players in range(3, 7):
+            deals = dealing.DealBatch(50, number_of_players, numpy.random.default_rng(number_of_players))
+            self.assertEqual(len(deals), 50)
+            self.assertEqual(int(deals.sizes.sum()), 52)
+            for index, hands in enumerate(deals.iter_hands()):
+                codes = [card.code for hand in hands for card in hand]
+                self.assertEqual(sorted(codes), list(range(52)), "Every card is dealt once")
+                for hand, mask in zip(hands, deals.hand_masks(index)):
+                    self.assertEqual([card.code for card in hand], sorted(card.code for card in hand))
+                    self.assertEqual(model.Cards(hand).mask, mask)
+
+    def test_deal_starts_with_first_player(self):
+        deals = dealing.DealBatch(10, 5, numpy.random.default_rng(0))
+        for first_player_index in range(5):
+            hands = deals.hands(3, first_player_index)
+            self.assertEqual(len(hands[first_player_index]), 11, "The first player served gets the most cards")
+            self.assertEqual(len(hands[(first_player_index + 2) % 5]), 10)
+            self.assertEqual([card.code for card in hands[first_player_index]], deals.codes[3, 0, :11].tolist())
+
+    def test_games_use_the_dealer(self):
+        dealer = dealing.BulkDealer(5, batch_size=16, seed=1)
+        game = model.PresidentGame([model.AIPlayer(str(index)) for index in range(5)], 3, dealer=dealer)
+        self.assertEqual(sorted(card.code for player in game.players for card in player.hand), list(range(52)))
+        current_set = game.current_set
+        while not game.is_game_ended():
+            player = game.get_current_player()
+            game.apply_move(player.choose_cards_to_trade(game) if game.is_trade else player.choose_cards_to_play(game))
+            if game.current_set != current_set and not game.is_game_ended():
+                current_set = game.current_set
+                trou = game.players_without_card[-1]
+                self.assertEqual(len(trou.hand), 11, "The trou opens the set and is served first")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import endgame
+import model
+from simulation import play_game
+
+
+def mask(*cards):
+    result = 0
+    for card in cards:
+        result |= 1 << card.code
+    return result
+
+
+class TestEndgameSolver(unittest.TestCase):
+    def new_game(self):
+        # le premier joueur gagne s'il joue son 2 avant son 3, qui serait sinon couvert par les autres
+        hands = [mask(model.Card('3', '♡'), model.Card('2', '♡')), mask(model.Card('4', '♡')),
+                 mask(model.Card('5', '♡'))]
+        return model.PresidentGame.from_snapshot((tuple((hand, 0, None) for hand in hands), ((), 0, -1), 0, 0, 0, (),
+                                                  False, 0))
+
+    def test_finds_the_winning_move(self):
+        game = self.new_game()
+        solver = endgame.EndgameSolver()
+        values, move = solver.solve(game)
+        self.assertEqual(values[0], 1.0, "The first player can finish first")
+        self.assertEqual(move, (model.Card('2', '♡').rank, 1))
+        self.assertEqual([str(card) for card in solver.best_cards(game)], ['2♡'])
+        self.assertEqual([len(player.hand) for player in game.players], [2, 1, 1], "The game is not modified")
+
+    def test_bounded_table_gives_the_same_values(self):
+        rng = random.Random(0)
+        game = model.PresidentGame([model.AIPlayer(str(index), rng) for index in range(4)], rng=rng)
+        while endgame.remaining_cards(game) > 10:
+            game.apply_move(game.get_current_player().choose_cards_to_play(game))
+        small_solver = endgame.EndgameSolver(max_entries=8)
+        solver = endgame.EndgameSolver()
+        self.assertEqual(small_solver.solve(game), solver.solve(game))
+        self.assertLessEqual(len(small_solver), 8)
+        self.assertGreater(len(solver), 8)
+
+    def test_shared_solver_across_threads(self):
+        rng = random.Random(2)
+        games = []
+        for _ in range(8):
+            game = model.PresidentGame([model.AIPlayer(str(index), rng) for index in range(4)], rng=rng)
+            while endgame.remaining_cards(game) > 8:
+                game.apply_move(game.get_current_player().choose_cards_to_play(game))
+            games.append(game)
+        expected = [endgame.EndgameSolver().solve(game) for game in games]
+        solver = endgame.EndgameSolver(max_entries=2)
+        with ThreadPoolExecutor(4) as executor:
+            self.assertEqual(list(executor.map(solver.solve, games * 4)), expected * 4)
+
+    def test_endgame_players_play_whole_games(self):
+        rng = random.Random(1)
+        solver = endgame.EndgameSolver()
+        for _ in range(5):
+            players = [endgame.EndgamePlayer(str(index), rng, solver=solver) for index in range(4)]
+            game = model.PresidentGame(players, 2, rng)
+            play_game(game)
+            self.assertTrue(game.is_game_ended())
+        self.assertGreater(solver.hits, 0, "Positions are found again in the table")
+
+
+if __name__ == '__main__':
+    unittest.main()
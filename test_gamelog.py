@@ -0,0 +1,78 @@
+import os
+import random
+import tempfile
+import unittest
+
+import gamelog
+from model import AIPlayer, PresidentGame
+
+
+class TestGameLog(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        directory = temporary_directory.name
+        self.path = os.path.join(directory, "games.log")
+
+    def play_logged_games(self, log, number_of_games, number_of_sets):
+        snapshots = []
+        for seed in range(number_of_games):
+            game_random = random.Random(seed)
+            game = PresidentGame([AIPlayer(f"IA {index}", game_random) for index in range(4)], number_of_sets,
+                                 game_random)
+            log.start_game(game, seed)
+            game_snapshots = [game.snapshot()]
+            while not game.is_game_ended():
+                player = game.get_current_player()
+                log.apply_move(game, player.choose_cards_to_trade(game) if game.is_trade
+                               else player.choose_cards_to_play(game))
+                game_snapshots.append(game.snapshot())
+            snapshots.append(game_snapshots)
+        return snapshots
+
+    def test_replay_rebuilds_every_state(self):
+        with gamelog.GameLogWriter(self.path, buffer_size=64) as log:
+            snapshots = self.play_logged_games(log, 3, 3)
+        logged_games = list(gamelog.read_log(self.path))
+        self.assertEqual([logged_game.seed for logged_game in logged_games], [0, 1, 2])
+        for logged_game, game_snapshots in zip(logged_games, snapshots):
+            self.assertTrue(logged_game.is_complete)
+            self.assertEqual(logged_game.number_of_moves(), len(game_snapshots) - 1)
+            for number_of_moves, snapshot in enumerate(game_snapshots):
+                self.assertEqual(logged_game.replay(number_of_moves).snapshot(), snapshot)
+
+    def test_log_is_append_only(self):
+        with gamelog.GameLogWriter(self.path) as log:
+            self.play_logged_games(log, 1, 1)
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as file:
+            content = file.read()
+        with gamelog.GameLogWriter(self.path) as log:
+            self.play_logged_games(log, 2, 1)
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(size), content)
+        self.assertEqual(len(list(gamelog.read_log(self.path))), 3)
+
+    def test_unfinished_game(self):
+        log = gamelog.GameLogWriter(self.path)
+        game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(3)])
+        log.start_game(game)
+        log.apply_move(game, game.get_current_player().choose_cards_to_play(game))
+        log.flush()
+        logged_game = next(gamelog.read_log(self.path))
+        self.assertFalse(logged_game.is_complete)
+        self.assertIsNone(logged_game.seed)
+        self.assertEqual(logged_game.replay().snapshot(), game.snapshot())
+        log.close()
+
+    def test_negative_seed_is_rejected(self):
+        with gamelog.GameLogWriter(self.path) as log:
+            game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(3)])
+            for seed in (-1, -2):
+                with self.assertRaisesRegex(ValueError, "graine"):
+                    log.start_game(game, seed)
+        self.assertEqual(os.path.getsize(self.path), 0, "Nothing is written for a rejected game")
+
+
+if __name__ == '__main__':
+    unittest.main()
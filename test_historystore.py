@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+import constant
+import gamelog
+from model import AIPlayer, PresidentGame
+from simulation import play_game
+
+if numpy is not None:
+    import historystore
+
+
+@unittest.skipIf(numpy is None, "NumPy is required by the history store")
+class TestHistoryStore(unittest.TestCase):
+    def setUp(self):
+        temporary_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(temporary_directory.cleanup)
+        directory = temporary_directory.name
+        self.log_path = os.path.join(directory, "games.log")
+        self.store_path = os.path.join(directory, "store")
+        with gamelog.GameLogWriter(self.log_path) as log:
+            for seed in range(20):
+                game_random = random.Random(seed)
+                number_of_players = 4 if seed % 2 == 0 else 5
+                players = [AIPlayer(f"IA {index}", game_random) for index in range(number_of_players)]
+                play_game(PresidentGame(players, 3, game_random), log=log)
+        self.logged_games = list(gamelog.read_log(self.log_path))
+
+    def test_import_and_counts(self):
+        self.assertEqual(historystore.import_log(self.log_path, self.store_path, chunk_rows=50), 20)
+        store = historystore.HistoryStore(self.store_path)
+        self.assertGreater(store.number_of_chunks, 1)
+        self.assertEqual(store.count("sets"), 10 * 3 * 4 + 10 * 3 * 5)
+        self.assertEqual(store.count("moves"), sum(game.number_of_moves() for game in self.logged_games))
+
+    def test_win_rate_by_seat(self):
+        historystore.import_log(self.log_path, self.store_path)
+        store = historystore.HistoryStore(self.store_path)
+        wins = [0] * 4
+        for logged_game in self.logged_games:
+            if logged_game.number_of_players == 4:
+                for order in logged_game.orders:
+                    wins[order[0]] += 1
+        statistics = store.win_rate_by_seat(4)
+        self.assertEqual([statistics[seat]["sets"] for seat in range(4)], [30] * 4)
+        self.assertEqual([round(statistics[seat]["win_rate"] * 30) for seat in range(4)], wins)
+        roles = store.win_rate_by_previous_role(5)
+        self.assertEqual(set(roles), {None} | set(constant.ROLES[5]))
+        self.assertEqual(sum(values["sets"] for values in roles.values()), 10 * 3 * 5)
+        strengths = store.win_rate_by_hand_strength()
+        self.assertEqual(sum(values["sets"] for values in strengths.values()), 10 * 3 * 4 + 10 * 3 * 5)
+
+    def test_moves_have_the_right_players(self):
+        historystore.import_log(self.log_path, self.store_path)
+        store = historystore.HistoryStore(self.store_path)
+        chunk = next(store.columns("moves", ["game", "set", "seat", "cards"]))
+        logged_game = self.logged_games[0]
+        selection = (chunk["game"] == 0) & (chunk["set"] == 0)
+        hands = list(logged_game.deals[0])
+        for seat, cards in zip(chunk["seat"][selection], chunk["cards"][selection]):
+            cards = int(cards)
+            self.assertEqual(hands[seat] & cards, cards, "A player only gives cards from his hand")
+            hands[seat] &= ~cards
+
+    def test_games_are_appended(self):
+        historystore.import_log(self.log_path, self.store_path)
+        historystore.import_log(self.log_path, self.store_path)
+        store = historystore.HistoryStore(self.store_path)
+        games = numpy.concatenate([chunk["game"] for chunk in store.columns("sets", ["game"])])
+        self.assertEqual(sorted(set(games.tolist())), list(range(40)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import gc
+import random
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import mcts
+import model
+
+
+class TestMCTSPlayer(unittest.TestCase):
+    def new_game(self, seed):
+        rng = random.Random(seed)
+        player = mcts.MCTSPlayer('MCTS', random.Random(seed), iterations=50)
+        game = model.PresidentGame([player, model.AIPlayer('A', rng), model.AIPlayer('B', rng)], rng=rng)
+        game.current_player_index = 0
+        return player, game
+
+    def test_chosen_cards_are_legal(self):
+        player, game = self.new_game(0)
+        cards = player.choose_cards_to_play(game)
+        self.assertTrue(len(cards) > 0, "The first player of a trick cannot pass")
+        self.assertTrue(all(card in player.hand for card in cards))
+        self.assertTrue(all(card.rank == cards[0].rank for card in cards))
+
+    def test_search_does_not_modify_game(self):
+        player, game = self.new_game(1)
+        hands = [[str(card) for card in game_player.hand] for game_player in game.players]
+        player.search(game)
+        self.assertEqual([[str(card) for card in game_player.hand] for game_player in game.players], hands)
+        self.assertEqual(game.current_player_index, 0)
+
+    def test_search_is_deterministic_with_iterations(self):
+        player, game = self.new_game(2)
+        other_player, other_game = self.new_game(2)
+        self.assertEqual([str(card) for card in player.choose_cards_to_play(game)],
+                         [str(card) for card in other_player.choose_cards_to_play(other_game)])
+
+    def test_parallel_search_is_deterministic(self):
+        chosen_cards = []
+        for _ in range(2):
+            player, game = self.new_game(4)
+            with mcts.MCTSPlayer('MCTS', random.Random(4), iterations=40, workers=2) as parallel_player:
+                game.players[0] = parallel_player
+                parallel_player.add_to_hand(player.hand)
+                statistics = parallel_player.parallel_search(game)
+                chosen_cards.append([str(card) for card in parallel_player.choose_cards_to_play(game)])
+            self.assertIsNone(parallel_player._executor, "The pool is shut down when leaving the with block")
+            self.assertEqual(sum(visits for visits, _ in statistics.values()), 40,
+                             "The iterations are shared between the workers")
+        self.assertEqual(chosen_cards[0], chosen_cards[1])
+
+    def test_pools_are_shut_down(self):
+        player, game = self.new_game(6)
+        parallel_player = mcts.MCTSPlayer('MCTS', random.Random(6), iterations=8, workers=2)
+        parallel_player.add_to_hand(player.hand)
+        game.players[0] = parallel_player
+        parallel_player.parallel_search(game)
+        shutdown = parallel_player._shutdown
+        game.players[0] = player
+        del parallel_player
+        gc.collect()
+        self.assertFalse(shutdown.alive, "The pool created by the AI is shut down with it")
+
+        with ThreadPoolExecutor(2) as executor:
+            shared_player = mcts.MCTSPlayer('MCTS', random.Random(6), iterations=8, workers=2, executor=executor)
+            shared_player.close()
+            self.assertIs(shared_player._executor, executor, "A pool given to the AI is not shut down by it")
+
+    def test_game_from_snapshot(self):
+        _, game = self.new_game(5)
+        self.assertEqual(model.PresidentGame.from_snapshot(game.snapshot()).snapshot(), game.snapshot())
+
+    def test_plays_a_full_game(self):
+        rng = random.Random(3)
+        players = [mcts.MCTSPlayer('MCTS', rng, iterations=5), model.AIPlayer('A', rng), model.AIPlayer('B', rng)]
+        game = model.PresidentGame(players, 2, rng)
+        while not game.is_game_ended():
+            player = game.get_current_player()
+            if game.is_trade:
+                game.apply_move(player.choose_cards_to_trade(game))
+            else:
+                game.apply_move(player.choose_cards_to_play(game))
+        self.assertIsNotNone(players[0].role)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,5 @@
+import pickle
+import random
 import unittest
 
 import model
@@ -10,8 +12,10 @@ class TestCards(unittest.TestCase):
     def test_cards_equal_value(self):
         ace_of_hearts = model.Card('A', '♡')
         ace_of_spades = model.Card('A', '♤')
-        self.assertEqual(ace_of_hearts, ace_of_spades, 'Two cards having '
-                                                       'same value should be considered equal')
+        self.assertEqual(ace_of_hearts.rank, ace_of_spades.rank, 'Two cards having '
+                                                                 'same value have the same rank')
+        self.assertNotEqual(ace_of_hearts, ace_of_spades, 'Two cards of different suits are different')
+        self.assertEqual(ace_of_hearts, model.Card('A', '♡'))
 
     def test_cards_comparison(self):
         ace_of_hearts = model.Card('A', '♡')
@@ -24,11 +28,106 @@ class TestCards(unittest.TestCase):
                         'The two card is the highest card')
         self.assertTrue(five_of_hearts < two_of_hearts,
                         'The two card is the highest card')
-        self.assertEqual(five_of_hearts, five_of_spades,
-                         "Two cards with same values are equal")
+        self.assertFalse(five_of_hearts < five_of_spades or five_of_hearts > five_of_spades,
+                         "Two cards with same values are neither lower nor greater")
         self.assertNotEqual(ace_of_hearts, two_of_hearts,
                             "Two cards with different values are different")
 
+    def test_card_code(self):
+        queen_of_hearts = model.Card('Q', '♡')
+        self.assertEqual(queen_of_hearts.code, 9 * 4 + 0, "The code of a card is rank * 4 + suit")
+        same_card = model.Card.from_code(queen_of_hearts.code)
+        self.assertEqual(str(same_card), 'Q♡', "A card built from its code keeps its value and suit")
+        self.assertEqual((same_card.value, same_card.suit), ('Q', '♡'))
+
+    def test_cards_are_interned_and_immutable(self):
+        queen_of_hearts = model.Card('Q', '♡')
+        self.assertIs(queen_of_hearts, model.Card('Q', '♡'), "A card exists only once")
+        self.assertIs(pickle.loads(pickle.dumps(queen_of_hearts)), queen_of_hearts)
+        with self.assertRaises(AttributeError):
+            queen_of_hearts.rank = 0
+        with self.assertRaises(AttributeError):
+            queen_of_hearts.color = '♡'
+
+    def test_cards_as_set_and_dict_keys(self):
+        queen_of_hearts = model.Card('Q', '♡')
+        queen_of_spades = model.Card('Q', '♤')
+        self.assertNotEqual(hash(queen_of_hearts), hash(queen_of_spades), "Suits are told apart")
+        self.assertEqual(len({queen_of_hearts, queen_of_spades, model.Card('Q', '♡')}), 2)
+        self.assertEqual({queen_of_hearts: 1, queen_of_spades: 2}[model.Card('Q', '♤')], 2)
+
+
+class TestCardsList(unittest.TestCase):
+    def test_contains_checks_value_and_suit(self):
+        cards = model.Cards([model.Card('3', '♢')])
+        self.assertIn(model.Card('3', '♢'), cards)
+        self.assertNotIn(model.Card('3', '♡'), cards,
+                         "A card of the same value but another suit is not contained")
+
+    def test_remove_removes_same_suit(self):
+        three_of_diamonds = model.Card('3', '♢')
+        three_of_hearts = model.Card('3', '♡')
+        cards = model.Cards([three_of_diamonds, three_of_hearts])
+        cards.remove(model.Card('3', '♡'))
+        self.assertEqual([str(card) for card in cards], ['3♢'])
+        self.assertNotIn(three_of_hearts, cards)
+        self.assertRaises(ValueError, cards.remove, three_of_hearts)
+
+    def test_rank_counts(self):
+        cards = model.Cards([model.Card('3', '♢'), model.Card('3', '♡'), model.Card('A', '♡')])
+        self.assertEqual(cards.count_rank(0), 2)
+        self.assertEqual(cards.count_rank(1), 0)
+        self.assertEqual(cards.ranks_with_at_least(1), [0, 11])
+        self.assertEqual(cards.ranks_with_at_least(2), [0])
+
+    def test_dict_follows_modifications(self):
+        three_of_diamonds = model.Card('3', '♢')
+        three_of_hearts = model.Card('3', '♡')
+        ace_of_hearts = model.Card('A', '♡')
+        cards = model.Cards([ace_of_hearts, three_of_diamonds])
+        cards.append(three_of_hearts)
+        self.assertEqual({value: [str(card) for card in cards_same_value]
+                          for value, cards_same_value in cards.get_as_dict().items()},
+                         {'A': ['A♡'], '3': ['3♢', '3♡']})
+        cards.remove(ace_of_hearts)
+        self.assertNotIn('A', cards.get_as_dict(), "A value without cards is removed from the dict")
+        cards.sort()
+        self.assertEqual([str(card) for card in cards.get_as_dict()['3']], ['3♡', '3♢'])
+
+    def test_extend_mask_keeps_list_sorted(self):
+        rng = random.Random(0)
+        for _ in range(20):
+            codes = rng.sample(range(52), 20)
+            mask = sum(1 << code for code in codes[:13])
+            cards = model.Cards()
+            cards.extend_mask(mask)
+            expected = model.Cards(model.CARDS[code] for code in sorted(codes[:13]))
+            self.assertEqual([card.code for card in cards], [card.code for card in expected])
+            self.assertEqual(cards.mask, mask)
+            self.assertEqual(cards.get_as_dict(), expected.get_as_dict())
+            cards.extend_mask(sum(1 << code for code in codes[13:]))
+            self.assertEqual([card.code for card in cards], sorted(codes), "Cards are added at their place")
+        cards.clear()
+        self.assertEqual(cards.get_as_dict(), {})
+
+
+class TestCardMask(unittest.TestCase):
+    def test_add_remove_contains(self):
+        queen_of_hearts = model.Card('Q', '♡')
+        card_mask = model.CardMask()
+        card_mask.add(queen_of_hearts)
+        self.assertIn(queen_of_hearts, card_mask)
+        self.assertEqual(len(card_mask), 1)
+        card_mask.remove(queen_of_hearts)
+        self.assertNotIn(queen_of_hearts, card_mask)
+        self.assertRaises(KeyError, card_mask.remove, queen_of_hearts)
+
+    def test_deck_mask_is_full(self):
+        card_mask = model.Deck().cards.as_mask()
+        self.assertEqual(len(card_mask), 52)
+        self.assertEqual(card_mask.ranks_with_at_least(4), list(range(13)))
+        self.assertEqual([str(card) for card in card_mask.to_cards()][:2], ['3♡', '3♤'])
+
 
 class TestDeck(unittest.TestCase):
     def test_deck_has_52_cards(self):
@@ -94,8 +193,9 @@ class TestTrick(unittest.TestCase):
         trick.add_cards(ace_of_hearts_cards, player_index)
         self.assertEqual(trick.number_of_cards, 1,
                          "The first card added to the trick define the number of cards of the trick")
-        self.assertEqual(trick.cards, ace_of_spades_cards,
-                         "Trick cards are equal to another with the same amount of cards of every value")
+        self.assertEqual([card.rank for card in trick.cards], [card.rank for card in ace_of_spades_cards],
+                         "Trick cards have the same values as another with the same amount of cards of every value")
+        self.assertNotEqual(trick.cards, ace_of_spades_cards, "Trick cards keep their suits")
         self.assertNotEqual(trick.cards, two_of_hearts_cards,
                             "Trick cards are not equal to another with cards of different values")
         self.assertNotEqual(trick.cards, model.Cards([ace_of_spades, ace_of_hearts]),
@@ -104,8 +204,8 @@ class TestTrick(unittest.TestCase):
         trick.add_cards(two_of_hearts_cards, player_index)
         self.assertEqual(trick.number_of_cards, 1,
                          "A second card added to the trick doesn't change the number of cards of the trick")
-        self.assertEqual(trick.cards, model.Cards([ace_of_spades, two_of_hearts]),
-                         "Trick cards are equal to another with the same amount of cards of every value")
+        self.assertEqual(trick.cards, model.Cards([ace_of_hearts, two_of_hearts]),
+                         "Trick cards are equal to another with the same cards")
 
     def test_add_two_cards_to_trick(self):
         ace_of_hearts = model.Card('A', '♡')
@@ -132,3 +232,103 @@ class TestPresidentGame(unittest.TestCase):
     def test_starting_game_has_empty_trick(self):
         game = model.PresidentGame()
         self.assertTrue(len(game.current_trick.cards) == 0)
+
+    def test_clone_is_independent(self):
+        game = model.PresidentGame(rng=random.Random(0))
+        clone = game.clone()
+        clone.get_current_player().hand.pop()
+        clone.next_player()
+        self.assertNotEqual(len(clone.players[game.current_player_index].hand),
+                            len(game.get_current_player().hand))
+        self.assertNotEqual(clone.current_player_index, game.current_player_index)
+
+    def test_undo_restores_state(self):
+        rng = random.Random(1)
+        game = model.PresidentGame([model.AIPlayer('A', rng), model.AIPlayer('B', rng), model.AIPlayer('C', rng)],
+                                   rng=rng)
+
+        def state():
+            return ([[str(card) for card in player.hand] for player in game.players],
+                    [str(card) for card in game.current_trick.cards], game.current_trick.number_of_cards,
+                    game.current_player_index, game.turns_without_plays, len(game.players_without_card))
+
+        for _ in range(10):
+            game.play_move(game.get_current_player().random_cards_to_play(game.current_trick))
+        before = state()
+        game.enable_history()
+        while not game.is_set_ended():
+            game.play_move(game.get_current_player().random_cards_to_play(game.current_trick))
+        game.undo(0)
+        self.assertEqual(state(), before, "Undoing every move restores the game")
+
+    def test_applied_moves_do_not_keep_the_reused_list(self):
+        rng = random.Random(3)
+        game = model.PresidentGame([model.AIPlayer(name, rng) for name in 'ABCD'], 2, rng)
+        game.enable_history()
+        while not game.is_game_ended():
+            player = game.get_current_player()
+            cards = player.random_cards_to_trade() if game.is_trade else player.random_cards_to_play(game.current_trick)
+            history_length = game.history_length()
+            before = game.snapshot()
+            game.apply_move(cards)
+            after = game.snapshot()
+            # le coup suivant de l'IA réécrit la liste qu'elle a retournée
+            cards.clear()
+            cards.extend(model.CARDS[:3])
+            self.assertEqual(game.snapshot(), after, "The game does not keep the returned list")
+            game.undo(history_length)
+            self.assertEqual(game.snapshot(), before, "The history does not keep the returned list")
+            game.restore(after)
+
+    def test_snapshot_and_restore(self):
+        rng = random.Random(2)
+        game = model.PresidentGame([model.AIPlayer('A', rng), model.AIPlayer('B', rng), model.AIPlayer('C', rng),
+                                    model.AIPlayer('D', rng)], 2, rng)
+        for _ in range(20):
+            game.apply_move(game.get_current_player().choose_cards_to_play(game))
+        snapshot = game.snapshot()
+        hands = [[str(card) for card in player.hand] for player in game.players]
+        trick = [str(card) for card in game.current_trick.cards]
+        for _ in range(15):
+            game.apply_move(game.get_current_player().choose_cards_to_play(game))
+        game.restore(snapshot)
+        self.assertEqual(game.snapshot(), snapshot)
+        self.assertEqual([[str(card) for card in player.hand] for player in game.players], hands)
+        self.assertEqual([str(card) for card in game.current_trick.cards], trick)
+
+    def test_undo_whole_game(self):
+        rng = random.Random(3)
+        game = model.PresidentGame([model.AIPlayer('A', rng), model.AIPlayer('B', rng), model.AIPlayer('C', rng),
+                                    model.AIPlayer('D', rng)], 3, rng)
+        start = game.snapshot()
+        game.enable_history()
+        while not game.is_game_ended():
+            player = game.get_current_player()
+            game.apply_move(player.choose_cards_to_trade(game) if game.is_trade else player.choose_cards_to_play(game))
+        self.assertEqual(game.current_set, 3)
+        game.undo(0)
+        self.assertEqual(game.snapshot(), start, "Sets ends, deals and trades are undone too")
+
+    def test_distribute_deals_like_the_deck(self):
+        game = model.PresidentGame([model.Player('A'), model.Player('B'), model.Player('C'), model.Player('D')],
+                                   rng=random.Random(4))
+        deck = model.Deck(random.Random(4))
+        deck.shuffle()
+        for index, player in enumerate(game.players):
+            expected_codes = sorted(card.code for card in deck.cards[index::4])
+            self.assertEqual([card.code for card in player.hand], expected_codes)
+            for card in player.hand:
+                self.assertIs(card, model.CARDS[card.code], "Hands hold the shared cards")
+
+    def test_turn_loop_reuses_trick_and_moves(self):
+        rng = random.Random(5)
+        game = model.PresidentGame([model.AIPlayer('A', rng), model.AIPlayer('B', rng), model.AIPlayer('C', rng)],
+                                   rng=rng)
+        trick = game.current_trick
+        player = game.get_current_player()
+        move = player.choose_cards_to_play(game)
+        game.apply_move(move)
+        while not game.is_game_ended():
+            game.apply_move(game.get_current_player().choose_cards_to_play(game))
+            self.assertIs(game.current_trick, trick, "The trick is reset in place at the end of a turn")
+        self.assertIs(player.choose_cards_to_play(game), move, "An AI reuses the list of its moves")
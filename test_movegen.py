@@ -0,0 +1,60 @@
+import random
+import unittest
+from itertools import combinations
+
+import model
+import movegen
+
+
+def make_cards(*cards_str):
+    return model.Cards(model.Card(card_str[:-1], card_str[-1]) for card_str in cards_str)
+
+
+class TestMoveGenerator(unittest.TestCase):
+    def setUp(self):
+        self.hand = make_cards('3♡', '3♤', '3♢', '7♡', 'J♡', 'J♧', '2♢')
+
+    def test_empty_trick_moves(self):
+        plays = [sorted(str(card) for card in play) for play in movegen.iter_legal_plays(self.hand, model.Trick())]
+        # 7 combinaisons non vides des 3, 1 de 7, 3 des valets, 1 de 2
+        self.assertEqual(len(plays), 12)
+        self.assertEqual(movegen.count_legal_plays(self.hand, model.Trick()), 12)
+        self.assertIn(['3♡', '3♢', '3♤'], plays)
+
+    def test_moves_follow_trick(self):
+        trick = model.Trick()
+        trick.add_cards(make_cards('5♡', '5♤'), 0)
+        plays = [sorted(str(card) for card in play) for play in movegen.iter_legal_plays(self.hand, trick)]
+        self.assertEqual(plays, [['J♡', 'J♧']], "Only pairs of higher value can be played on a pair")
+
+    def test_moves_match_allowed_cards(self):
+        rng = random.Random(5)
+        deck = model.Deck(rng)
+        deck.shuffle()
+        for start in range(0, 52, 13):
+            hand = model.Cards(deck.cards[start:start + 13])
+            for trick_cards in [[], ['8♡'], ['9♡', '9♤'], ['4♡', '4♤', '4♢']]:
+                trick = model.Trick()
+                if trick_cards:
+                    trick.add_cards(make_cards(*trick_cards), 0)
+                player = model.Player('Test')
+                player.add_to_hand(hand)
+                allowed = player.get_cards_allowed_to_play(trick).get_as_dict()
+                expected = sum(2 ** len(cards) - 1 if not trick_cards else
+                               len(list(combinations(cards, len(trick_cards)))) for cards in allowed.values())
+                self.assertEqual(movegen.count_legal_plays(hand, trick), expected)
+                for index in range(expected):
+                    play = movegen.legal_play(hand, trick, index)
+                    self.assertTrue(all(card in hand for card in play))
+
+    def test_sample_legal_play(self):
+        rng = random.Random(0)
+        trick = model.Trick()
+        trick.add_cards(make_cards('Q♡'), 0)
+        samples = {str(movegen.sample_legal_play(self.hand, trick, rng)[0]) for _ in range(100)}
+        self.assertEqual(samples, {'2♢'})
+        self.assertEqual(movegen.sample_legal_play(make_cards('3♡'), trick, rng), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
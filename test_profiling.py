@@ -0,0 +1,58 @@
+import random
+import unittest
+
+import profiling
+from controller import PresidentGameController
+from model import AIPlayer, Player, PresidentGame
+from exception import NotInRulesException
+
+
+def scrape(text):
+    """ Un collecteur minimal du format texte de Prometheus : nom de la série (avec ses labels) -> valeur. """
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_profiler_leaves_functions_untouched(self):
+        start_set = PresidentGame.__dict__["start_set"]
+        with profiling.Profiler():
+            self.assertIsNot(PresidentGame.__dict__["start_set"], start_set)
+        self.assertIs(PresidentGame.__dict__["start_set"], start_set)
+
+    def test_counts_and_histograms(self):
+        profiler = profiling.Profiler()
+        with profiler:
+            players = [AIPlayer(f"IA {index}", random.Random(index)) for index in range(4)]
+            PresidentGameController(players, 3)
+            controller = PresidentGameController([Player("A"), Player("B"), Player("C")])
+            # personne n'a encore joué : le premier joueur ne peut pas passer
+            with self.assertRaises(NotInRulesException):
+                controller.process({"skip": True})
+        snapshot = profiler.snapshot()
+        functions = snapshot["functions"]
+        self.assertEqual(functions["PresidentGame.start_set"]["calls"], 3 + 1)
+        self.assertEqual(functions["PresidentGame.distribute"]["calls"], 3 + 1)
+        self.assertEqual(functions["PresidentGame.end_set"]["calls"], 3)
+        self.assertEqual(functions["utils.check_skip"]["calls"], 1)
+        self.assertEqual(snapshot["moves_per_set"]["count"], 3)
+        ai_moves = functions["PresidentGameController.ai_play"]["calls"] + \
+            functions["PresidentGameController.ai_trade"]["calls"]
+        self.assertEqual(snapshot["ai_latency"]["count"], ai_moves)
+        self.assertEqual(snapshot["moves_per_set"]["sum"], ai_moves)
+
+        samples = scrape(profiler.prometheus_text())
+        self.assertEqual(samples['president_function_calls_total{function="PresidentGame.end_set"}'], 3)
+        self.assertEqual(samples['president_moves_per_set_bucket{le="+Inf"}'], 3)
+        self.assertEqual(samples["president_ai_latency_count"], ai_moves)
+
+        profiler.reset()
+        self.assertEqual(profiler.snapshot()["functions"]["PresidentGame.end_set"]["calls"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import unittest
+
+from server import GameServer
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+    async def test_ai_table_is_played_to_the_end(self):
+        server = GameServer()
+        players = [{"name": f"IA {index}", "ai": True} for index in range(4)]
+        response = await server.handle_request({"action": "create", "players": players})
+        self.assertTrue(response["game"]["is_ended"])
+
+    async def test_tables_are_played_concurrently(self):
+        server = GameServer()
+        players = [{"name": f"IA {index}", "ai": True} for index in range(3)]
+        responses = await asyncio.gather(*(server.handle_request({"action": "create", "players": players})
+                                           for _ in range(20)))
+        self.assertEqual(sorted(response["table"] for response in responses), list(range(1, 21)))
+        self.assertTrue(all(response["game"]["is_ended"] for response in responses))
+
+    async def test_human_move(self):
+        server = GameServer()
+        response = await server.handle_request({"action": "create"})
+        table_id = response["table"]
+        game = response["game"]
+        # les IA ont joué jusqu'au tour du joueur humain
+        self.assertEqual(game["current_player"]["name"], "Joueur")
+        hand = game["current_player"]["hand"]
+        if len(game["current_trick"]["cards"]) == 0:
+            response = await server.handle_request({"table": table_id, "skip": True})
+            self.assertEqual(response["type"], "NotInRulesException")
+        response = await server.handle_request({"action": "move", "table": table_id, "skip": False,
+                                                "cards": [hand[0], hand[0]]})
+        self.assertIn("error", response)
+        response = await server.handle_request({"action": "state", "table": table_id})
+        self.assertEqual(response["game"]["current_player"]["hand"], hand)
+
+    async def test_wrong_requests(self):
+        server = GameServer()
+        self.assertEqual((await server.handle_request({"action": "move", "table": 1}))["type"],
+                         "WrongRequestException")
+        self.assertIn("error", await server.handle_request({"action": "create", "players": [{"name": "A"}]}))
+        table_id = (await server.handle_request({"action": "create"}))["table"]
+        self.assertIn("error", await server.handle_request({"table": table_id, "skip": False, "cards": ["11♡"]}))
+        self.assertEqual((await server.handle_request({"action": "state", "table": True}))["type"],
+                         "WrongRequestException", "A boolean is not a table number")
+        self.assertEqual((await server.handle_request({"action": "events", "table": table_id, "since": False}))["type"],
+                         "WrongRequestException", "A boolean is not an event number")
+        self.assertEqual((await server.handle_request({"action": "create", "sets": True}))["type"],
+                         "WrongRequestException", "A boolean is not a number of sets")
+        self.assertEqual(await server.handle_request({"action": "close", "table": table_id}),
+                         {"table": table_id, "closed": True})
+        self.assertEqual(len(server.tables), 0)
+
+    async def test_tcp_connection(self):
+        server = await GameServer().serve("127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b'{"action": "create"}\nnot json\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            self.assertEqual(response["table"], 1)
+            self.assertIn("error", json.loads(await reader.readline()))
+            writer.close()
+            await writer.wait_closed()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+import unittest
+
+import constant
+import simulation
+
+
+class TestSimulation(unittest.TestCase):
+    def test_games_end_for_every_number_of_players(self):
+        for number_of_players in range(3, 7):
+            result = simulation.simulate(5, number_of_players, 3)
+            self.assertEqual(result["games"], 5)
+            self.assertEqual(len(result["roles"]), number_of_players)
+            self.assertEqual(sum(sum(roles.values()) for roles in result["roles"]), 5 * 3 * number_of_players,
+                             "Every player gets a role at the end of every set")
+
+    def test_roles_match_number_of_players(self):
+        result = simulation.simulate(5, 4, 2)
+        for roles in result["roles"]:
+            self.assertTrue(set(roles.keys()) <= set(constant.ROLES[4]))
+
+    def test_wrong_number_of_players(self):
+        self.assertRaises(ValueError, simulation.simulate, 1, 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
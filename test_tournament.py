@@ -0,0 +1,25 @@
+import unittest
+
+import tournament
+
+
+class TestTournament(unittest.TestCase):
+    def test_game_is_reproducible(self):
+        self.assertEqual(tournament.run_game(3, 42, 4, 2), tournament.run_game(3, 42, 4, 2),
+                         "A game played twice with the same seed has the same result")
+
+    def test_result_does_not_depend_on_workers(self):
+        single_process = tournament.run_tournament(12, 4, 2, seed=7, workers=1, games_per_task=5)
+        multi_process = tournament.run_tournament(12, 4, 2, seed=7, workers=2, games_per_task=5)
+        for key in ["games", "sets", "roles_by_player", "roles_by_seat"]:
+            self.assertEqual(single_process[key], multi_process[key])
+
+    def test_statistics(self):
+        statistics = tournament.run_tournament(8, 3, 2, seed=1, workers=1)
+        self.assertEqual(statistics["average_sets_per_game"], 2)
+        self.assertEqual(list(statistics["roles_by_player"].keys()), ["IA 1", "IA 2", "IA 3"])
+        self.assertEqual(sum(statistics["roles_by_player"]["IA 1"].values()), 8 * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
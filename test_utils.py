@@ -0,0 +1,112 @@
+import random
+import unittest
+
+import utils
+from constant import CODE_STRINGS, NEUTRAL, SECOND, BEFORE_LAST
+from controller import PresidentGameController
+from exception import NotInRulesException, WrongRequestException
+from model import AIPlayer, Player, PresidentGame
+
+
+def random_request(rng, game):
+    """ Une requête au hasard, souvent dans les règles, parfois mal formée. """
+    hand = [str(card) for card in game.get_current_player().hand]
+    draw = rng.random()
+    if draw < 0.1:
+        return rng.choice([None, {}, {"skip": 1}, {"skip": False}, {"skip": False, "cards": []},
+                           {"skip": False, "cards": ["11♡"]}, {"skip": False, "cards": [3]}])
+    if draw < 0.25:
+        return {"skip": True}
+    if draw < 0.4:
+        return {"skip": False, "cards": rng.sample(CODE_STRINGS, rng.randint(1, 3))}
+    cards = rng.sample(hand, min(len(hand), rng.randint(1, 2)))
+    same_value = [card for card in hand if card[:-1] == cards[0][:-1]]
+    if draw < 0.8:
+        cards = rng.sample(same_value, rng.randint(1, len(same_value)))
+    return {"skip": False, "cards": cards}
+
+
+class TestMoveValidator(unittest.TestCase):
+    def outcome(self, function, *args):
+        try:
+            return [str(card) for card in function(*args)]
+        except (NotInRulesException, WrongRequestException) as error:
+            return type(error), str(error)
+
+    def test_same_result_as_check_functions(self):
+        rng = random.Random(0)
+        validator = utils.MoveValidator()
+        accepted = 0
+        for seed in range(5):
+            game = PresidentGame([AIPlayer(f"IA {index}", random.Random(seed + index)) for index in range(4)], 3,
+                                 random.Random(seed))
+            while not game.is_game_ended():
+                for _ in range(4):
+                    request = random_request(rng, game)
+                    expected = self.outcome(utils.check_move, game, request)
+                    self.assertEqual(self.outcome(validator.validate, game, request), expected, request)
+                    accepted += isinstance(expected, list)
+                player = game.get_current_player()
+                game.apply_move(player.choose_cards_to_trade(game) if game.is_trade
+                                else player.choose_cards_to_play(game))
+        self.assertGreater(accepted, 100)
+
+    def test_legal_moves_are_cached_by_position(self):
+        game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(3)],
+                             rng=random.Random(3))
+        validator = utils.MoveValidator()
+        legal_moves = validator.legal_moves(game)
+        self.assertFalse(legal_moves[0])
+        self.assertIs(validator.legal_moves(game), legal_moves)
+        game.apply_move(game.get_current_player().choose_cards_to_play(game))
+        self.assertIsNot(validator.legal_moves(game), legal_moves)
+
+    def test_trade_phase(self):
+        game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(5)], 2,
+                             random.Random(5))
+        while not game.is_trade:
+            game.apply_move(game.get_current_player().choose_cards_to_play(game))
+        validator = utils.MoveValidator()
+        neutral_game = game.clone()
+        neutral_game.current_player_index = [player.role for player in game.players].index(NEUTRAL)
+        with self.assertRaisesRegex(NotInRulesException, "neutre"):
+            validator.validate(neutral_game, {"skip": False, "cards": [str(neutral_game.get_current_player().hand[0])]})
+        while game.is_trade:
+            player = game.get_current_player()
+            # personne ne peut passer pendant l'échange
+            with self.assertRaisesRegex(NotInRulesException, "premier à jouer"):
+                validator.validate(game, {"skip": True})
+            card_str = str(player.hand[-1])
+            if player.role in (SECOND, BEFORE_LAST):
+                self.assertEqual([str(card) for card in validator.validate(game, {"skip": False, "cards": [card_str]})],
+                                 [card_str])
+            game.apply_move(player.choose_cards_to_trade(game))
+
+    def test_validate_many(self):
+        game = PresidentGame([AIPlayer(f"IA {index}", random.Random(index)) for index in range(3)],
+                             rng=random.Random(4))
+        replay = game.clone()
+        requests = []
+        for _ in range(10):
+            cards = game.get_current_player().choose_cards_to_play(game)
+            requests.append({"skip": True} if len(cards) == 0
+                            else {"skip": False, "cards": [str(card) for card in cards]})
+            game.apply_move(cards)
+        validator = utils.MoveValidator()
+        self.assertEqual(len(validator.validate_many(replay, requests)), 10)
+        self.assertEqual(replay.zobrist_hash, game.zobrist_hash)
+
+        with self.assertRaises(WrongRequestException) as context:
+            validator.validate_many(replay, [{"skip": True}, {"skip": "non"}])
+        self.assertEqual(context.exception.request_index, 1)
+
+    def test_controller_rejects_with_same_messages(self):
+        controller = PresidentGameController([Player("A"), Player("B"), Player("C")])
+        with self.assertRaisesRegex(NotInRulesException, "premier à jouer"):
+            controller.process({"skip": True})
+        with self.assertRaises(WrongRequestException):
+            controller.process({"skip": False, "cards": ["1♡"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
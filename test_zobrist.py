@@ -0,0 +1,49 @@
+import random
+import unittest
+
+import model
+import zobrist
+
+
+class TestZobristHash(unittest.TestCase):
+    def new_game(self, seed, number_of_players=4, number_of_sets=3):
+        rng = random.Random(seed)
+        return model.PresidentGame([model.AIPlayer(str(index), rng) for index in range(number_of_players)],
+                                   number_of_sets, rng)
+
+    def play(self, game):
+        player = game.get_current_player()
+        game.apply_move(player.choose_cards_to_trade(game) if game.is_trade else player.choose_cards_to_play(game))
+
+    def test_incremental_hash_matches_full_hash(self):
+        for number_of_players in range(3, 7):
+            game = self.new_game(number_of_players, number_of_players)
+            while not game.is_game_ended():
+                self.play(game)
+                self.assertEqual(game.zobrist_hash, zobrist.game_hash(game))
+
+    def test_same_position_same_hash(self):
+        game = self.new_game(0)
+        for _ in range(30):
+            self.play(game)
+        same_game = model.PresidentGame.from_snapshot(game.snapshot(), 3)
+        self.assertEqual(same_game.zobrist_hash, game.zobrist_hash)
+        self.assertEqual(game.clone().zobrist_hash, game.zobrist_hash)
+        hashes = {game.zobrist_hash}
+        self.play(game)
+        self.assertNotIn(game.zobrist_hash, hashes, "A move changes the hash")
+
+    def test_undo_restores_hash(self):
+        game = self.new_game(1)
+        start = game.zobrist_hash
+        game.enable_history()
+        while not game.is_game_ended():
+            self.play(game)
+        while game.history_length() != 0:
+            game.undo()
+            self.assertEqual(game.zobrist_hash, zobrist.game_hash(game))
+        self.assertEqual(game.zobrist_hash, start)
+
+
+if __name__ == '__main__':
+    unittest.main()
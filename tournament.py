@@ -0,0 +1,122 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import constant
+from model import PresidentGame, AIPlayer
+from simulation import play_game
+
+
+def game_seeds(seed: int, number_of_games: int) -> list[int]:
+    """
+    Retourne les graines des number_of_games parties d'un tournoi, déduites de la graine du tournoi.
+    """
+    tournament_random = random.Random(seed)
+    return [tournament_random.getrandbits(64) for _ in range(number_of_games)]
+
+
+def run_game(game_index: int, seed: int, number_of_players: int, number_of_sets: int) -> dict:
+    """
+    Joue une partie du tournoi entre IA à partir de sa graine et retourne son résultat.
+    Les joueurs tournent autour de la table d'une partie à l'autre : le joueur p est assis à la place
+    (p + game_index) % number_of_players. Rejouer une partie avec les mêmes paramètres donne exactement le même
+    résultat.
+    Le résultat contient, pour chaque place, le nombre de fois où chaque rôle a été obtenu, le nom du joueur qui y était
+    assis et le nombre de manches jouées.
+    """
+    game_random = random.Random(seed)
+    seats = [(seat - game_index) % number_of_players for seat in range(number_of_players)]
+    players = [AIPlayer(f"IA {player_index + 1}", game_random) for player_index in seats]
+    game = PresidentGame(players, number_of_sets, game_random)
+    roles = [{} for _ in range(number_of_players)]
+    play_game(game, roles)
+    return {
+        "seed": seed,
+        "players": [player.name for player in players],
+        "roles": roles,
+        "sets": game.current_set
+    }
+
+
+def _run_games(games: list[tuple]) -> list[dict]:
+    """
+    Joue une série de parties dans un processus du pool. Chaque partie est décrite par le tuple des paramètres de
+    run_game.
+    """
+    return [run_game(*game) for game in games]
+
+
+def merge_results(results: list[dict], number_of_players: int) -> dict:
+    """
+    Agrège les résultats des parties d'un tournoi :
+    - les rôles obtenus par chaque joueur (par nom) et à chaque place,
+    - le nombre total de manches et le nombre moyen de manches par partie.
+    """
+    roles_by_player = {}
+    roles_by_seat = [{} for _ in range(number_of_players)]
+    number_of_sets = 0
+    for result in results:
+        number_of_sets += result["sets"]
+        for seat, (name, roles) in enumerate(zip(result["players"], result["roles"])):
+            player_roles = roles_by_player.setdefault(name, {})
+            for role, count in roles.items():
+                player_roles[role] = player_roles.get(role, 0) + count
+                roles_by_seat[seat][role] = roles_by_seat[seat].get(role, 0) + count
+    return {
+        "games": len(results),
+        "sets": number_of_sets,
+        "average_sets_per_game": number_of_sets / len(results) if len(results) > 0 else 0,
+        "roles_by_player": dict(sorted(roles_by_player.items())),
+        "roles_by_seat": roles_by_seat
+    }
+
+
+def run_tournament(number_of_games: int, number_of_players: int = 4, number_of_sets: int = 1, seed: int = 0,
+                   workers: int = None, games_per_task: int = 100) -> dict:
+    """
+    Joue un tournoi de number_of_games parties entre IA, réparties sur un pool de workers processus (par défaut, un
+    par cœur ; 1 pour jouer dans le processus courant), et retourne les statistiques agrégées.
+    Chaque partie a sa propre graine, déduite de celle du tournoi : le résultat ne dépend pas du nombre de workers
+    et chaque partie peut être rejouée seule avec run_game.
+    """
+    if number_of_players not in constant.ROLES:
+        raise ValueError("Le jeu se joue de 3 à 6 joueurs.")
+    games = [(game_index, game_seed, number_of_players, number_of_sets)
+             for game_index, game_seed in enumerate(game_seeds(seed, number_of_games))]
+    tasks = [games[start:start + games_per_task] for start in range(0, len(games), games_per_task)]
+
+    start = time.perf_counter()
+    results = []
+    if workers == 1:
+        for task in tasks:
+            results.extend(_run_games(task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # map conserve l'ordre des tâches, l'agrégation est donc la même quelle que soit la répartition
+            for task_results in executor.map(_run_games, tasks):
+                results.extend(task_results)
+    duration = time.perf_counter() - start
+
+    statistics = merge_results(results, number_of_players)
+    statistics["seconds"] = duration
+    statistics["games_per_second"] = number_of_games / duration if duration > 0 else float("inf")
+    return statistics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Joue un tournoi de parties du jeu du Président entre IA.")
+    parser.add_argument("--games", type=int, default=10000, help="nombre de parties à jouer")
+    parser.add_argument("--players", type=int, default=4, choices=range(3, 7), help="nombre de joueurs (3 à 6)")
+    parser.add_argument("--sets", type=int, default=1, help="nombre de manches par partie")
+    parser.add_argument("--seed", type=int, default=0, help="graine du tournoi")
+    parser.add_argument("--workers", type=int, default=None, help="nombre de processus (par défaut, un par cœur)")
+    arguments = parser.parse_args()
+    tournament = run_tournament(arguments.games, arguments.players, arguments.sets, arguments.seed, arguments.workers)
+    print(f"{tournament['games']} parties en {tournament['seconds']:.2f} s, "
+          f"soit {tournament['games_per_second']:.0f} parties/s, "
+          f"{tournament['average_sets_per_game']:.1f} manches par partie")
+    for name, roles in tournament["roles_by_player"].items():
+        print(f"{name} - " + ", ".join(f"{role} : {count}" for role, count in roles.items()))
+    for seat, roles in enumerate(tournament["roles_by_seat"]):
+        print(f"Place {seat + 1} - " + ", ".join(f"{role} : {count}" for role, count in roles.items()))
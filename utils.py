@@ -1,6 +1,12 @@
-from constant import VALUES, SUITS, FIRST, SECOND, BEFORE_LAST, LAST, NEUTRAL
+from constant import VALUES, SUITS, FIRST, SECOND, BEFORE_LAST, LAST, NEUTRAL, NUMBER_OF_SUITS, CODE_RANKS, \
+    CODE_STRINGS
 from exception import WrongRequestException, NotInRulesException
-from model import PresidentGame, Cards
+from model import PresidentGame, Card, Cards, CARDS, mask_count_rank
+
+# code de chaque carte d'après sa chaîne de caractères ('10♡' -> 32)
+CARD_CODES = {card_str: code for code, card_str in enumerate(CODE_STRINGS)}
+# nombre de cartes échangées par rôle
+TRADE_SIZES = {FIRST: 2, SECOND: 1, BEFORE_LAST: 1, LAST: 2}
 
 
 def check_request(request: dict):
@@ -9,20 +15,18 @@ def check_request(request: dict):
     Lève une exception si elle n'est pas valide.
     """
 
-    # la requête doit contenir une clé skip qui est un booléen
-    if 'skip' not in list(request.keys()) and isinstance(request['skip'], bool):
+    # la requête doit être un dictionnaire contenant une clé skip qui est un booléen
+    if not isinstance(request, dict) or not isinstance(request.get('skip'), bool):
         raise WrongRequestException("La requête doit contenir une entrée 'skip', vraie ou fausse.")
 
     # si la valeur associée à skip est fausse
     if not request['skip']:
         # la requête doit contenir une liste de cartes non vide
-        if 'cards' not in list(request.keys()) and \
-                isinstance(request['cards'], list) and \
-                len(request['cards']) == 0:
-            raise WrongRequestException("Vous avez passé, vous devez fournir une liste de cartes")
+        if not isinstance(request.get('cards'), list) or len(request['cards']) == 0:
+            raise WrongRequestException("Vous n'avez pas passé, vous devez fournir une liste de cartes")
 
-        # les cartes doivent être de la forme '{value}{suit}'
-        if not all((card[0] in VALUES and card[1] in SUITS) for card in request['cards']):
+        # les cartes doivent être de la forme '{value}{suit}' ('10' est la seule valeur de deux caractères)
+        if not all(isinstance(card, str) and card[:-1] in VALUES and card[-1:] in SUITS for card in request['cards']):
             raise WrongRequestException("Les cartes doivent être de la forme '{valeur}{couleur}'.")
 
 
@@ -43,7 +47,11 @@ def check_cards(game: PresidentGame, cards: Cards):
     """
     # le joueur ne possède pas les cartes qu'il joue ou met à l'échange
     if not all(card in game.get_current_player().hand for card in cards):
-        "Vous n'avez pas en main toutes les cartes que vous jouez"
+        raise NotInRulesException("Vous n'avez pas en main toutes les cartes que vous jouez")
+
+    # le joueur donne plusieurs fois la même carte
+    if len({card.code for card in cards}) != len(cards):
+        raise NotInRulesException("Vous ne pouvez pas jouer plusieurs fois la même carte.")
 
 
 def check_play(game: PresidentGame, cards: Cards):
@@ -52,11 +60,11 @@ def check_play(game: PresidentGame, cards: Cards):
     Lève une exception s'il n'a pas le droit.
     """
     # les cartes n'ont pas toutes la même valeur
-    if not all(card == cards[0] for card in cards):
+    if not all(card.rank == cards[0].rank for card in cards):
         raise NotInRulesException("Vous devez jouer des cartes qui ont toutes la même valeur.")
 
     # la valeur de la carte jouée est inférieure à la dernière carte jouée
-    if len(game.current_trick.cards) != 0 and cards[0].value < max(game.current_trick.cards).value:
+    if len(game.current_trick.cards) != 0 and cards[0].rank < game.current_trick.rank:
         raise NotInRulesException("Vous devez une carte plus forte ou égale à la plus forte du pli.")
 
     # le nombre de cartes jouées ne correspond pas au nombre de cartes attendues pour le pli courant
@@ -83,8 +91,146 @@ def check_trade(game: PresidentGame, cards: Cards):
         raise NotInRulesException("Vous n'échangez pas le bon nombre de cartes.")
 
     # le joueur est trou ou vice-trou et ne donne pas ses plus grandes cartes
-    if (current_player.role == BEFORE_LAST and cards[0].value != current_player.hand[-1].value) or \
+    if (current_player.role == BEFORE_LAST and cards[0].rank != current_player.hand[-1].rank) or \
             (current_player.role == LAST and
-             ((cards[-1].value != current_player.hand[-1].value) or (
-                     cards[-2].value != current_player.hand[-2].value))):
+             ((cards[-1].rank != current_player.hand[-1].rank) or (
+                     cards[-2].rank != current_player.hand[-2].rank))):
         raise NotInRulesException("Vous devez échanger vos meilleures cartes.")
+
+
+def check_move(game: PresidentGame, request: dict) -> Cards:
+    """
+    Vérifie la requête transmise par l'utilisateur, de la forme puis des règles, fonction par fonction (check_request,
+    check_skip, check_cards puis check_trade ou check_play) et retourne les cartes du coup (un objet Cards vide pour
+    passer). Lève une exception si la requête n'est pas valide.
+    """
+    check_request(request)
+    if request["skip"]:
+        check_skip(game)
+        return Cards()
+    cards = Cards(Card(card_str[:-1], card_str[-1]) for card_str in request["cards"])
+    check_cards(game, cards)
+    if game.is_trade:
+        check_trade(game, cards)
+    else:
+        check_play(game, cards)
+    return cards
+
+
+class MoveValidator:
+    """
+    La classe MoveValidator vérifie les requêtes des joueurs en un seul passage sur leurs cartes, en les comparant à
+    l'ensemble des coups autorisés du joueur courant. Un coup y est décrit par les rangs triés de ses cartes (les
+    couleurs n'ont pas d'influence sur les règles) : (5, 5) pour une paire de 8, par exemple.
+    Cet ensemble est calculé une fois par position et gardé tant que la position ne change pas, d'après le hash de
+    Zobrist de la partie (voir PresidentGame.zobrist_hash) : une requête refusée puis corrigée ne le recalcule pas.
+    Une requête qui n'est pas dans cet ensemble est revérifiée par check_move : validate lève donc toujours la même
+    exception, avec le même message, que les fonctions check_*, et accepte tout coup qu'elles acceptent.
+    """
+
+    def __init__(self):
+        """
+        Le constructeur de la classe MoveValidator.
+        """
+        # hash de la dernière position et ses coups autorisés
+        self.__hash = None
+        self.__legal_moves = None
+
+    def legal_moves(self, game: PresidentGame) -> tuple:
+        """
+        Retourne les coups autorisés du joueur courant de la partie donnée en paramètre, sous la forme d'un couple :
+        - un booléen, vrai si le joueur a le droit de passer,
+        - l'ensemble (frozenset) des rangs triés des coups qu'il a le droit de jouer ou de mettre à l'échange, ou None
+          si tous les coups sont autorisés (le joueur n'a pas de rôle pendant l'échange).
+        """
+        if game.zobrist_hash != self.__hash:
+            self.__legal_moves = self.__compute_legal_moves(game)
+            self.__hash = game.zobrist_hash
+        return self.__legal_moves
+
+    @staticmethod
+    def __compute_legal_moves(game: PresidentGame) -> tuple:
+        """
+        Calcule les coups autorisés du joueur courant (voir legal_moves).
+        """
+        player = game.get_current_player()
+        hand_mask = player.hand.mask
+        trick = game.current_trick
+        counts = [mask_count_rank(hand_mask, rank) for rank in range(len(VALUES))]
+        if game.is_trade:
+            if player.role not in TRADE_SIZES:
+                return False, (frozenset() if player.role == NEUTRAL else None)
+            # les meilleures cartes de la main, de la plus forte à la moins forte
+            best_ranks = []
+            mask = hand_mask
+            while mask and len(best_ranks) < 2:
+                code = mask.bit_length() - 1
+                best_ranks.append(CODE_RANKS[code])
+                mask ^= 1 << code
+            if player.role == BEFORE_LAST:
+                return False, frozenset({tuple(best_ranks[:1])})
+            if player.role == LAST:
+                return False, frozenset({tuple(reversed(best_ranks))})
+            ranks = [rank for rank, count in enumerate(counts) if count != 0]
+            if player.role == SECOND:
+                return False, frozenset((rank,) for rank in ranks)
+            return False, frozenset((first, second) for first in ranks for second in ranks
+                                    if first < second or (first == second and counts[first] >= 2))
+        if len(trick.cards) == 0:
+            return False, frozenset((rank,) * number for rank, count in enumerate(counts)
+                                    for number in range(1, count + 1))
+        number = trick.number_of_cards
+        return True, frozenset((rank,) * number for rank in range(trick.rank, len(VALUES)) if counts[rank] >= number)
+
+    def validate(self, game: PresidentGame, request: dict) -> Cards:
+        """
+        Vérifie la requête transmise par l'utilisateur pour le joueur courant de la partie, du point de vue de la forme
+        et des règles, et retourne les cartes du coup : un objet Cards vide pour passer, les cartes dans l'ordre de la
+        requête pour jouer et triées pour les mettre à l'échange. La partie n'est pas modifiée.
+        Lève une WrongRequestException ou une NotInRulesException si elle n'est pas valide, comme check_move.
+        """
+        if isinstance(request, dict) and isinstance(request.get('skip'), bool):
+            can_skip, legal_moves = self.legal_moves(game)
+            if request['skip']:
+                if can_skip:
+                    return Cards()
+            elif isinstance(request.get('cards'), list) and len(request['cards']) != 0:
+                # un seul passage sur les cartes : codes, masque, doublons et rangs
+                card_codes = CARD_CODES
+                mask = 0
+                codes = []
+                for card_str in request['cards']:
+                    code = card_codes.get(card_str) if isinstance(card_str, str) else None
+                    if code is None or mask >> code & 1:
+                        mask = -1
+                        break
+                    mask |= 1 << code
+                    codes.append(code)
+                if mask != -1 and mask & ~game.get_current_player().hand.mask == 0:
+                    codes_by_rank = sorted(codes)
+                    move = tuple(code // NUMBER_OF_SUITS for code in codes_by_rank)
+                    if legal_moves is None or move in legal_moves:
+                        return Cards([CARDS[code] for code in (codes_by_rank if game.is_trade else codes)])
+        # la requête n'est pas dans les coups autorisés : check_move en donne la raison, ou l'accepte si les rôles ne
+        # permettent pas de calculer ces coups
+        return check_move(game, request)
+
+    def validate_many(self, game: PresidentGame, requests, apply_move=None) -> list[Cards]:
+        """
+        Vérifie une suite de requêtes, par exemple celles d'une partie enregistrée, et les applique une à une : chaque
+        requête est vérifiée dans la position laissée par la précédente. Le coup est appliqué par apply_move, qui reçoit
+        ses cartes (par défaut, game.apply_move).
+        Retourne la liste des cartes des coups. S'arrête à la première requête refusée et lève l'exception de validate,
+        dont l'attribut request_index est l'indice de la requête dans la suite : les coups précédents restent appliqués.
+        """
+        apply_move = game.apply_move if apply_move is None else apply_move
+        moves = []
+        for index, request in enumerate(requests):
+            try:
+                cards = self.validate(game, request)
+            except (WrongRequestException, NotInRulesException) as error:
+                error.request_index = index
+                raise
+            apply_move(cards)
+            moves.append(cards)
+        return moves
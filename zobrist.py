@@ -0,0 +1,83 @@
+import random
+
+from constant import NUMBER_OF_CARDS, NUMBER_OF_SUITS, ROLES
+
+# Hachage de Zobrist des parties : chaque élément de l'état d'une partie (une carte dans une main, une carte du pli, le
+# joueur courant, etc.) est associé à une clé aléatoire de 64 bits, et le hash de la partie est le ou exclusif des clés
+# des éléments présents. Une modification de l'état ne change que quelques éléments : PresidentGame met son hash à jour
+# en temps constant, en retirant (par un ou exclusif) les clés des éléments qui disparaissent et en ajoutant celles des
+# éléments qui apparaissent. Les clés sont tirées avec une graine fixe : le hash d'une position est le même d'un
+# processus à l'autre.
+
+MAX_PLAYERS = max(ROLES)
+# le nombre de tours sans cartes jouées est haché modulo 64 : sa clé est TURNS_KEYS[turns & TURNS_MASK]
+TURNS_MASK = 63
+
+_random = random.Random(0x5A0B2157)
+
+
+def _keys(number: int) -> list[int]:
+    """
+    Retourne number clés aléatoires de 64 bits.
+    """
+    return [_random.getrandbits(64) for _ in range(number)]
+
+
+# HAND_KEYS[player_index][code] : la carte de code donné dans la main du joueur d'indice player_index
+HAND_KEYS = [_keys(NUMBER_OF_CARDS) for _ in range(MAX_PLAYERS)]
+# TRADED_KEYS[player_index][code] : la carte de code donné dans les cartes à échanger du joueur
+TRADED_KEYS = [_keys(NUMBER_OF_CARDS) for _ in range(MAX_PLAYERS)]
+# TRICK_KEYS[code] : la carte de code donné dans le pli
+TRICK_KEYS = _keys(NUMBER_OF_CARDS)
+# TRICK_NUMBER_KEYS[number] : le nombre de cartes demandées pour le pli
+TRICK_NUMBER_KEYS = _keys(NUMBER_OF_SUITS + 1)
+# LAST_PLAYER_KEYS[index + 1] : l'indice du dernier joueur à avoir posé des cartes dans le pli (-1 s'il est vide)
+LAST_PLAYER_KEYS = _keys(MAX_PLAYERS + 1)
+# CURRENT_PLAYER_KEYS[index] : l'indice du joueur courant
+CURRENT_PLAYER_KEYS = _keys(MAX_PLAYERS)
+# TURNS_KEYS[turns & TURNS_MASK] : le nombre de tours sans cartes jouées
+TURNS_KEYS = _keys(TURNS_MASK + 1)
+# OUT_KEYS[position][player_index] : le joueur d'indice player_index a fini la manche à la position donnée
+OUT_KEYS = [_keys(MAX_PLAYERS) for _ in range(MAX_PLAYERS)]
+# ROLE_KEYS[player_index][role] : le rôle du joueur
+_ROLE_NAMES = sorted({role for roles in ROLES.values() for role in roles})
+ROLE_KEYS = [dict(zip(_ROLE_NAMES, _keys(len(_ROLE_NAMES)))) for _ in range(MAX_PLAYERS)]
+# TRADE_KEY : la phase d'échange
+TRADE_KEY = _random.getrandbits(64)
+
+
+def trick_hash(trick) -> int:
+    """
+    Retourne le hash du pli (model.Trick) donné en paramètre : ses cartes, le nombre de cartes demandées et le dernier
+    joueur à avoir posé des cartes.
+    """
+    value = TRICK_NUMBER_KEYS[trick.number_of_cards] ^ LAST_PLAYER_KEYS[trick.last_player_index + 1]
+    for card in trick.cards:
+        value ^= TRICK_KEYS[card.code]
+    return value
+
+
+def game_hash(game) -> int:
+    """
+    Retourne le hash de la partie (model.PresidentGame) donnée en paramètre, calculé entièrement : les mains, les cartes
+    à échanger et les rôles des joueurs, le pli, le joueur courant, le nombre de tours sans cartes jouées, les joueurs
+    qui ont fini la manche dans l'ordre où ils l'ont finie, et la phase d'échange.
+    C'est la valeur que PresidentGame maintient au fil des coups (voir PresidentGame.zobrist_hash).
+    """
+    players = game.players
+    value = trick_hash(game.current_trick) ^ CURRENT_PLAYER_KEYS[game.current_player_index] \
+        ^ TURNS_KEYS[game.turns_without_plays & TURNS_MASK]
+    for index, player in enumerate(players):
+        hand_keys = HAND_KEYS[index]
+        for card in player.hand:
+            value ^= hand_keys[card.code]
+        traded_keys = TRADED_KEYS[index]
+        for card in player.traded_cards:
+            value ^= traded_keys[card.code]
+        if player.role is not None:
+            value ^= ROLE_KEYS[index][player.role]
+    for position, player in enumerate(game.players_without_card):
+        value ^= OUT_KEYS[position][players.index(player)]
+    if game.is_trade:
+        value ^= TRADE_KEY
+    return value